@@ -2,45 +2,54 @@ from typing import Iterable
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principals import ANONYMOUS, principal_cache
 from app.core.security import decode_token
 from app.db.models import User, UserRole
-from app.db.session import get_db
+from app.db.session import get_async_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-def _default_user(db: Session) -> User:
-    admin = db.query(User).filter(User.role == UserRole.ADMIN).order_by(User.id.asc()).first()
+async def _default_user(db: AsyncSession) -> User:
+    admin = await db.scalar(select(User).where(User.role == UserRole.ADMIN).order_by(User.id.asc()).limit(1))
     if admin:
         return admin
     fallback = User(email="admin@example.com", password_hash="auth-disabled", role=UserRole.ADMIN)
     db.add(fallback)
-    db.commit()
-    db.refresh(fallback)
+    await db.commit()
+    await db.refresh(fallback)
     return fallback
 
 
-def get_current_user(token: str | None = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str | None = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     # Auth is optional in this deployment: requests without/with invalid token
     # fallback to a default admin user so dashboard remains accessible.
-    if not token:
-        return _default_user(db)
-    try:
-        payload = decode_token(token)
-        user = db.query(User).filter(User.email == payload.get("sub")).first()
-        if user:
-            return user
-    except ValueError:
-        pass
-    return _default_user(db)
+    # Async so that resolving the caller never occupies a threadpool thread.
+    # A cache hit answers without touching the session, so no connection is checked out.
+    cached = principal_cache.get(token or ANONYMOUS)
+    if cached is not None:
+        return cached
+    if token:
+        try:
+            payload = decode_token(token)
+            user = await db.scalar(select(User).where(User.email == payload.get("sub")))
+            if user:
+                principal_cache.put(token, user.email, user, payload.get("exp"))
+                return user
+        except ValueError:
+            pass
+    user = await _default_user(db)
+    principal_cache.put(ANONYMOUS, user.email, user)
+    return user
 
 
 def require_roles(allowed: Iterable[UserRole]):
     allowed_set = {role.value for role in allowed}
 
-    def checker(current_user: User = Depends(get_current_user)) -> User:
+    async def checker(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role.value not in allowed_set:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return current_user
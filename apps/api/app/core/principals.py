@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import get_settings
+from app.db.models import User
+from app.services.event_bus import consume_principal_invalidations, publish_principal_invalidation
+
+# Cache key for requests without a usable token (they resolve to the default admin).
+ANONYMOUS = ""
+_ROLE_CHANGES = "principal_role_changes"
+
+
+class PrincipalCache:
+    # Resolved users by bearer token, so hot paths skip the JWT decode and the users
+    # lookup. Entries expire after AUTH_PRINCIPAL_CACHE_TTL_SEC or when the token does,
+    # whichever is first. The cached User is detached and shared: treat it as read-only.
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, tuple[float, str, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.time():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, token: str, subject: str, user: User, token_expires_at: Optional[float] = None) -> None:
+        settings = get_settings()
+        if settings.auth_principal_cache_ttl_sec <= 0:
+            return
+        expires_at = time.time() + settings.auth_principal_cache_ttl_sec
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, subject, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > max(0, settings.auth_principal_cache_size):
+                self._entries.popitem(last=False)
+
+    def invalidate_subject(self, subject: str) -> None:
+        # Every token of the user, plus the anonymous entry if it resolved to them.
+        with self._lock:
+            for token in [token for token, entry in self._entries.items() if entry[1] == subject]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User.role, "set")
+def _note_role_change(target: User, value, oldvalue, _initiator) -> None:
+    # Only committed roles matter: invalidating at assignment time would let a
+    # concurrent request re-cache the old role before the commit lands.
+    if value == oldvalue or target.email is None:
+        return
+    session = object_session(target)
+    if session is None:
+        _invalidate_everywhere([target.email])
+    else:
+        session.info.setdefault(_ROLE_CHANGES, set()).add(target.email)
+
+
+def _invalidate_everywhere(subjects: list[str]) -> None:
+    for subject in subjects:
+        principal_cache.invalidate_subject(subject)
+    # Other replicas hear it over Redis. Inside the API's event loop (AsyncSession
+    # commits run there) the publish goes to a thread so the loop never waits on Redis.
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        publish_principal_invalidation(subjects)
+    else:
+        loop.run_in_executor(None, publish_principal_invalidation, subjects)
+
+
+async def follow_remote_invalidations() -> None:
+    await consume_principal_invalidations(
+        lambda subjects: [principal_cache.invalidate_subject(subject) for subject in subjects],
+        principal_cache.clear,
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_role_changes(session: Session) -> None:
+    subjects = sorted(session.info.pop(_ROLE_CHANGES, ()))
+    if subjects:
+        _invalidate_everywhere(subjects)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_role_changes(session: Session, _previous_transaction) -> None:
+    session.info.pop(_ROLE_CHANGES, None)
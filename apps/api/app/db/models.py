@@ -2,9 +2,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import JSON, DateTime, Enum as SQLEnum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, DateTime, Enum as SQLEnum, Float, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.db.search import register_post_search
 from app.db.session import Base
 
 
@@ -36,6 +37,18 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ux_posts_platform_post_id", "platform", "platform_post_id", unique=True),
+        # Month ranges for archival (app.services.archival) walk this in order.
+        Index("ix_posts_created_id", "created_at", "id"),
+        # Only posts still waiting on media downloads; the resume sweep scans this.
+        Index(
+            "ix_posts_pending_media",
+            "created_at",
+            postgresql_where=text("pending_media IS NOT NULL"),
+            sqlite_where=text("pending_media IS NOT NULL"),
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     platform: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     platform_post_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -45,11 +58,29 @@ class Post(Base):
     lang: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     raw_json: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Media URLs still to download, committed with the post so a restart can resume them.
+    pending_media: Mapped[Optional[list]] = mapped_column(JSON(none_as_null=True), nullable=True)
 
     media_items: Mapped[list["Media"]] = relationship(back_populates="post", cascade="all, delete-orphan")
     analyses: Mapped[list["Analysis"]] = relationship(back_populates="post", cascade="all, delete-orphan")
 
 
+register_post_search(Post.__table__)
+
+
+class IngestedFile(Base):
+    __tablename__ = "ingested_files"
+    __table_args__ = (Index("ux_ingested_files_name_hash", "file_name", "content_hash", unique=True),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    post_id: Mapped[Optional[int]] = mapped_column(ForeignKey("posts.id"), nullable=True)
+    archived_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Media(Base):
     __tablename__ = "media"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -73,18 +104,46 @@ class Analysis(Base):
     category: Mapped[str] = mapped_column(String(100), nullable=False, default="general_violence")
     explanation_json: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
     model_versions: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    is_partial: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    timed_out_stages: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
     post: Mapped["Post"] = relationship(back_populates="analyses")
     alert: Mapped[Optional["Alert"]] = relationship(back_populates="analysis", uselist=False)
 
 
+# Open alerts, written as literal SQL so the partial work-queue index and the queries
+# that must match it share one predicate (SQLite skips partial indexes for bound params).
+OPEN_ALERT_SQL = "alerts.status IN ('NEW', 'INVESTIGATING')"
+
+
 class Alert(Base):
     __tablename__ = "alerts"
+    # The list endpoint pages by (created_at, id) newest first, optionally filtered by
+    # status/category/severity. Each index below serves one of those combinations.
+    __table_args__ = (
+        Index("ix_alerts_created_id", "created_at", "id"),
+        Index("ix_alerts_status_created_id", "status", "created_at", "id"),
+        Index("ix_alerts_status_category_created_id", "status", "category", "created_at", "id"),
+        Index("ix_alerts_status_severity_created_id", "status", "severity", "created_at", "id"),
+        Index("ix_alerts_category_created_id", "category", "created_at", "id"),
+        Index(
+            "ix_alerts_queue",
+            "assigned_to",
+            "priority",
+            postgresql_where=text(OPEN_ALERT_SQL),
+            sqlite_where=text(OPEN_ALERT_SQL),
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"), nullable=False, index=True)
     analysis_id: Mapped[int] = mapped_column(ForeignKey("analyses.id"), nullable=False, index=True)
     status: Mapped[AlertStatus] = mapped_column(SQLEnum(AlertStatus), nullable=False, default=AlertStatus.NEW)
+    # Copied from the analysis at creation so filters and ordering use one table's indexes.
+    category: Mapped[str] = mapped_column(String(100), nullable=False, default="general_violence")
+    severity: Mapped[str] = mapped_column(String(20), nullable=False, default="LOW")
+    # Work-queue rank, fixed at creation (see app.services.workqueue.alert_priority).
+    priority: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
     assigned_to: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -92,6 +151,18 @@ class Alert(Base):
     analysis: Mapped["Analysis"] = relationship(back_populates="alert")
 
 
+class AlertCounter(Base):
+    # Incrementally maintained alert counts. Facet rows (status/severity/category/platform)
+    # use the fixed all-time bucket; trend rows ("hour"/"day") use the bucket start.
+    __tablename__ = "alert_counters"
+    __table_args__ = (Index("ux_alert_counters_key", "dimension", "value", "bucket_start", unique=True),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(20), nullable=False)
+    value: Mapped[str] = mapped_column(String(100), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class Feedback(Base):
     __tablename__ = "feedback"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
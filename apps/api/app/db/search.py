@@ -0,0 +1,42 @@
+from sqlalchemy import DDL, Table, event
+
+# Post search indexes. create_all cannot express these portably, so they are
+# attached as dialect-specific DDL that runs right after the posts table is created.
+#
+# Postgres: a GIN index on a 'simple' tsvector (no stemming, so Sinhala and English
+# tokens are treated alike) plus pg_trgm GIN indexes that serve ILIKE '%q%' on text
+# and author for partial words and names.
+# SQLite: an external-content FTS5 table kept in sync by triggers. The tokenizer
+# keeps combining marks (M*) and joiners (Cf) inside tokens, which Sinhala needs.
+
+POSTS_TSV_SQL = "to_tsvector('simple', coalesce(posts.text, '') || ' ' || coalesce(posts.author, ''))"
+POSTS_FTS_TABLE = "posts_fts"
+POSTS_FTS_TOKENIZER = "unicode61 remove_diacritics 2 categories 'L* N* Co M* Cf'"
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_posts_search_tsv ON posts USING gin (({POSTS_TSV_SQL}))",
+    "CREATE INDEX IF NOT EXISTS ix_posts_text_trgm ON posts USING gin (text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_author_trgm ON posts USING gin (author gin_trgm_ops)",
+]
+
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {POSTS_FTS_TABLE} USING fts5("
+    f"text, author, platform, content='posts', content_rowid='id', tokenize=\"{POSTS_FTS_TOKENIZER}\")",
+    f"CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    f"INSERT INTO {POSTS_FTS_TABLE}(rowid, text, author, platform) VALUES (new.id, new.text, new.author, new.platform); END",
+    f"CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    f"INSERT INTO {POSTS_FTS_TABLE}({POSTS_FTS_TABLE}, rowid, text, author, platform) "
+    f"VALUES ('delete', old.id, old.text, old.author, old.platform); END",
+    f"CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE ON posts BEGIN "
+    f"INSERT INTO {POSTS_FTS_TABLE}({POSTS_FTS_TABLE}, rowid, text, author, platform) "
+    f"VALUES ('delete', old.id, old.text, old.author, old.platform); "
+    f"INSERT INTO {POSTS_FTS_TABLE}(rowid, text, author, platform) VALUES (new.id, new.text, new.author, new.platform); END",
+]
+
+
+def register_post_search(posts: Table) -> None:
+    for statement in _POSTGRES_DDL:
+        event.listen(posts, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in _SQLITE_DDL:
+        event.listen(posts, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -1,12 +1,53 @@
+from typing import Any
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, future=True)
+# Same database, async drivers: psycopg2 -> asyncpg, pysqlite -> aiosqlite.
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"no async driver configured for {parsed.get_backend_name()!r}")
+    async_url = parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+    if driver == "asyncpg" and "sslmode" in parsed.query:
+        # asyncpg has no sslmode parameter; its `ssl` argument takes the same mode names.
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        async_url = async_url.set(query=query)
+    return async_url.render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict[str, Any]:
+    # SQLite uses SQLAlchemy's default pools; sizing options only apply to server databases.
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_sec,
+        "pool_recycle": settings.db_pool_recycle_sec,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+engine = create_engine(settings.database_url, future=True, **pool_options(settings.database_url))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session, future=True)
+
+_async_url = settings.async_database_url or async_database_url(settings.database_url)
+# The API's request handlers await this engine instead of holding a threadpool thread per query.
+async_engine = create_async_engine(_async_url, **pool_options(_async_url))
+# expire_on_commit=False: handlers read attributes after commit without another round trip.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
 
 
@@ -16,3 +57,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
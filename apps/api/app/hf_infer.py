@@ -13,7 +13,7 @@ from __future__ import annotations
 import os
 from typing import Any
 
-import requests
+from app.services.http_client import get_http_client
 
 
 def _default_scores(categories: list[str]) -> dict[str, float]:
@@ -84,7 +84,7 @@ def predict(text: str, lang: str, categories: list[str]) -> dict[str, float]:
     body = {"text": text, "lang": lang, "categories": categories}
 
     try:
-        response = requests.post(model_url, json=body, headers=headers, timeout=timeout_sec)
+        response = get_http_client().post(model_url, json=body, headers=headers, timeout=timeout_sec)
         response.raise_for_status()
         data = response.json()
     except Exception:
@@ -1,5 +1,5 @@
 import asyncio
-import threading
+import contextlib
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -8,30 +8,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import get_settings
+from app.core.principals import follow_remote_invalidations
 from app.db.session import Base, SessionLocal, engine
 from app.routers import alerts, auth, debug, ingest, users, ws
-from app.services.event_bus import subscribe_alerts
-from app.services.ingestion import start_demo_folder_watcher, start_facebook_polling
+from app.services.event_bus import consume_alerts
+from app.services.platform_adapters import (
+    start_deferred_drain,
+    start_demo_folder_watcher,
+    start_download_sweep,
+    start_facebook_polling,
+)
+from app.services.source_scheduler import get_scheduler
 from app.services.ws_manager import ws_manager
 
 settings = get_settings()
 
 
-def _start_alert_subscription(loop: asyncio.AbstractEventLoop) -> None:
-    def _on_message(payload: dict) -> None:
-        asyncio.run_coroutine_threadsafe(ws_manager.broadcast_json(payload), loop)
-
-    def _run() -> None:
-        import sys
-        try:
-            subscribe_alerts(_on_message)
-        except Exception as e:
-            print(f"[redis] Alert subscription stopped: {e}", file=sys.stderr, flush=True)
-
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     import sys
@@ -44,11 +36,13 @@ async def lifespan(app: FastAPI):
         Path(settings.demo_input_dir).mkdir(parents=True, exist_ok=True)
     except Exception as e:
         print(f"[startup] mkdir failed: {e}", file=sys.stderr, flush=True)
+    alert_consumer = asyncio.create_task(consume_alerts(ws_manager.broadcast_json))
+    principal_listener = asyncio.create_task(follow_remote_invalidations())
     try:
-        loop = asyncio.get_running_loop()
-        _start_alert_subscription(loop)
+        start_download_sweep(SessionLocal)
+        start_deferred_drain(SessionLocal)
     except Exception as e:
-        print(f"[startup] alert subscription failed: {e}", file=sys.stderr, flush=True)
+        print(f"[startup] maintenance sources failed: {e}", file=sys.stderr, flush=True)
     if settings.demo_mode:
         try:
             start_demo_folder_watcher(SessionLocal)
@@ -64,6 +58,11 @@ async def lifespan(app: FastAPI):
             print(f"[startup] Facebook polling failed: {e}", file=sys.stderr, flush=True)
     print("[startup] API ready", file=sys.stderr, flush=True)
     yield
+    for task in (alert_consumer, principal_listener):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    get_scheduler().shutdown()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
@@ -73,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(auth.router)
@@ -81,6 +81,8 @@ app.include_router(ingest.router)
 app.include_router(users.router)
 app.include_router(debug.router)
 app.include_router(ws.router)
+
+
 # Ensure static mount directory exists at import time in cloud runtimes.
 Path(settings.media_root).mkdir(parents=True, exist_ok=True)
 app.mount("/storage", StaticFiles(directory=settings.media_root), name="storage")
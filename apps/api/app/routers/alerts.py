@@ -1,143 +1,268 @@
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.deps import get_current_user
-from app.db.models import Alert, AlertStatus, Analysis, Feedback, FeedbackDecision, Media, Post, User
-from app.db.session import get_db
-from app.schemas import AlertDetail, AlertPatchRequest, AlertSummary, FeedbackRequest
+from app.core.deps import get_current_user, require_roles
+from app.db.models import Alert, AlertStatus, Analysis, Feedback, FeedbackDecision, Post, User, UserRole
+from app.db.session import SessionLocal, get_async_db
+from app.schemas import (
+    AlertBulkPatchRequest,
+    AlertBulkPatchResponse,
+    AlertDetail,
+    AlertPatchRequest,
+    AlertQueueItem,
+    AlertSummary,
+    FeedbackRequest,
+)
+from app.services.alert_detail import alert_etag, detail_cache, load_alert_detail
+from app.services.alert_export import MEDIA_TYPES, ExportFilter, export_chunks, parquet_available
+from app.services.alert_queries import encode_cursor, filter_alerts, keyset_page, search_alerts
+from app.services.alert_stats import MAX_TREND_BUCKETS, alert_stats, record_status_changes
+from app.services.alert_triage import BulkLimitExceeded, bulk_update_alerts
+from app.services.alerting import publish_alert_updated, publish_alerts_bulk_updated
+from app.services.workqueue import next_alerts
 
+# Handlers are async and await the async engine, so slow queries wait on the event loop
+# instead of holding one of the threadpool's threads. The sync services in
+# app.services are reused through AsyncSession.run_sync.
 router = APIRouter(prefix="/alerts", tags=["alerts"])
-settings = get_settings()
-
-
-def _to_storage_url(path: str) -> str:
-    if not path:
-        return path
-    media_root = settings.media_root.rstrip("/")
-    if path.startswith(media_root):
-        rel = path[len(media_root) :].lstrip("/")
-        return f"/storage/{rel}"
-    return path
 
 
 @router.get("", response_model=list[AlertSummary])
-def list_alerts(
+async def list_alerts(
+    response: Response,
     status_filter: str | None = Query(default=None, alias="status"),
     category: str | None = None,
     severity: str | None = None,
     q: str | None = None,
+    cursor: str | None = None,
     page: int = 1,
-    limit: int = 20,
-    db: Session = Depends(get_db),
+    limit: int = Query(default=20, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
     _: User = Depends(get_current_user),
 ):
-    offset = max(0, (page - 1) * limit)
-    query = db.query(Alert, Analysis).join(Analysis, Analysis.id == Alert.analysis_id)
+    alert_status = None
     if status_filter:
         try:
-            query = query.filter(Alert.status == AlertStatus(status_filter))
+            alert_status = AlertStatus(status_filter)
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
-    if category:
-        query = query.filter(Analysis.category == category)
-    if severity:
-        query = query.filter(Analysis.severity == severity)
-    if q:
-        query = query.join(Post, Post.id == Alert.post_id).filter(
-            or_(Post.text.ilike(f"%{q}%"), Post.author.ilike(f"%{q}%"), Post.platform.ilike(f"%{q}%"))
+    query = select(Alert, Analysis.fusion_score).join(Analysis, Analysis.id == Alert.analysis_id)
+    query = filter_alerts(query, alert_status, category, severity)
+    if q and q.strip():
+        # Search results are ranked by relevance, so they page by number, not cursor.
+        if cursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cursor cannot be combined with q")
+        query = search_alerts(query, q.strip(), db.get_bind().dialect.name)
+        query = query.offset(max(0, (page - 1) * limit)).limit(limit)
+    else:
+        try:
+            query = keyset_page(query, cursor, limit)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if not cursor and page > 1:
+            # Legacy page numbers still work but scan every skipped row; prefer X-Next-Cursor.
+            query = query.offset((page - 1) * limit)
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_alert = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_alert.created_at, last_alert.id)
+    return [
+        AlertSummary(
+            id=alert.id,
+            post_id=alert.post_id,
+            category=alert.category,
+            severity=alert.severity,
+            fusion_score=fusion_score,
+            status=alert.status.value,
+            created_at=alert.created_at,
         )
+        for alert, fusion_score in rows
+    ]
+
+
+@router.patch("", response_model=AlertBulkPatchResponse)
+async def bulk_patch_alerts(
+    payload: AlertBulkPatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not payload.ids and payload.filter is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide ids or filter")
+    if payload.status is None and payload.assigned_to is None and payload.feedback is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to change")
+    try:
+        new_status = AlertStatus(payload.status) if payload.status is not None else None
+        if payload.filter is not None and payload.filter.status:
+            AlertStatus(payload.filter.status)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
+    feedback = None
+    if payload.feedback is not None:
+        try:
+            decision = FeedbackDecision(payload.feedback.decision)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid decision")
+        feedback = {
+            "user_id": current_user.id,
+            "decision": decision,
+            "corrected_category": payload.feedback.corrected_category,
+            "notes": payload.feedback.notes,
+        }
+
+    try:
+        items, recorded = await db.run_sync(
+            bulk_update_alerts,
+            payload.ids,
+            payload.filter,
+            new_status,
+            payload.assigned_to,
+            get_settings().alert_bulk_max,
+            feedback=feedback,
+        )
+    except BulkLimitExceeded as exc:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    await db.commit()
+    ids = [item["id"] for item in items]
+    detail_cache.invalidate(*ids)
+    if items:
+        requested = {"status": payload.status, "assigned_to": payload.assigned_to}
+        changes = {key: value for key, value in requested.items() if value is not None}
+        await run_in_threadpool(publish_alerts_bulk_updated, items, changes)
+    return AlertBulkPatchResponse(updated=len(ids), ids=ids, feedback_recorded=recorded)
+
+
+@router.get("/export")
+async def export_alerts(
+    fmt: Literal["ndjson", "csv", "parquet"] = Query(default="ndjson", alias="format"),
+    kind: Literal["alerts", "analyses"] = "alerts",
+    status_filter: str | None = Query(default=None, alias="status"),
+    category: str | None = None,
+    severity: str | None = None,
+    platform: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    include_raw: bool = False,
+    _: User = Depends(require_roles([UserRole.ADMIN, UserRole.POLICE])),
+):
+    try:
+        alert_status = AlertStatus(status_filter) if status_filter else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export needs pyarrow")
+    export_filter = ExportFilter(
+        kind=kind,
+        status=alert_status,
+        category=category,
+        severity=severity,
+        platform=platform,
+        created_from=created_from,
+        created_to=created_to,
+        include_raw=include_raw,
+    )
+    filename = f"{kind}-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+    # A sync generator with its own session: Starlette iterates it in the threadpool, one
+    # thread per running export rather than per request.
+    return StreamingResponse(
+        export_chunks(SessionLocal, export_filter, fmt, get_settings().export_batch_size),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/stats")
+async def get_alert_stats(
+    granularity: Literal["hour", "day"] = "hour",
+    buckets: int = Query(default=24, ge=1, le=MAX_TREND_BUCKETS),
+    db: AsyncSession = Depends(get_async_db),
+    _: User = Depends(get_current_user),
+):
+    return await db.run_sync(alert_stats, granularity, buckets)
 
-    rows = query.order_by(Alert.created_at.desc()).offset(offset).limit(limit).all()
+
+@router.get("/queue", response_model=list[AlertQueueItem])
+async def get_work_queue(
+    limit: int = Query(default=20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user),
+):
+    # Highest-priority open alerts the caller can pick up: unassigned or already theirs.
+    rows = await db.run_sync(next_alerts, user.id, limit)
     return [
-        AlertSummary(
+        AlertQueueItem(
             id=alert.id,
             post_id=alert.post_id,
-            category=analysis.category,
-            severity=analysis.severity,
-            fusion_score=analysis.fusion_score,
+            category=alert.category,
+            severity=alert.severity,
+            fusion_score=fusion_score,
             status=alert.status.value,
             created_at=alert.created_at,
+            priority=alert.priority,
+            assigned_to=alert.assigned_to,
+            platform=platform,
         )
-        for alert, analysis in rows
+        for alert, fusion_score, platform in rows
     ]
 
 
 @router.get("/{alert_id}", response_model=AlertDetail)
-def get_alert(alert_id: int, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
-    row = (
-        db.query(Alert, Analysis, Post)
-        .join(Analysis, Analysis.id == Alert.analysis_id)
-        .join(Post, Post.id == Alert.post_id)
-        .filter(Alert.id == alert_id)
-        .first()
-    )
-    if not row:
+async def get_alert(
+    alert_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: User = Depends(get_current_user),
+):
+    # A primary-key probe decides between 304, a cached body and a full load.
+    updated_at = await db.scalar(select(Alert.updated_at).where(Alert.id == alert_id))
+    if updated_at is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
-    alert, analysis, post = row
-    media_items = db.query(Media).filter(Media.post_id == post.id).all()
-    media_payload = []
-    for media in media_items:
-        meta = dict(media.meta_json or {})
-        evidence_frames = [_to_storage_url(p) for p in meta.get("evidence_frames", [])]
-        transcript_path = _to_storage_url(meta.get("transcript_path", ""))
-        media_payload.append(
-            {
-                "id": media.id,
-                "type": media.type,
-                "path": _to_storage_url(media.path),
-                "meta_json": {
-                    **meta,
-                    "transcript_path": transcript_path,
-                    "evidence_frames": evidence_frames,
-                },
-            }
-        )
-    return AlertDetail(
-        id=alert.id,
-        status=alert.status.value,
-        assigned_to=alert.assigned_to,
-        created_at=alert.created_at,
-        updated_at=alert.updated_at,
-        post={
-            "id": post.id,
-            "platform": post.platform,
-            "platform_post_id": post.platform_post_id,
-            "url": post.url,
-            "author": post.author,
-            "text": post.text,
-            "lang": post.lang,
-            "raw_json": post.raw_json,
-            "media": media_payload,
-        },
-        analysis={
-            "id": analysis.id,
-            "text_probs": analysis.text_probs,
-            "video_score": analysis.video_score,
-            "audio_probs": analysis.audio_probs,
-            "fusion_score": analysis.fusion_score,
-            "severity": analysis.severity,
-            "category": analysis.category,
-            "explanation_json": analysis.explanation_json,
-            "model_versions": analysis.model_versions,
-        },
-    )
+    etag = alert_etag(alert_id, updated_at)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = detail_cache.get(alert_id, updated_at)
+    if body is None:
+        detail = await db.run_sync(load_alert_detail, alert_id)
+        if detail is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
+        body = detail.model_dump_json().encode()
+        # Key by the version actually serialized, in case the row changed in between.
+        detail_cache.put(alert_id, detail.updated_at, body)
+        if detail.updated_at != updated_at:
+            headers["ETag"] = alert_etag(alert_id, detail.updated_at)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.patch("/{alert_id}", response_model=AlertSummary)
-def patch_alert(
+async def patch_alert(
     alert_id: int,
     payload: AlertPatchRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: User = Depends(get_current_user),
 ):
-    row = db.query(Alert, Analysis).join(Analysis, Analysis.id == Alert.analysis_id).filter(Alert.id == alert_id).first()
+    row = (
+        await db.execute(
+            select(Alert, Analysis, Post.platform)
+            .join(Analysis, Analysis.id == Alert.analysis_id)
+            .join(Post, Post.id == Alert.post_id)
+            .where(Alert.id == alert_id)
+        )
+    ).first()
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
-    alert, analysis = row
+    alert, analysis, platform = row
+    old_status = alert.status
     if payload.status is not None:
         try:
             alert.status = AlertStatus(payload.status)
@@ -146,8 +271,11 @@ def patch_alert(
     if payload.assigned_to is not None:
         alert.assigned_to = payload.assigned_to
     alert.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(alert)
+    await db.run_sync(record_status_changes, [(old_status, alert.status)])
+    await db.commit()
+    detail_cache.invalidate(alert.id)
+    await db.refresh(alert)
+    await run_in_threadpool(publish_alert_updated, alert, analysis, platform)
     return AlertSummary(
         id=alert.id,
         post_id=alert.post_id,
@@ -160,13 +288,13 @@ def patch_alert(
 
 
 @router.post("/{alert_id}/feedback")
-def submit_feedback(
+async def submit_feedback(
     alert_id: int,
     payload: FeedbackRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
     try:
@@ -182,5 +310,7 @@ def submit_feedback(
         notes=payload.notes,
     )
     db.add(feedback)
-    db.commit()
+    alert.updated_at = datetime.utcnow()
+    await db.commit()
+    detail_cache.invalidate(alert.id)
     return {"ok": True, "feedback_id": feedback.id}
@@ -1,36 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_user, require_roles
 from app.core.security import create_access_token, hash_password, verify_password
 from app.db.models import User, UserRole
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.schemas import LoginRequest, LoginResponse, RegisterRequest, UserOut
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)) -> LoginResponse:
+    user = await db.scalar(select(User).where(User.email == payload.email))
+    # Password hashing is deliberately slow; keep it off the event loop.
+    if not user or not await run_in_threadpool(verify_password, payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token(subject=user.email, role=user.role.value)
     return LoginResponse(access_token=token)
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def me(current_user: User = Depends(get_current_user)) -> UserOut:
     return UserOut.model_validate(current_user)
 
 
 @router.post("/register", response_model=UserOut)
-def register(
+async def register(
     payload: RegisterRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: User = Depends(require_roles([UserRole.ADMIN])),
 ) -> UserOut:
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await db.scalar(select(User.id).where(User.email == payload.email))
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already exists")
     try:
@@ -38,8 +41,8 @@ def register(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid role")
 
-    user = User(email=payload.email, password_hash=hash_password(payload.password), role=role)
+    user = User(email=payload.email, password_hash=await run_in_threadpool(hash_password, payload.password), role=role)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserOut.model_validate(user)
@@ -10,6 +10,7 @@ from app.schemas import DebugModelCheckRequest
 from app.services.language import detect_lang
 from app.services.text_model import get_text_model
 from app.services.video_model import get_video_model
+from app.services.ws_manager import ws_manager
 from app.services.audio_model import AudioModel
 
 router = APIRouter(prefix="/debug", tags=["debug"])
@@ -71,3 +72,8 @@ def model_check(
                 }
 
     return response
+
+
+@router.get("/ws-stats")
+def ws_stats(_: User = Depends(require_roles([UserRole.ADMIN]))):
+    return ws_manager.stats()
@@ -1,18 +1,34 @@
+import json
+import tempfile
+from collections import Counter
 from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.core.deps import get_current_user
-from app.db.models import User
+from app.db.models import Post, User
 from app.db.session import SessionLocal, get_db
 from app.schemas import FacebookStreamStartRequest, IngestDemoRequest, ReplayStartRequest, TwitterStreamStartRequest
+from app.services.backpressure import backpressure_status, enqueue_analysis_batch
 from app.services.ingestion import (
     create_post_and_queue,
-    facebook_polling_status,
+    demo_record,
     ingest_facebook_once,
     ingest_twitter_once,
+    store_posts_batch,
+)
+from app.services.media_downloader import ingest_tmp_dir
+from app.services.platform_adapters import (
+    facebook_polling_status,
+    replay_status,
+    sources_status,
     start_facebook_polling,
     start_replay,
     start_twitter_polling,
@@ -21,6 +37,7 @@ from app.services.ingestion import (
     stop_twitter_polling,
     twitter_polling_status,
 )
+from app.services.upload_stream import StreamingUpload, UploadError, UploadTooLarge, finalize_media
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 settings = get_settings()
@@ -38,33 +55,283 @@ def ingest_demo(payload: IngestDemoRequest, db: Session = Depends(get_db), _: Us
         raw_json=payload.raw_json,
         media_paths=payload.media_paths,
     )
+    if post is None:
+        existing = (
+            db.query(Post.id)
+            .filter(Post.platform == payload.platform, Post.platform_post_id == payload.platform_post_id)
+            .first()
+        )
+        return {"ok": True, "post_id": existing.id if existing else None, "duplicate": True}
     return {"ok": True, "post_id": post.id}
 
 
+async def _iter_ndjson_lines(request: Request, max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    # Yields each line, or None for a line longer than max_line_bytes. Each body chunk is
+    # scanned once and an oversized line is skipped rather than buffered.
+    buffer = bytearray()
+    oversized = False
+    async for chunk in request.stream():
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if not oversized:
+                if len(buffer) + len(piece) > max_line_bytes:
+                    oversized = True
+                    buffer.clear()
+                else:
+                    buffer += piece
+            if end < 0:
+                break
+            yield None if oversized else bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in exc.errors())
+
+
+# Per-line results past this size are spooled to a temporary file instead of memory.
+RESULTS_SPOOL_BYTES = 1024 * 1024
+
+
+class _BatchReport:
+    # Counts for the whole body plus one result line per record, written out in line
+    # order as chunks complete, so memory stays flat however many lines are posted.
+    def __init__(self) -> None:
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.queue: Counter = Counter()
+        self.pending: list[dict] = []
+        self.results = tempfile.SpooledTemporaryFile(max_size=RESULTS_SPOOL_BYTES)
+
+    def reject(self, line_no: int, message: str) -> None:
+        self.rejected += 1
+        self.pending.append({"line": line_no, "status": "rejected", "error": message})
+
+    def write_pending(self) -> None:
+        for item in sorted(self.pending, key=lambda item: item["line"]):
+            self.results.write(json.dumps(item).encode() + b"\n")
+        self.pending = []
+
+    def summary(self) -> dict:
+        return {
+            "ok": True,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "queue": dict(self.queue),
+        }
+
+    def iter_ndjson(self) -> Iterator[bytes]:
+        try:
+            yield json.dumps(self.summary()).encode() + b"\n"
+            self.results.seek(0)
+            yield from iter(lambda: self.results.read(64 * 1024), b"")
+        finally:
+            self.results.close()
+
+
+def _existing_post_ids(db: Session, records: list[IngestDemoRequest]) -> dict[tuple[str, str], int]:
+    keys = {(record.platform, str(record.platform_post_id)) for record in records}
+    rows = db.query(Post.id, Post.platform, Post.platform_post_id).filter(
+        Post.platform.in_({platform for platform, _ in keys}),
+        Post.platform_post_id.in_({post_id for _, post_id in keys}),
+    )
+    return {(row.platform, row.platform_post_id): row.id for row in rows if (row.platform, row.platform_post_id) in keys}
+
+
+def _ingest_batch_chunk(chunk: list[tuple[int, IngestDemoRequest]], report: _BatchReport) -> None:
+    db = SessionLocal()
+    try:
+        records = [
+            {
+                "platform": record.platform,
+                "platform_post_id": record.platform_post_id,
+                "text": record.text or "",
+                "author": record.author or "batch",
+                "url": record.url or "",
+                "raw_json": record.raw_json,
+                "media_paths": record.media_paths,
+            }
+            for _, record in chunk
+        ]
+        try:
+            posts = store_posts_batch(db, records)
+        except (SQLAlchemyError, OSError) as exc:
+            # Nothing from this chunk was committed; earlier chunks stay committed.
+            db.rollback()
+            kind = "database" if isinstance(exc, SQLAlchemyError) else "media"
+            for line_no, _ in chunk:
+                report.reject(line_no, f"{kind} error: {exc.__class__.__name__}")
+            return
+        stored = [post for post in posts if post is not None]
+        report.accepted += len(stored)
+        report.duplicates += len(posts) - len(stored)
+        duplicates = [record for (_, record), post in zip(chunk, posts) if post is None]
+        existing = _existing_post_ids(db, duplicates) if duplicates else {}
+        try:
+            decisions = enqueue_analysis_batch(db, stored)
+            queue_error = None
+        except Exception as exc:
+            # The posts are committed but not queued; report them instead of failing the body.
+            decisions = {post.id: "error" for post in stored}
+            queue_error = f"queue error: {exc.__class__.__name__}"
+        report.queue.update(decisions.values())
+        for (line_no, record), post in zip(chunk, posts):
+            if post is None:
+                key = (record.platform, str(record.platform_post_id))
+                report.pending.append({"line": line_no, "status": "duplicate", "post_id": existing.get(key)})
+                continue
+            result = {"line": line_no, "status": "created", "post_id": post.id, "queue": decisions.get(post.id)}
+            if queue_error is not None:
+                result["error"] = queue_error
+            report.pending.append(result)
+    finally:
+        db.close()
+
+
+@router.post("/batch")
+async def ingest_batch(request: Request, _: User = Depends(get_current_user)):
+    # The body is consumed in full before the response starts; results wait in a spool
+    # file and are then streamed back as NDJSON: the summary first, then one line per record.
+    chunk_size = max(1, settings.ingest_batch_chunk_size)
+    max_line_bytes = max(1, settings.ingest_batch_max_line_bytes)
+    report = _BatchReport()
+    chunk: list[tuple[int, IngestDemoRequest]] = []
+    line_no = 0
+    try:
+        async for line in _iter_ndjson_lines(request, max_line_bytes):
+            line_no += 1
+            if line is None:
+                report.reject(line_no, f"record: line longer than {max_line_bytes} bytes")
+            elif line.strip():
+                try:
+                    chunk.append((line_no, IngestDemoRequest.model_validate_json(line)))
+                except ValidationError as exc:
+                    report.reject(line_no, _validation_message(exc))
+            # Rejected lines count towards the chunk too, so pending results stay bounded.
+            if len(chunk) + len(report.pending) >= chunk_size:
+                if chunk:
+                    await run_in_threadpool(_ingest_batch_chunk, chunk, report)
+                report.write_pending()
+                chunk = []
+        if chunk:
+            await run_in_threadpool(_ingest_batch_chunk, chunk, report)
+        report.write_pending()
+    except BaseException:
+        report.results.close()
+        raise
+    return StreamingResponse(report.iter_ndjson(), media_type="application/x-ndjson")
+
+
+def _create_uploaded_post(record: dict, media_meta: dict) -> tuple[Optional[Post], Optional[int]]:
+    db = SessionLocal()
+    try:
+        post = create_post_and_queue(db=db, media_meta=media_meta, **record)
+        if post is not None:
+            return post, None
+        existing = (
+            db.query(Post.id)
+            .filter(Post.platform == record["platform"], Post.platform_post_id == record["platform_post_id"])
+            .first()
+        )
+        return None, existing.id if existing else None
+    finally:
+        db.close()
+
+
 @router.post("/demo/upload")
-async def ingest_demo_upload(json_file: UploadFile, media_file: UploadFile | None = None, _: User = Depends(get_current_user)):
-    from app.core.config import get_settings
+async def ingest_demo_upload(request: Request, _: User = Depends(get_current_user)):
+    upload = StreamingUpload(ingest_tmp_dir(), max_file_bytes=settings.upload_max_bytes, memory_parts=("json_file",))
+    try:
+        parts = await upload.parse(request.headers.get("content-type", ""), request.stream())
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except UploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        json_part = parts.get("json_file")
+        if json_part is None:
+            raise HTTPException(status_code=400, detail="json_file is required")
+        try:
+            payload = json.loads(bytes(json_part.data))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="json_file is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=400, detail="json_file must contain a JSON object")
+        record = demo_record(
+            payload,
+            Path(settings.demo_input_dir),
+            default_post_id=Path(json_part.filename or "upload").stem,
+            default_author="demo_user",
+        )
+
+        media_meta: dict = {}
+        media_part = parts.get("media_file")
+        if media_part is not None and media_part.path is not None and media_part.size:
+            try:
+                media_path = str(finalize_media(media_part))
+            except UploadError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            record["media_paths"].append(media_path)
+            media_meta[media_path] = {
+                "filename": media_part.filename,
+                "sha256": media_part.sha256,
+                "bytes": media_part.size,
+            }
+
+        post, existing_id = await run_in_threadpool(_create_uploaded_post, record, media_meta)
+    finally:
+        # Anything not moved into the media store by now is not needed.
+        upload.discard()
 
-    settings = get_settings()
-    demo_dir = Path(settings.demo_input_dir)
-    demo_dir.mkdir(parents=True, exist_ok=True)
-    json_path = demo_dir / json_file.filename
-    json_path.write_bytes(await json_file.read())
-    media_path = None
-    if media_file is not None:
-        media_path = demo_dir / media_file.filename
-        media_path.write_bytes(await media_file.read())
-    return {"ok": True, "json_path": str(json_path), "media_path": str(media_path) if media_path else None}
+    if post is None:
+        return {"ok": True, "post_id": existing_id, "duplicate": True}
+    return {"ok": True, "post_id": post.id, "media": list(media_meta.values())}
+
+
+def _replay_file(name: str) -> Path:
+    data_root = Path(settings.demo_input_dir).parent.resolve()
+    path = (data_root / name).resolve()
+    if data_root not in path.parents or not path.is_file():
+        raise HTTPException(status_code=400, detail=f"Replay file must be an existing file under {data_root}")
+    return path
 
 
 @router.post("/replay/start")
 def replay_start(payload: ReplayStartRequest, _: User = Depends(get_current_user)):
-    started = start_replay(SessionLocal, speed=payload.speed, limit=payload.limit)
+    started = start_replay(
+        SessionLocal,
+        speed=payload.speed,
+        limit=payload.limit,
+        file=_replay_file(payload.file) if payload.file else None,
+        rate=payload.rate,
+        pattern=payload.pattern,
+        burst_size=payload.burst_size,
+        batch_size=payload.batch_size,
+        duration_sec=payload.duration_sec,
+        loops=payload.loops,
+        unique_ids=payload.unique_ids,
+    )
     if not started:
         raise HTTPException(status_code=409, detail="Replay already running")
     return {"ok": True}
 
 
+@router.get("/replay/status")
+def replay_report(_: User = Depends(get_current_user)):
+    return replay_status()
+
+
 @router.post("/replay/stop")
 def replay_stop(_: User = Depends(get_current_user)):
     stop_replay()
@@ -153,3 +420,13 @@ def stop_facebook_stream(_: User = Depends(get_current_user)):
 @router.get("/facebook/status")
 def facebook_status(_: User = Depends(get_current_user)):
     return facebook_polling_status()
+
+
+@router.get("/backpressure")
+def ingest_backpressure(_: User = Depends(get_current_user)):
+    return backpressure_status()
+
+
+@router.get("/sources")
+def ingest_sources(_: User = Depends(get_current_user)):
+    return {"sources": sources_status()}
@@ -1,15 +1,111 @@
+import json
+from typing import Optional
+
+import redis
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from app.services.ws_manager import ws_manager
+from app.core.config import get_settings
+from app.core.security import decode_token
+from app.db.models import User
+from app.db.session import SessionLocal
+from app.schemas import AlertSubscribeRequest
+from app.services.alert_sync import open_alerts_snapshot, replay_since
+from app.services.ws_manager import Subscription, ws_manager
 
 router = APIRouter(tags=["ws"])
 
 
+def _user_id_for_token(token: str) -> Optional[int]:
+    try:
+        payload = decode_token(token)
+    except ValueError:
+        return None
+    db = SessionLocal()
+    try:
+        row = db.query(User.id).filter(User.email == payload.get("sub")).first()
+        return row.id if row else None
+    finally:
+        db.close()
+
+
+def _parse_subscribe(message: str, user_id: Optional[int]):
+    # Returns None for messages that are not subscribe requests, else (request, error).
+    try:
+        data = json.loads(message)
+    except ValueError:
+        # Older clients send a bare "subscribed" keepalive; they keep the default (everything).
+        return None
+    if not isinstance(data, dict) or data.get("type") != "subscribe":
+        return None
+    try:
+        request = AlertSubscribeRequest.model_validate(data)
+    except ValidationError as exc:
+        return None, {"type": "error", "detail": exc.errors(include_url=False)}
+    if request.assigned_to_me and user_id is None:
+        return None, {"type": "error", "detail": "assigned_to_me requires a valid ?token="}
+    return request, None
+
+
+async def _resume(websocket: WebSocket, user_id: Optional[int], since: Optional[str], snapshot: bool) -> None:
+    # Live alerts are held back while missed ones are replayed, so the client sees
+    # replay -> "synced" -> live with no gap and no reordering.
+    settings = get_settings()
+    ws_manager.hold(websocket)
+    replayed: list[dict] = []
+    cursor = since
+    try:
+        covered = None
+        if since:
+            covered = await replay_since(since, settings.ws_replay_max)
+            if covered is not None:
+                replayed = covered
+            elif not snapshot:
+                ws_manager.send_json(websocket, {"type": "resync", "reason": "cursor expired"})
+        if snapshot and covered is None:
+            connection = ws_manager.connections.get(websocket)
+            subscription = connection.subscription if connection else Subscription()
+            frame = await open_alerts_snapshot(subscription, user_id)
+            ws_manager.send_json(websocket, frame)
+            cursor = frame["cursor"]
+            if cursor:
+                replayed = await replay_since(cursor, settings.ws_replay_max) or []
+    except redis.RedisError:
+        ws_manager.send_json(websocket, {"type": "resync", "reason": "event stream unavailable"})
+    if replayed:
+        cursor = replayed[-1]["event_id"]
+    await ws_manager.release(websocket, replayed, trailer={"type": "synced", "cursor": cursor, "replayed": len(replayed)})
+
+
 @router.websocket("/ws/alerts")
-async def ws_alerts(websocket: WebSocket):
-    await ws_manager.connect(websocket)
+async def ws_alerts(
+    websocket: WebSocket, token: Optional[str] = None, since: Optional[str] = None, snapshot: bool = False
+):
+    user_id = await run_in_threadpool(_user_id_for_token, token) if token else None
+    await ws_manager.connect(websocket, user_id=user_id)
     try:
+        if since or snapshot:
+            await _resume(websocket, user_id, since, snapshot)
         while True:
-            await websocket.receive_text()
+            parsed = _parse_subscribe(await websocket.receive_text(), user_id)
+            if parsed is None:
+                continue
+            request, error = parsed
+            if error is not None:
+                ws_manager.send_json(websocket, error)
+                continue
+            subscription = Subscription(
+                min_severity=request.min_severity,
+                categories=frozenset(request.categories),
+                platforms=frozenset(request.platforms),
+                assigned_to_me=request.assigned_to_me,
+            )
+            await ws_manager.subscribe(websocket, subscription)
+            ws_manager.send_json(websocket, {"type": "subscribed", "filters": subscription.as_dict()})
+            if request.since or request.snapshot:
+                await _resume(websocket, user_id, request.since, request.snapshot)
     except WebSocketDisconnect:
+        pass
+    finally:
         await ws_manager.disconnect(websocket)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -38,6 +38,12 @@ class AlertSummary(BaseModel):
     created_at: datetime
 
 
+class AlertQueueItem(AlertSummary):
+    priority: float
+    assigned_to: Optional[int]
+    platform: Optional[str]
+
+
 class AlertDetail(BaseModel):
     id: int
     status: str
@@ -48,6 +54,16 @@ class AlertDetail(BaseModel):
     analysis: Dict[str, Any]
 
 
+class AlertSubscribeRequest(BaseModel):
+    type: Literal["subscribe"]
+    min_severity: Optional[Literal["LOW", "MED", "HIGH", "CRITICAL"]] = None
+    categories: List[str] = Field(default_factory=list)
+    platforms: List[str] = Field(default_factory=list)
+    assigned_to_me: bool = False
+    since: Optional[str] = None
+    snapshot: bool = False
+
+
 class AlertPatchRequest(BaseModel):
     status: Optional[str] = None
     assigned_to: Optional[int] = None
@@ -59,6 +75,31 @@ class FeedbackRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class AlertBulkFilter(BaseModel):
+    status: Optional[str] = None
+    category: Optional[str] = None
+    severity: Optional[str] = None
+    assigned_to: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class AlertBulkPatchRequest(BaseModel):
+    # Targets are `ids`, `filter`, or both (intersection).
+    # At most ALERT_BULK_MAX (checked by bulk_update_alerts).
+    ids: Optional[List[int]] = None
+    filter: Optional[AlertBulkFilter] = None
+    status: Optional[str] = None
+    assigned_to: Optional[int] = None
+    feedback: Optional[FeedbackRequest] = None
+
+
+class AlertBulkPatchResponse(BaseModel):
+    updated: int
+    ids: List[int]
+    feedback_recorded: int = 0
+
+
 class IngestDemoRequest(BaseModel):
     platform: str = "demo"
     platform_post_id: str
@@ -71,7 +112,15 @@ class IngestDemoRequest(BaseModel):
 
 class ReplayStartRequest(BaseModel):
     speed: float = 1.0
-    limit: int = 100
+    limit: Optional[int] = None
+    file: Optional[str] = None
+    rate: Optional[float] = Field(default=None, gt=0)
+    pattern: Literal["constant", "poisson", "burst"] = "constant"
+    burst_size: int = Field(default=100, ge=1)
+    batch_size: Optional[int] = Field(default=None, ge=1, le=5000)
+    duration_sec: Optional[float] = Field(default=None, gt=0)
+    loops: int = Field(default=1, ge=1)
+    unique_ids: bool = False
 
 
 class TwitterStreamStartRequest(BaseModel):
@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import get_settings
+from app.db.models import Alert, Analysis, Post
+from app.schemas import AlertDetail
+
+
+def to_storage_url(path: str) -> str:
+    if not path:
+        return path
+    media_root = get_settings().media_root.rstrip("/")
+    if path.startswith(media_root):
+        rel = path[len(media_root) :].lstrip("/")
+        return f"/storage/{rel}"
+    return path
+
+
+def alert_etag(alert_id: int, updated_at: datetime) -> str:
+    # Every change to an alert (patch, feedback) bumps updated_at, so it versions the payload.
+    return f'"{alert_id}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def load_alert_detail(db: Session, alert_id: int) -> Optional[AlertDetail]:
+    # One round trip: alert -> analysis -> post -> media are joined and loaded together.
+    alert = (
+        db.query(Alert)
+        .options(joinedload(Alert.analysis).joinedload(Analysis.post).joinedload(Post.media_items))
+        .filter(Alert.id == alert_id)
+        .first()
+    )
+    if alert is None:
+        return None
+    analysis = alert.analysis
+    post = analysis.post
+    media_payload = []
+    for media in post.media_items:
+        meta = dict(media.meta_json or {})
+        media_payload.append(
+            {
+                "id": media.id,
+                "type": media.type,
+                "path": to_storage_url(media.path),
+                "meta_json": {
+                    **meta,
+                    "transcript_path": to_storage_url(meta.get("transcript_path", "")),
+                    "evidence_frames": [to_storage_url(p) for p in meta.get("evidence_frames", [])],
+                },
+            }
+        )
+    return AlertDetail(
+        id=alert.id,
+        status=alert.status.value,
+        assigned_to=alert.assigned_to,
+        created_at=alert.created_at,
+        updated_at=alert.updated_at,
+        post={
+            "id": post.id,
+            "platform": post.platform,
+            "platform_post_id": post.platform_post_id,
+            "url": post.url,
+            "author": post.author,
+            "text": post.text,
+            "lang": post.lang,
+            "raw_json": post.raw_json,
+            "media": media_payload,
+        },
+        analysis={
+            "id": analysis.id,
+            "text_probs": analysis.text_probs,
+            "video_score": analysis.video_score,
+            "audio_probs": analysis.audio_probs,
+            "fusion_score": analysis.fusion_score,
+            "severity": analysis.severity,
+            "category": analysis.category,
+            "explanation_json": analysis.explanation_json,
+            "model_versions": analysis.model_versions,
+            "is_partial": analysis.is_partial,
+            "timed_out_stages": analysis.timed_out_stages,
+        },
+    )
+
+
+class AlertDetailCache:
+    # Serialized detail bodies, LRU-bounded. An entry is only served while its
+    # updated_at still matches the row, so other replicas' writes make it stale too.
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[int, tuple[datetime, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, alert_id: int, updated_at: datetime) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(alert_id)
+            if entry is None or entry[0] != updated_at:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(alert_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, alert_id: int, updated_at: datetime, body: bytes) -> None:
+        max_entries = max(0, get_settings().alert_detail_cache_size)
+        with self._lock:
+            self._entries[alert_id] = (updated_at, body)
+            self._entries.move_to_end(alert_id)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *alert_ids: int) -> None:
+        with self._lock:
+            for alert_id in alert_ids:
+                self._entries.pop(alert_id, None)
+
+
+detail_cache = AlertDetailCache()
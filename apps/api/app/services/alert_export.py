@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, AlertStatus, Analysis, Post
+
+FORMATS = ("ndjson", "csv", "parquet")
+KINDS = ("alerts", "analyses")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# (output name, column, type). Types drive CSV/Parquet encoding; "json" values are
+# written as JSON text so every format has a flat, fixed schema.
+_COLUMNS = [
+    ("alert_id", Alert.id, "int"),
+    ("alert_status", Alert.status, "str"),
+    ("assigned_to", Alert.assigned_to, "int"),
+    ("alert_created_at", Alert.created_at, "datetime"),
+    ("alert_updated_at", Alert.updated_at, "datetime"),
+    ("analysis_id", Analysis.id, "int"),
+    ("category", Analysis.category, "str"),
+    ("severity", Analysis.severity, "str"),
+    ("fusion_score", Analysis.fusion_score, "float"),
+    ("text_probs", Analysis.text_probs, "json"),
+    ("video_score", Analysis.video_score, "float"),
+    ("audio_probs", Analysis.audio_probs, "json"),
+    ("is_partial", Analysis.is_partial, "bool"),
+    ("model_versions", Analysis.model_versions, "json"),
+    ("analysis_created_at", Analysis.created_at, "datetime"),
+    ("post_id", Post.id, "int"),
+    ("platform", Post.platform, "str"),
+    ("platform_post_id", Post.platform_post_id, "str"),
+    ("url", Post.url, "str"),
+    ("author", Post.author, "str"),
+    ("text", Post.text, "str"),
+    ("lang", Post.lang, "str"),
+    ("post_created_at", Post.created_at, "datetime"),
+]
+_RAW_COLUMN = ("raw_json", Post.raw_json, "json")
+
+
+@dataclass
+class ExportFilter:
+    kind: str = "alerts"
+    status: Optional[AlertStatus] = None
+    category: Optional[str] = None
+    severity: Optional[str] = None
+    platform: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    include_raw: bool = False
+
+
+def _columns(export_filter: ExportFilter) -> list[tuple[str, Any, str]]:
+    return _COLUMNS + [_RAW_COLUMN] if export_filter.include_raw else list(_COLUMNS)
+
+
+def export_rows(db: Session, export_filter: ExportFilter, batch_size: int = 2000) -> Iterator[dict]:
+    # yield_per streams through a server-side cursor on Postgres (stream_results), so
+    # only `batch_size` rows are in memory however large the extract is.
+    columns = _columns(export_filter)
+    query = db.query(*[column for _, column, _ in columns]).select_from(Analysis).join(Post, Post.id == Analysis.post_id)
+    if export_filter.kind == "alerts":
+        query = query.join(Alert, Alert.analysis_id == Analysis.id)
+        created = Alert.created_at
+        order = (Alert.created_at, Alert.id)
+    else:
+        # Every analysis, alerted or not (retraining needs the negatives too).
+        query = query.outerjoin(Alert, Alert.analysis_id == Analysis.id)
+        created = Analysis.created_at
+        order = (Analysis.created_at, Analysis.id)
+    if export_filter.status is not None:
+        query = query.filter(Alert.status == export_filter.status)
+    if export_filter.category:
+        query = query.filter(Analysis.category == export_filter.category)
+    if export_filter.severity:
+        query = query.filter(Analysis.severity == export_filter.severity)
+    if export_filter.platform:
+        query = query.filter(Post.platform == export_filter.platform)
+    if export_filter.created_from is not None:
+        query = query.filter(created >= export_filter.created_from)
+    if export_filter.created_to is not None:
+        query = query.filter(created < export_filter.created_to)
+    names = [name for name, _, _ in columns]
+    for row in query.order_by(*order).yield_per(batch_size):
+        yield dict(zip(names, row))
+
+
+def _flat(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == "json":
+        return json.dumps(value, ensure_ascii=False)
+    if kind == "str" and isinstance(value, AlertStatus):
+        return value.value
+    if kind == "datetime":
+        return value.isoformat()
+    return value
+
+
+def _flatten(row: dict, columns: list[tuple[str, Any, str]]) -> dict:
+    return {name: _flat(row[name], kind) for name, _, kind in columns}
+
+
+def ndjson_chunks(rows: Iterable[dict], columns: list[tuple[str, Any, str]], batch_size: int) -> Iterator[bytes]:
+    lines: list[str] = []
+    for row in rows:
+        lines.append(json.dumps(_flatten(row, columns), ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def csv_chunks(rows: Iterable[dict], columns: list[tuple[str, Any, str]], batch_size: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[name for name, _, _ in columns])
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(_flatten(row, columns))
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    # File-like target for ParquetWriter whose bytes we hand out as they are written.
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def parquet_chunks(rows: Iterable[dict], columns: list[tuple[str, Any, str]], batch_size: int) -> Iterator[bytes]:
+    # Each batch becomes one row group, written and flushed before the next is read.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "str": pa.string(),
+        "json": pa.string(),
+        "datetime": pa.timestamp("us"),
+    }
+    schema = pa.schema([(name, arrow_types[kind]) for name, _, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def flush(batch: list[dict]) -> bytes:
+        data = {
+            name: [row[name] if kind == "datetime" else _flat(row[name], kind) for row in batch]
+            for name, _, kind in columns
+        }
+        writer.write_table(pa.table(data, schema=schema))
+        return sink.drain()
+
+    batch: list[dict] = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield flush(batch)
+                batch = []
+        if batch:
+            yield flush(batch)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_WRITERS: dict[str, Callable[..., Iterator[bytes]]] = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "parquet": parquet_chunks,
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_chunks(
+    db_factory: Callable[[], Session], export_filter: ExportFilter, fmt: str, batch_size: int = 2000
+) -> Iterator[bytes]:
+    # Owns its session: a streamed response outlives the request's dependencies.
+    db = db_factory()
+    try:
+        rows = export_rows(db, export_filter, batch_size)
+        yield from _WRITERS[fmt](rows, _columns(export_filter), batch_size)
+    finally:
+        db.close()
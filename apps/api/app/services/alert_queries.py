@@ -0,0 +1,93 @@
+import base64
+import binascii
+import re
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import column, false, func, literal_column, or_, table, tuple_
+from sqlalchemy.orm import Query
+
+from app.db.models import Alert, AlertStatus, Post
+from app.db.search import POSTS_FTS_TABLE, POSTS_TSV_SQL
+
+_FTS_TOKEN = re.compile(r'[^\s"]+')
+
+
+def encode_cursor(created_at: datetime, alert_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{alert_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    # Opaque to clients; raises ValueError for anything we did not issue.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, _, alert_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), int(alert_id)
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def filter_alerts(
+    query: Query,
+    status: Optional[AlertStatus] = None,
+    category: Optional[str] = None,
+    severity: Optional[str] = None,
+) -> Query:
+    # Filters use the columns denormalized onto alerts so the composite
+    # (…, created_at, id) indexes can serve both the filter and the order.
+    if status is not None:
+        query = query.filter(Alert.status == status)
+    if category:
+        query = query.filter(Alert.category == category)
+    if severity:
+        query = query.filter(Alert.severity == severity)
+    return query
+
+
+def keyset_page(query: Query, cursor: Optional[str], limit: int) -> Query:
+    # Newest first. The row-value comparison seeks straight to the cursor in the
+    # index, so page 10,000 costs the same as page 1 (OFFSET scans every skipped row).
+    if cursor:
+        created_at, alert_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Alert.created_at, Alert.id) < (created_at, alert_id))
+    # One extra row tells us whether there is a next page.
+    return query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1)
+
+
+def fts5_match_query(q: str) -> str:
+    # Every word must match, each as a prefix. Quoting keeps FTS5 operators in user
+    # input (AND, NEAR, -, *) from being interpreted.
+    return " ".join(f'"{token}"*' for token in _FTS_TOKEN.findall(q))
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_alerts(query: Query, q: str, dialect: str) -> Query:
+    # Joins posts, keeps alerts whose post matches `q` and orders them by relevance,
+    # newest first among equals. Each branch uses the indexes from app.db.search.
+    query = query.join(Post, Post.id == Alert.post_id)
+    newest = (Alert.created_at.desc(), Alert.id.desc())
+    if dialect == "sqlite":
+        match = fts5_match_query(q)
+        if not match:
+            return query.filter(false())
+        fts = table(POSTS_FTS_TABLE, column("rowid"))
+        query = query.join(fts, fts.c.rowid == Post.id).filter(literal_column(POSTS_FTS_TABLE).op("MATCH")(match))
+        # bm25() is lower-is-better.
+        return query.order_by(func.bm25(literal_column(POSTS_FTS_TABLE)), *newest)
+
+    pattern = _like_pattern(q)
+    substring = or_(Post.text.ilike(pattern, escape="\\"), Post.author.ilike(pattern, escape="\\"))
+    if dialect == "postgresql":
+        # The document expression must match the index expression text exactly.
+        document = literal_column(POSTS_TSV_SQL)
+        tsquery = func.websearch_to_tsquery(literal_column("'simple'"), q)
+        matched = or_(document.op("@@")(tsquery), substring, Post.platform == q.strip().lower())
+        rank = func.ts_rank_cd(document, tsquery) + func.similarity(func.coalesce(Post.author, ""), q)
+        return query.filter(matched).order_by(rank.desc(), *newest)
+
+    return query.filter(or_(substring, Post.platform == q.strip().lower())).order_by(*newest)
@@ -0,0 +1,175 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, AlertCounter, AlertStatus, Post
+
+# Facet rows are not time-bucketed; they all live in this one bucket.
+ALL_TIME = datetime(1970, 1, 1)
+FACETS = ("status", "severity", "category", "platform")
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+MAX_TREND_BUCKETS = 24 * 31
+# Session.info key for counter deltas waiting for the transaction to commit.
+_PENDING_DELTAS = "alert_counter_deltas"
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _created_deltas(status: str, severity: str, category: str, platform: Optional[str], created_at: datetime) -> Counter:
+    deltas: Counter = Counter()
+    facet_values = {"status": status, "severity": severity, "category": category, "platform": platform or "unknown"}
+    for dimension, value in facet_values.items():
+        deltas[(dimension, value, ALL_TIME)] += 1
+    for granularity in GRANULARITIES:
+        deltas[(granularity, severity, bucket_start(created_at, granularity))] += 1
+    return deltas
+
+
+def apply_counter_deltas(db: Session, deltas: Counter) -> None:
+    # Counters commit (or roll back) together with the alert change, but the upsert only
+    # runs when the transaction commits: every new alert bumps the same ("status", "new")
+    # row, and taking that row lock early would serialize workers for their whole
+    # transaction instead of just the commit.
+    if not db.in_transaction():
+        # Tie the deltas to a transaction so a rollback discards them.
+        db.begin()
+    db.info.setdefault(_PENDING_DELTAS, Counter()).update(deltas)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_deltas(session: Session) -> None:
+    deltas = session.info.pop(_PENDING_DELTAS, None)
+    if deltas:
+        _upsert_counters(session, deltas)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_pending_deltas(session: Session, _previous_transaction) -> None:
+    session.info.pop(_PENDING_DELTAS, None)
+
+
+def _upsert_counters(db: Session, deltas: Counter) -> None:
+    # Rows are written in key order to keep lock order stable between concurrent workers.
+    rows = [
+        {"dimension": dimension, "value": value, "bucket_start": bucket, "count": delta}
+        for (dimension, value, bucket), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in {"postgresql", "sqlite"}:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(AlertCounter)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["dimension", "value", "bucket_start"],
+            set_={"count": AlertCounter.count + stmt.excluded.count},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        counter = (
+            db.query(AlertCounter)
+            .filter_by(dimension=row["dimension"], value=row["value"], bucket_start=row["bucket_start"])
+            .with_for_update()
+            .first()
+        )
+        if counter is None:
+            db.add(AlertCounter(**row))
+        else:
+            counter.count += row["count"]
+    db.flush()
+
+
+def record_alert_created(db: Session, alert: Alert, platform: Optional[str]) -> None:
+    apply_counter_deltas(
+        db, _created_deltas(alert.status.value, alert.severity, alert.category, platform, alert.created_at)
+    )
+
+
+def record_status_changes(db: Session, changes: list[tuple[AlertStatus, AlertStatus]]) -> None:
+    deltas: Counter = Counter()
+    for old, new in changes:
+        if old != new:
+            deltas[("status", old.value, ALL_TIME)] -= 1
+            deltas[("status", new.value, ALL_TIME)] += 1
+    apply_counter_deltas(db, deltas)
+
+
+def _alert_facets(db: Session, *criteria):
+    return (
+        db.query(Alert.status, Alert.severity, Alert.category, Post.platform, Alert.created_at)
+        .join(Post, Post.id == Alert.post_id)
+        .filter(*criteria)
+        .yield_per(5000)
+    )
+
+
+def record_alerts_removed(db: Session, *criteria) -> None:
+    # Counters count the alerts still in the database, which is also what a rebuild
+    # recounts; alerts deleted in bulk (archival) are subtracted in the same transaction.
+    deltas: Counter = Counter()
+    for status, severity, category, platform, created_at in _alert_facets(db, *criteria):
+        deltas.subtract(_created_deltas(status.value, severity, category, platform, created_at))
+    apply_counter_deltas(db, deltas)
+
+
+def rebuild_alert_counters(db: Session) -> int:
+    # One-off backfill for databases that already had alerts: recount from scratch.
+    db.info.pop(_PENDING_DELTAS, None)
+    db.query(AlertCounter).delete()
+    deltas: Counter = Counter()
+    total = 0
+    for status, severity, category, platform, created_at in _alert_facets(db):
+        deltas.update(_created_deltas(status.value, severity, category, platform, created_at))
+        total += 1
+    _upsert_counters(db, deltas)
+    db.commit()
+    return total
+
+
+def alert_stats(db: Session, granularity: str = "hour", buckets: int = 24, now: Optional[datetime] = None) -> dict:
+    # Reads only counter rows: the facet rows plus `buckets` trend rows per severity,
+    # independent of how many alerts exist.
+    step = GRANULARITIES[granularity]
+    buckets = max(1, min(buckets, MAX_TREND_BUCKETS))
+    last = bucket_start(now or datetime.utcnow(), granularity)
+    first = last - step * (buckets - 1)
+
+    facets: dict[str, dict[str, int]] = {facet: {} for facet in FACETS}
+    for dimension, value, count in db.query(AlertCounter.dimension, AlertCounter.value, AlertCounter.count).filter(
+        AlertCounter.bucket_start == ALL_TIME, AlertCounter.dimension.in_(FACETS)
+    ):
+        if count:
+            facets[dimension][value] = count
+
+    series: dict[datetime, dict[str, int]] = defaultdict(dict)
+    trend_rows = db.query(AlertCounter.bucket_start, AlertCounter.value, AlertCounter.count).filter(
+        AlertCounter.dimension == granularity,
+        AlertCounter.bucket_start >= first,
+        AlertCounter.bucket_start <= last,
+    )
+    for start, severity, count in trend_rows:
+        series[start][severity] = count
+    trend = []
+    for i in range(buckets):
+        start = first + step * i
+        counts = series.get(start, {})
+        trend.append({"start": start.isoformat(), "counts": counts, "total": sum(counts.values())})
+
+    return {
+        "total": sum(facets["status"].values()),
+        "by_status": facets["status"],
+        "by_severity": facets["severity"],
+        "by_category": facets["category"],
+        "by_platform": facets["platform"],
+        "trend": {"granularity": granularity, "buckets": trend},
+    }
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+import redis.asyncio as aioredis
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.db.models import Alert, AlertStatus, Analysis, Post
+from app.db.session import SessionLocal
+from app.services.event_bus import read_alerts_since, stream_bounds, stream_id_key
+from app.services.ws_manager import SEVERITY_LEVELS, Subscription
+
+OPEN_STATUSES = (AlertStatus.NEW, AlertStatus.INVESTIGATING)
+SNAPSHOT_COLUMNS = ("id", "post_id", "category", "severity", "fusion_score", "status", "platform", "assigned_to", "created_at")
+
+_snapshot_cache: Dict[tuple, tuple[float, dict]] = {}
+_snapshot_inflight: Dict[tuple, asyncio.Task] = {}
+
+
+async def replay_since(since: str, limit: int, client: Optional[aioredis.Redis] = None) -> Optional[list[dict]]:
+    # None means the stream can no longer cover the cursor: it was trimmed past it,
+    # is malformed, or more than `limit` alerts were missed. The client must resync.
+    try:
+        since_key = stream_id_key(since)
+    except ValueError:
+        return None
+    first_id, _ = await stream_bounds(client)
+    if first_id is not None and since_key < stream_id_key(first_id):
+        return None
+    replayed: list[dict] = []
+    cursor = since
+    while True:
+        batch = await read_alerts_since(cursor, count=min(500, limit + 1), client=client)
+        replayed.extend(batch)
+        if len(replayed) > limit:
+            return None
+        if len(batch) < min(500, limit + 1):
+            return replayed
+        cursor = batch[-1]["event_id"]
+
+
+def _query_snapshot(subscription: Subscription, user_id: Optional[int], limit: int) -> tuple[list[list], bool]:
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Alert, Analysis.fusion_score, Post.platform)
+            .join(Analysis, Analysis.id == Alert.analysis_id)
+            .join(Post, Post.id == Alert.post_id)
+            .filter(Alert.status.in_(OPEN_STATUSES))
+        )
+        # The alert's own copies, which the ix_alerts_status_* indexes cover.
+        if subscription.min_severity in SEVERITY_LEVELS:
+            query = query.filter(Alert.severity.in_(SEVERITY_LEVELS[SEVERITY_LEVELS.index(subscription.min_severity) :]))
+        if subscription.categories:
+            query = query.filter(Alert.category.in_(subscription.categories))
+        if subscription.platforms:
+            # Same comparison as normalize_platform, so the snapshot and live alerts agree.
+            query = query.filter(func.lower(func.trim(Post.platform)).in_(subscription.platforms))
+        if subscription.assigned_to_me:
+            query = query.filter(Alert.assigned_to == user_id)
+        rows = query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1).all()
+    finally:
+        db.close()
+    compact = [
+        [
+            alert.id,
+            alert.post_id,
+            alert.category,
+            alert.severity,
+            fusion_score,
+            alert.status.value,
+            platform,
+            alert.assigned_to,
+            alert.created_at.isoformat(),
+        ]
+        for alert, fusion_score, platform in rows[:limit]
+    ]
+    return compact, len(rows) > limit
+
+
+async def _load_snapshot(subscription: Subscription, user_id: Optional[int], client: Optional[aioredis.Redis]) -> dict:
+    # Read the cursor before the rows: anything newer is replayed after the snapshot,
+    # so an alert may arrive twice (clients upsert by id) but never goes missing.
+    _, cursor = await stream_bounds(client)
+    rows, truncated = await run_in_threadpool(_query_snapshot, subscription, user_id, get_settings().ws_snapshot_limit)
+    return {
+        "type": "snapshot",
+        "cursor": cursor,
+        "columns": list(SNAPSHOT_COLUMNS),
+        "rows": rows,
+        "truncated": truncated,
+    }
+
+
+async def open_alerts_snapshot(
+    subscription: Subscription, user_id: Optional[int], client: Optional[aioredis.Redis] = None
+) -> dict:
+    # After a deploy every dashboard reconnects at once. Identical requests within the
+    # TTL share one result, and concurrent misses wait on a single query.
+    key = (subscription, user_id if subscription.assigned_to_me else None)
+    now = time.monotonic()
+    cached = _snapshot_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    task = _snapshot_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load_snapshot(subscription, user_id, client))
+        _snapshot_inflight[key] = task
+        task.add_done_callback(lambda _: _snapshot_inflight.pop(key, None))
+    snapshot = await asyncio.shield(task)
+    for stale in [k for k, (expires, _) in _snapshot_cache.items() if expires <= now]:
+        _snapshot_cache.pop(stale, None)
+    _snapshot_cache[key] = (time.monotonic() + get_settings().ws_snapshot_ttl_sec, snapshot)
+    return snapshot
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, AlertStatus, Feedback, Post
+from app.schemas import AlertBulkFilter
+from app.services.alert_queries import filter_alerts
+from app.services.alert_stats import record_status_changes
+
+
+class BulkLimitExceeded(Exception):
+    def __init__(self, matched: int, limit: int) -> None:
+        super().__init__(f"{matched} alerts match; at most {limit} can be changed at once")
+        self.matched = matched
+        self.limit = limit
+
+
+def _targets(ids: Optional[list[int]], alert_filter: Optional[AlertBulkFilter], limit: int):
+    stmt = select(Alert.id, Alert.status, Post.platform).join(Post, Post.id == Alert.post_id)
+    if ids:
+        stmt = stmt.where(Alert.id.in_(ids))
+    if alert_filter is not None:
+        status = AlertStatus(alert_filter.status) if alert_filter.status else None
+        stmt = filter_alerts(stmt, status, alert_filter.category, alert_filter.severity)
+        if alert_filter.assigned_to is not None:
+            stmt = stmt.where(Alert.assigned_to == alert_filter.assigned_to)
+        if alert_filter.created_from is not None:
+            stmt = stmt.where(Alert.created_at >= alert_filter.created_from)
+        if alert_filter.created_to is not None:
+            stmt = stmt.where(Alert.created_at < alert_filter.created_to)
+    # Lock the targets so the status counters see the same "before" values the UPDATE replaces.
+    # One row past the limit is enough to refuse the request.
+    return stmt.limit(limit + 1).with_for_update(of=Alert)
+
+
+def bulk_update_alerts(
+    db: Session,
+    ids: Optional[list[int]],
+    alert_filter: Optional[AlertBulkFilter],
+    status: Optional[AlertStatus],
+    assigned_to: Optional[int],
+    limit: int,
+    feedback: Optional[Dict[str, Any]] = None,
+) -> tuple[list[Dict[str, Any]], int]:
+    # Returns the changed alerts (fields WebSocket filters route on) and the number of
+    # feedback rows written. The caller commits.
+    if ids is not None and len(set(ids)) > limit:
+        # Refused before the ids reach an IN (...) list.
+        raise BulkLimitExceeded(len(set(ids)), limit)
+    rows = db.execute(_targets(ids, alert_filter, limit))
+    targets = {alert_id: (old_status, platform) for alert_id, old_status, platform in rows}
+    if len(targets) > limit:
+        raise BulkLimitExceeded(len(targets), limit)
+    if not targets:
+        return [], 0
+
+    values: Dict[str, Any] = {"updated_at": datetime.utcnow()}
+    if status is not None:
+        values["status"] = status
+    if assigned_to is not None:
+        values["assigned_to"] = assigned_to
+    stmt = (
+        update(Alert)
+        .where(Alert.id.in_(list(targets)))
+        .values(**values)
+        .returning(Alert.id, Alert.status, Alert.assigned_to, Alert.category, Alert.severity)
+        .execution_options(synchronize_session=False)
+    )
+    changed = db.execute(stmt).all()
+
+    record_status_changes(db, [(targets[row.id][0], row.status) for row in changed])
+    recorded = 0
+    if feedback is not None:
+        rows = [{**feedback, "alert_id": row.id, "created_at": values["updated_at"]} for row in changed]
+        db.execute(insert(Feedback), rows)
+        recorded = len(rows)
+
+    items = [
+        {
+            "id": row.id,
+            "status": row.status.value,
+            "assigned_to": row.assigned_to,
+            "category": row.category,
+            "severity": row.severity,
+            "platform": targets[row.id][1],
+        }
+        for row in changed
+    ]
+    return sorted(items, key=lambda item: item["id"]), recorded
@@ -1,11 +1,18 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+import redis
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db.models import Alert, AlertStatus, Analysis, Post
+from app.services.alert_stats import record_alert_created
 from app.services.event_bus import publish_alert
+from app.services.workqueue import alert_priority
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_BULK_UPDATED = "bulk_updated"
 
 
 def maybe_create_alert(db: Session, post: Post, analysis: Analysis) -> Optional[Alert]:
@@ -13,27 +20,55 @@ def maybe_create_alert(db: Session, post: Post, analysis: Analysis) -> Optional[
     if analysis.fusion_score < settings.alert_threshold:
         return None
 
+    now = datetime.utcnow()
     alert = Alert(
         post_id=post.id,
         analysis_id=analysis.id,
         status=AlertStatus.NEW,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        category=analysis.category,
+        severity=analysis.severity,
+        priority=alert_priority(analysis.severity, analysis.fusion_score, now),
+        created_at=now,
+        updated_at=now,
     )
     db.add(alert)
+    db.flush()
+    record_alert_created(db, alert, post.platform)
     db.commit()
     db.refresh(alert)
-    publish_alert(alert_summary(alert, analysis))
+    publish_alert(alert_summary(alert, analysis, post.platform))
     return alert
 
 
-def alert_summary(alert: Alert, analysis: Analysis) -> Dict[str, Any]:
+def publish_alert_updated(alert: Alert, analysis: Analysis, platform: Optional[str]) -> None:
+    # The update is already committed; a Redis outage only costs live subscribers a refresh.
+    try:
+        publish_alert(alert_summary(alert, analysis, platform, event=EVENT_UPDATED))
+    except redis.RedisError:
+        pass
+
+
+def publish_alerts_bulk_updated(items: list[Dict[str, Any]], changes: Dict[str, Any]) -> None:
+    # One stream entry for the whole batch. Each item carries the fields WebSocket
+    # subscriptions filter on, so the fan-out can still route per alert.
+    try:
+        publish_alert({"event": EVENT_BULK_UPDATED, **changes, "alerts": items})
+    except redis.RedisError:
+        pass
+
+
+def alert_summary(
+    alert: Alert, analysis: Analysis, platform: Optional[str] = None, event: str = EVENT_CREATED
+) -> Dict[str, Any]:
     return {
+        "event": event,
         "id": alert.id,
         "post_id": alert.post_id,
         "category": analysis.category,
         "severity": analysis.severity,
         "fusion_score": analysis.fusion_score,
         "status": alert.status.value,
+        "platform": platform,
+        "assigned_to": alert.assigned_to,
         "created_at": alert.created_at.isoformat(),
     }
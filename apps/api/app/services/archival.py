@@ -0,0 +1,152 @@
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, Table, delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Alert, AlertStatus, Analysis, Feedback, IngestedFile, Media, Post
+from app.services.alert_stats import record_alerts_removed
+
+# Parents before children for writing; deletes run in the reverse order.
+ARCHIVED_TABLES: list[Table] = [t.__table__ for t in (Post, Media, Analysis, Alert, Feedback)]
+
+
+@dataclass
+class ArchiveResult:
+    months: list[str] = field(default_factory=list)
+    rows: dict[str, int] = field(default_factory=dict)
+    files: list[Path] = field(default_factory=list)
+
+
+def archive_root() -> Path:
+    return Path(get_settings().archive_root)
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def archive_cutoff(now: Optional[datetime] = None, after_days: Optional[int] = None) -> datetime:
+    # Only whole months that ended more than ARCHIVE_AFTER_DAYS ago are cold.
+    days = get_settings().archive_after_days if after_days is None else after_days
+    return month_start((now or datetime.utcnow()) - timedelta(days=days))
+
+
+def _arrow_column(column) -> tuple[Any, str]:
+    import pyarrow as pa
+
+    if isinstance(column.type, Boolean):
+        return pa.bool_(), "plain"
+    if isinstance(column.type, Integer):
+        return pa.int64(), "plain"
+    if isinstance(column.type, Float):
+        return pa.float64(), "plain"
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us"), "plain"
+    if isinstance(column.type, JSON):
+        # Same convention as exports: JSON documents are stored as JSON text.
+        return pa.string(), "json"
+    return pa.string(), "str"
+
+
+def _cell(value: Any, kind: str) -> Any:
+    if value is None or kind == "plain":
+        return value
+    if kind == "json":
+        return json.dumps(value, ensure_ascii=False)
+    return value.value if isinstance(value, Enum) else value
+
+
+def _write_parquet(table: Table, rows: list[dict], path: Path) -> None:
+    # Written beside the target and renamed into place, so a crash never leaves a
+    # truncated part file. Re-running a batch overwrites the same name.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = [(column.name, *_arrow_column(column)) for column in table.columns]
+    schema = pa.schema([(name, arrow_type) for name, arrow_type, _ in columns])
+    data = {name: [_cell(row[name], kind) for row in rows] for name, _, kind in columns}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.table(data, schema=schema), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def _row_filter(table: Table, post_ids: list[int]):
+    if table is Feedback.__table__:
+        return Feedback.alert_id.in_(select(Alert.id).where(Alert.post_id.in_(post_ids)))
+    if table is Post.__table__:
+        return Post.id.in_(post_ids)
+    return table.c.post_id.in_(post_ids)
+
+
+def _cold_post_batch(db: Session, start: datetime, end: datetime, after: Optional[tuple], limit: int) -> list[tuple]:
+    # Posts whose alerts are all resolved (or that never alerted). Anything still being
+    # worked on stays in the hot tables whatever its age, so batches seek past it.
+    open_alert = select(Alert.id).where(Alert.post_id == Post.id, Alert.status != AlertStatus.RESOLVED).exists()
+    query = db.query(Post.created_at, Post.id).filter(Post.created_at >= start, Post.created_at < end, ~open_alert)
+    if after is not None:
+        query = query.filter(tuple_(Post.created_at, Post.id) > after)
+    return query.order_by(Post.created_at, Post.id).limit(limit).all()
+
+
+def archive_month(
+    db: Session, start: datetime, batch_size: Optional[int] = None, result: Optional[ArchiveResult] = None
+) -> ArchiveResult:
+    # Moves one month of cold posts, with their media rows, analyses, alerts and feedback,
+    # into hive-style Parquet parts: <archive>/<table>/month=YYYY-MM/part-<first post id>.parquet.
+    # Each batch is written and renamed into place before its rows are deleted and committed.
+    result = result or ArchiveResult()
+    batch_size = batch_size or get_settings().archive_batch_size
+    end = next_month(start)
+    label = f"{start:%Y-%m}"
+    after: Optional[tuple] = None
+    while True:
+        batch = _cold_post_batch(db, start, end, after, batch_size)
+        if not batch:
+            break
+        after = tuple(batch[-1])
+        post_ids = [post_id for _, post_id in batch]
+        for table in ARCHIVED_TABLES:
+            rows = db.execute(select(table).where(_row_filter(table, post_ids))).mappings().all()
+            if not rows:
+                continue
+            path = archive_root() / table.name / f"month={label}" / f"part-{post_ids[0]:012d}.parquet"
+            _write_parquet(table, rows, path)
+            result.files.append(path)
+            result.rows[table.name] = result.rows.get(table.name, 0) + len(rows)
+        # Counters describe the alerts in the database, so archived ones leave them too.
+        record_alerts_removed(db, Alert.post_id.in_(post_ids))
+        # The ingest ledger keeps its dedup entry but no longer points at a hot post.
+        db.execute(update(IngestedFile).where(IngestedFile.post_id.in_(post_ids)).values(post_id=None))
+        for table in reversed(ARCHIVED_TABLES):
+            db.execute(delete(table).where(_row_filter(table, post_ids)))
+        db.commit()
+        if label not in result.months:
+            result.months.append(label)
+    return result
+
+
+def archive_cold_data(
+    db: Session, now: Optional[datetime] = None, after_days: Optional[int] = None, batch_size: Optional[int] = None
+) -> ArchiveResult:
+    result = ArchiveResult()
+    cutoff = archive_cutoff(now, after_days)
+    oldest = db.query(func.min(Post.created_at)).filter(Post.created_at < cutoff).scalar()
+    if oldest is None:
+        return result
+    start = month_start(oldest)
+    while start < cutoff:
+        archive_month(db, start, batch_size, result)
+        start = next_month(start)
+    return result
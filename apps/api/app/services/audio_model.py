@@ -1,9 +1,10 @@
 import json
 import subprocess
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from app.core.config import get_settings
+from app.services.deadline import Deadline
 from app.services.language import detect_lang
 from app.services.text_model import get_text_model
 
@@ -21,9 +22,12 @@ class AudioModel:
         except Exception:
             return None
 
-    def extract_audio(self, video_path: str, out_wav: str) -> bool:
+    def extract_audio(self, video_path: str, out_wav: str, timeout: Optional[float] = None) -> bool:
         cmd = ["ffmpeg", "-y", "-i", video_path, "-vn", "-ac", "1", "-ar", "16000", out_wav]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False
         return proc.returncode == 0
 
     def transcribe(self, wav_path: str) -> str:
@@ -35,17 +39,29 @@ class AudioModel:
         except Exception:
             return ""
 
-    def analyze_video_audio(self, video_path: str, work_dir: str) -> Dict:
+    def analyze_video_audio(self, video_path: str, work_dir: str, deadline: Optional[Deadline] = None) -> Dict:
         work = Path(work_dir)
         work.mkdir(parents=True, exist_ok=True)
         wav_path = work / "audio.wav"
         transcript_path = work / "transcript.json"
 
         transcript = ""
-        if self.extract_audio(video_path, str(wav_path)):
-            transcript = self.transcribe(str(wav_path))
+        timed_out = deadline is not None and deadline.expired()
+        if not timed_out:
+            timeout = deadline.timeout() if deadline is not None else None
+            extracted = self.extract_audio(video_path, str(wav_path), timeout=timeout)
+            # Whisper cannot be interrupted, so only start it while budget remains.
+            timed_out = deadline is not None and deadline.expired()
+            if extracted and not timed_out:
+                transcript = self.transcribe(str(wav_path))
+        if timed_out:
+            deadline.mark_timed_out("audio")
         lang = detect_lang(transcript)
         probs = get_text_model().predict(transcript, lang) if transcript else {}
 
         transcript_path.write_text(json.dumps({"transcript": transcript, "lang": lang}, ensure_ascii=False), encoding="utf-8")
-        return {"transcript": transcript, "audio_probs": probs, "transcript_path": str(transcript_path)}
+        return {
+            "transcript": transcript,
+            "audio_probs": probs,
+            "transcript_path": str(transcript_path),
+        }
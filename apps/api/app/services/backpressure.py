@@ -0,0 +1,218 @@
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import redis
+from celery import group
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Alert, Post
+from app.services.keyword_prefilter import get_prefilter
+from app.workers.tasks import analyze_post_task
+
+CELERY_QUEUE = "celery"
+DEFERRED_KEY = "ingest:deferred"
+METRICS_KEY = "ingest:shed:metrics"
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+LEVEL_OK = "ok"
+LEVEL_HIGH = "high"
+LEVEL_CRITICAL = "critical"
+
+DECISION_ADMIT = "admit"
+DECISION_DEFER = "defer"
+DECISION_SHED = "shed"
+
+_STATE_TTL_SEC = 1.0
+
+_client: Optional[redis.Redis] = None
+_cached_state: Optional["QueueState"] = None
+_cached_at = 0.0
+
+
+@dataclass
+class QueueState:
+    depth: int
+    oldest_age_sec: float
+    level: str
+
+
+def _redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _client
+
+
+def _oldest_message_age(client: redis.Redis, now: float) -> float:
+    # Kombu LPUSHes and BRPOPs, so the oldest pending message sits at the tail.
+    raw = client.lindex(CELERY_QUEUE, -1)
+    if not raw:
+        return 0.0
+    try:
+        enqueued_at = float(json.loads(raw).get("headers", {}).get("enqueued_at") or now)
+    except (ValueError, TypeError, AttributeError):
+        return 0.0
+    return max(0.0, now - enqueued_at)
+
+
+def _level(depth: int, age_sec: float) -> str:
+    settings = get_settings()
+    if depth >= settings.ingest_queue_critical_watermark or age_sec >= settings.ingest_queue_critical_age_sec:
+        return LEVEL_CRITICAL
+    if depth >= settings.ingest_queue_high_watermark or age_sec >= settings.ingest_queue_max_age_sec:
+        return LEVEL_HIGH
+    return LEVEL_OK
+
+
+def queue_state(refresh: bool = False) -> QueueState:
+    global _cached_state, _cached_at
+    now = time.time()
+    if not refresh and _cached_state is not None and now - _cached_at < _STATE_TTL_SEC:
+        return _cached_state
+    try:
+        client = _redis()
+        depth = int(client.llen(CELERY_QUEUE))
+        age = _oldest_message_age(client, now)
+        state = QueueState(depth=depth, oldest_age_sec=round(age, 1), level=_level(depth, age))
+    except redis.RedisError:
+        # Fail open: without broker visibility we do not shed anything.
+        state = QueueState(depth=-1, oldest_age_sec=0.0, level=LEVEL_OK)
+    _cached_state, _cached_at = state, now
+    return state
+
+
+def post_priority(db: Session, post: Post) -> str:
+    matched, _ = get_prefilter().match(post.text or "")
+    if matched:
+        return PRIORITY_HIGH
+    if post.author:
+        prior_alert = (
+            db.query(Alert.id)
+            .join(Post, Post.id == Alert.post_id)
+            .filter(Post.platform == post.platform, Post.author == post.author, Post.id != post.id)
+            .first()
+        )
+        if prior_alert:
+            return PRIORITY_HIGH
+    if (post.platform or "").lower() in get_settings().ingest_priority_sources_list:
+        return PRIORITY_NORMAL
+    return PRIORITY_LOW
+
+
+def _decide(level: str, priority: str) -> str:
+    if level == LEVEL_OK or priority == PRIORITY_HIGH:
+        return DECISION_ADMIT
+    if level == LEVEL_HIGH:
+        return DECISION_ADMIT if priority == PRIORITY_NORMAL else DECISION_DEFER
+    if priority == PRIORITY_NORMAL:
+        return DECISION_DEFER
+    if random.random() < get_settings().ingest_low_priority_sample_rate:
+        return DECISION_ADMIT
+    return DECISION_SHED
+
+
+def _record(*outcomes: tuple[str, str]) -> None:
+    try:
+        pipe = _redis().pipeline()
+        for decision, priority in outcomes:
+            pipe.hincrby(METRICS_KEY, decision, 1)
+            pipe.hincrby(METRICS_KEY, f"{decision}:{priority}", 1)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def send_to_queue(post_id: int) -> None:
+    analyze_post_task.apply_async(args=[post_id], headers={"enqueued_at": time.time()})
+
+
+def drain_deferred(limit: Optional[int] = None) -> int:
+    limit = limit if limit is not None else get_settings().ingest_deferred_drain_batch
+    if limit <= 0:
+        return 0
+    try:
+        client = _redis()
+        # One round trip for the whole batch (LPOP with a count, Redis 6.2+).
+        post_ids = client.lpop(DEFERRED_KEY, limit) or []
+        if post_ids:
+            headers = {"enqueued_at": time.time()}
+            group(analyze_post_task.signature((int(post_id),), headers=headers) for post_id in post_ids).apply_async()
+            client.hincrby(METRICS_KEY, "drained", len(post_ids))
+    except redis.RedisError:
+        return 0
+    return len(post_ids)
+
+
+def drain_deferred_if_ok() -> int:
+    # Runs on a timer rather than on admission, so deferred posts drain once the queue
+    # recovers even if nothing new arrives, and admitting a post costs no extra LPOP.
+    if queue_state(refresh=True).level != LEVEL_OK:
+        return 0
+    return drain_deferred()
+
+
+def enqueue_analysis(db: Session, post: Post) -> str:
+    state = queue_state()
+    if state.level == LEVEL_OK:
+        send_to_queue(post.id)
+        _record((DECISION_ADMIT, "unranked"))
+        return DECISION_ADMIT
+
+    priority = post_priority(db, post)
+    decision = _decide(state.level, priority)
+    if decision == DECISION_DEFER:
+        try:
+            _redis().rpush(DEFERRED_KEY, post.id)
+        except redis.RedisError:
+            decision = DECISION_ADMIT
+    if decision == DECISION_ADMIT:
+        send_to_queue(post.id)
+    _record((decision, priority))
+    return decision
+
+
+def enqueue_analysis_batch(db: Session, posts: List[Post]) -> Dict[int, str]:
+    state = queue_state()
+    decisions: Dict[int, str] = {}
+    outcomes: List[tuple[str, str]] = []
+    for post in posts:
+        priority = "unranked" if state.level == LEVEL_OK else post_priority(db, post)
+        decisions[post.id] = _decide(state.level, priority)
+        outcomes.append((decisions[post.id], priority))
+
+    deferred = [post_id for post_id, decision in decisions.items() if decision == DECISION_DEFER]
+    if deferred:
+        try:
+            _redis().rpush(DEFERRED_KEY, *deferred)
+        except redis.RedisError:
+            decisions.update({post_id: DECISION_ADMIT for post_id in deferred})
+    admitted = [post_id for post_id, decision in decisions.items() if decision == DECISION_ADMIT]
+    if admitted:
+        headers = {"enqueued_at": time.time()}
+        group(analyze_post_task.signature((post_id,), headers=headers) for post_id in admitted).apply_async()
+    _record(*outcomes)
+    return decisions
+
+
+def backpressure_status() -> Dict:
+    state = queue_state(refresh=True)
+    try:
+        client = _redis()
+        deferred = int(client.llen(DEFERRED_KEY))
+        counters = {key: int(value) for key, value in client.hgetall(METRICS_KEY).items()}
+    except redis.RedisError:
+        deferred, counters = -1, {}
+    return {
+        "queue_depth": state.depth,
+        "oldest_age_sec": state.oldest_age_sec,
+        "level": state.level,
+        "deferred": deferred,
+        "decisions": counters,
+    }
@@ -0,0 +1,50 @@
+import hashlib
+import json
+from typing import Optional
+
+import redis
+
+from app.core.config import get_settings
+
+CURSOR_KEY_PREFIX = "ingest:cursor"
+
+_client: Optional[redis.Redis] = None
+
+
+def _redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _client
+
+
+def _field(key: str) -> str:
+    # Search queries can be long; hash them so the field name stays short and stable.
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def get_cursor(source: str, key: str) -> dict:
+    try:
+        raw = _redis().hget(f"{CURSOR_KEY_PREFIX}:{source}", _field(key))
+    except redis.RedisError:
+        return {}
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return {}
+
+
+def set_cursor(source: str, key: str, cursor: dict) -> None:
+    try:
+        _redis().hset(f"{CURSOR_KEY_PREFIX}:{source}", _field(key), json.dumps({**cursor, "key": key}))
+    except redis.RedisError:
+        pass
+
+
+def reset_cursor(source: str, key: str) -> None:
+    try:
+        _redis().hdel(f"{CURSOR_KEY_PREFIX}:{source}", _field(key))
+    except redis.RedisError:
+        pass
@@ -0,0 +1,32 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class Deadline:
+    expires_at: float
+    timed_out_stages: List[str] = field(default_factory=list)
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(expires_at=time.monotonic() + max(0.0, seconds))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        # Timeout for a blocking call: never beyond the deadline, optionally capped per call.
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+    def mark_timed_out(self, stage: str) -> None:
+        if stage not in self.timed_out_stages:
+            self.timed_out_stages.append(stage)
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.timed_out_stages)
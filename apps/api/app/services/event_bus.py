@@ -1,32 +1,199 @@
+import asyncio
 import json
-from typing import Callable
+import os
+import socket
+import sys
+from typing import Awaitable, Callable, Optional
 
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import get_settings
 
-CHANNEL_ALERTS = "alerts:new"
+STREAM_ALERTS = "alerts:stream"
+# Pub/sub, not a stream: a replica that misses messages clears its whole cache instead.
+CHANNEL_PRINCIPALS = "auth:principals:invalidate"
 
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
 
-def publish_alert(payload: dict) -> None:
-    settings = get_settings()
-    client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
-    client.publish(CHANNEL_ALERTS, json.dumps(payload))
 
+def _redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _client
 
-def subscribe_alerts(on_message: Callable[[dict], None]) -> None:
-    settings = get_settings()
-    client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
-    pubsub = client.pubsub(ignore_subscribe_messages=True)
-    pubsub.subscribe(CHANNEL_ALERTS)
-    for message in pubsub.listen():
-        if message.get("type") != "message":
+
+def get_async_redis() -> aioredis.Redis:
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _async_client
+
+
+def _entry_fields(payload: dict) -> dict:
+    return {"data": json.dumps(payload)}
+
+
+def _decode_entry(entry_id: str, fields: Optional[dict]) -> Optional[dict]:
+    try:
+        payload = json.loads((fields or {}).get("data") or "")
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    # Clients keep the last event_id they saw and pass it back to resume.
+    payload["event_id"] = entry_id
+    return payload
+
+
+def publish_alert(payload: dict) -> str:
+    # Approximate trimming (~) lets Redis drop whole macro-nodes, which is much cheaper.
+    maxlen = get_settings().event_stream_maxlen
+    return _redis().xadd(STREAM_ALERTS, _entry_fields(payload), maxlen=maxlen, approximate=True)
+
+
+def stream_id_key(event_id: str) -> tuple[int, int]:
+    # Stream IDs are "<ms>-<seq>"; compare them numerically, not as strings.
+    ms, _, seq = str(event_id).partition("-")
+    return int(ms), int(seq or 0)
+
+
+async def read_alerts_since(
+    last_id: str, count: int = 500, client: Optional[aioredis.Redis] = None
+) -> list[dict]:
+    # Exclusive start: "(" skips the entry the client already has.
+    client = client or get_async_redis()
+    entries = await client.xrange(STREAM_ALERTS, min=f"({last_id}", max="+", count=count)
+    payloads = (_decode_entry(entry_id, fields) for entry_id, fields in entries)
+    return [payload for payload in payloads if payload is not None]
+
+
+async def stream_bounds(client: Optional[aioredis.Redis] = None) -> tuple[Optional[str], Optional[str]]:
+    # Oldest and newest entry IDs still held by the (trimmed) stream.
+    client = client or get_async_redis()
+    first = await client.xrange(STREAM_ALERTS, min="-", max="+", count=1)
+    last = await client.xrevrange(STREAM_ALERTS, max="+", min="-", count=1)
+    return (first[0][0] if first else None), (last[0][0] if last else None)
+
+
+def default_consumer_group() -> str:
+    # A shared default would make replicas (and workers on one host) split the stream, so
+    # without EVENT_BUS_GROUP each process gets its own group. That name changes on restart:
+    # the new group starts at "$" and the old one is pruned once idle. Set EVENT_BUS_GROUP
+    # per replica to resume from the group's position instead.
+    return get_settings().event_bus_group or f"api-{socket.gethostname()}-{os.getpid()}"
+
+
+async def _ensure_group(client: aioredis.Redis, group: str) -> None:
+    try:
+        await client.xgroup_create(STREAM_ALERTS, group, id="$", mkstream=True)
+    except redis.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+async def prune_abandoned_groups(client: aioredis.Redis, keep: str, max_idle_ms: int) -> list[str]:
+    # Groups of replicas that were renamed or scaled away: nobody has read from them for
+    # max_idle_ms, so drop them along with their pending entries.
+    removed: list[str] = []
+    for info in await client.xinfo_groups(STREAM_ALERTS):
+        name = info["name"]
+        if name == keep:
             continue
-        data = message.get("data")
-        if not data:
+        consumers = await client.xinfo_consumers(STREAM_ALERTS, name)
+        # No consumers yet: a replica may have just created it and not read from it yet.
+        if not consumers or any(consumer["idle"] < max_idle_ms for consumer in consumers):
             continue
+        await client.xgroup_destroy(STREAM_ALERTS, name)
+        removed.append(name)
+    return removed
+
+
+async def consume_alerts(
+    on_message: Callable[[dict], Awaitable[None]],
+    group: Optional[str] = None,
+    consumer: Optional[str] = None,
+    block_ms: int = 5000,
+    client: Optional[aioredis.Redis] = None,
+) -> None:
+    # Each API replica reads through its own consumer group, so every replica sees every
+    # alert and resumes from the group's last delivered entry after a restart. One
+    # consumer per group, named after it, so its pending entries are found again too.
+    group = group or default_consumer_group()
+    consumer = consumer or group
+    backoff = 1.0
+    while True:
         try:
-            payload = json.loads(data)
-            on_message(payload)
-        except Exception:
-            continue
+            client = client or get_async_redis()
+            await _ensure_group(client, group)
+            removed = await prune_abandoned_groups(client, group, get_settings().event_bus_group_idle_sec * 1000)
+            if removed:
+                print(f"[event-bus] removed abandoned groups: {', '.join(removed)}", file=sys.stderr, flush=True)
+            # Entries delivered before a crash but never acknowledged are read first.
+            read_from = "0"
+            while True:
+                block = None if read_from == "0" else block_ms
+                response = await client.xreadgroup(group, consumer, {STREAM_ALERTS: read_from}, count=100, block=block)
+                entries = response[0][1] if response else []
+                if not entries:
+                    read_from = ">"
+                    continue
+                for entry_id, fields in entries:
+                    payload = _decode_entry(entry_id, fields)
+                    if payload is None:
+                        continue
+                    try:
+                        await on_message(payload)
+                    except Exception as exc:
+                        print(f"[event-bus] alert handler failed: {exc}", file=sys.stderr, flush=True)
+                await client.xack(STREAM_ALERTS, group, *[entry_id for entry_id, _ in entries])
+                backoff = 1.0
+        except asyncio.CancelledError:
+            raise
+        except redis.RedisError as exc:
+            print(f"[event-bus] stream read failed, retrying in {backoff:.0f}s: {exc}", file=sys.stderr, flush=True)
+            await asyncio.sleep(backoff)
+            backoff = min(30.0, backoff * 2)
+
+
+def publish_principal_invalidation(subjects: list[str]) -> None:
+    try:
+        _redis().publish(CHANNEL_PRINCIPALS, json.dumps(subjects))
+    except redis.RedisError as exc:
+        # Other replicas fall back to AUTH_PRINCIPAL_CACHE_TTL_SEC.
+        print(f"[event-bus] principal invalidation not published: {exc}", file=sys.stderr, flush=True)
+
+
+async def consume_principal_invalidations(
+    on_subjects: Callable[[list[str]], None],
+    on_subscribed: Callable[[], None],
+    client: Optional[aioredis.Redis] = None,
+) -> None:
+    # on_subscribed runs on every (re)subscribe: anything published while this replica
+    # was not listening is lost, so it must drop what it may have missed.
+    backoff = 1.0
+    while True:
+        try:
+            client = client or get_async_redis()
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL_PRINCIPALS)
+                on_subscribed()
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    try:
+                        subjects = json.loads(message["data"])
+                    except (ValueError, TypeError, KeyError):
+                        continue
+                    if isinstance(subjects, list):
+                        on_subjects([str(subject) for subject in subjects])
+            finally:
+                await pubsub.aclose()
+        except asyncio.CancelledError:
+            raise
+        except redis.RedisError as exc:
+            print(f"[event-bus] invalidation subscribe failed, retrying in {backoff:.0f}s: {exc}", file=sys.stderr, flush=True)
+            await asyncio.sleep(backoff)
+            backoff = min(30.0, backoff * 2)
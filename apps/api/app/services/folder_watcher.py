@@ -0,0 +1,112 @@
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models import IngestedFile
+from app.services.ingestion import ingest_demo_file
+
+LEDGER_INGESTED = "ingested"
+LEDGER_DUPLICATE = "duplicate"
+LEDGER_FAILED = "failed"
+LEDGER_KNOWN = "known"
+
+# A file that still fails to parse this soon after its last write may be mid-copy.
+_SETTLE_SEC = 2.0
+_CHUNK_SIZE = 1024 * 256
+
+
+def is_drop_file(path: Path) -> bool:
+    return path.suffix.lower() == ".json" and not path.name.startswith(".")
+
+
+def scan_drop_dir(directory: Path) -> list[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    with os.scandir(directory) as entries:
+        return sorted(Path(entry.path) for entry in entries if entry.is_file() and is_drop_file(Path(entry.name)))
+
+
+def file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def archive_file(path: Path, archive_dir: Path, digest: str, failed: bool = False) -> str:
+    target_dir = archive_dir / "failed" if failed else archive_dir
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / path.name
+    if target.exists():
+        target = target_dir / f"{path.stem}_{digest[:12]}{path.suffix}"
+    shutil.move(str(path), target)
+    return str(target)
+
+
+def _record(db_factory, **values) -> None:
+    db = db_factory()
+    try:
+        db.add(IngestedFile(**values))
+        db.commit()
+    except IntegrityError:
+        # Another replica recorded the same file first.
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _is_known(db_factory, file_name: str, digest: str) -> bool:
+    db = db_factory()
+    try:
+        return (
+            db.query(IngestedFile.id).filter_by(file_name=file_name, content_hash=digest).first() is not None
+        )
+    finally:
+        db.close()
+
+
+def process_drop_file(db_factory, path: Path, archive_dir: Path) -> Optional[str]:
+    # Returns the ledger status, or None when the file should be retried later.
+    try:
+        digest = file_digest(path)
+        modified_at = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _is_known(db_factory, path.name, digest):
+        archive_file(path, archive_dir, digest)
+        return LEDGER_KNOWN
+
+    try:
+        post = ingest_demo_file(db_factory, path)
+    except (ValueError, KeyError, TypeError) as exc:
+        if time.time() - modified_at < _SETTLE_SEC:
+            return None
+        archived = archive_file(path, archive_dir, digest, failed=True)
+        _record(
+            db_factory,
+            file_name=path.name,
+            content_hash=digest,
+            status=LEDGER_FAILED,
+            archived_path=archived,
+            error=f"{exc.__class__.__name__}: {exc}"[:500],
+        )
+        return LEDGER_FAILED
+
+    # Ingest first, then archive, then record: a crash in between at worst re-ingests
+    # the file, which the posts unique index turns into a no-op.
+    status = LEDGER_INGESTED if post is not None else LEDGER_DUPLICATE
+    archived = archive_file(path, archive_dir, digest)
+    _record(
+        db_factory,
+        file_name=path.name,
+        content_hash=digest,
+        status=status,
+        post_id=post.id if post is not None else None,
+        archived_path=archived,
+    )
+    return status
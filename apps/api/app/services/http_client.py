@@ -0,0 +1,274 @@
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from app.core.config import get_settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+_CACHEABLE_MAX_BYTES = 1024 * 1024
+
+
+def _retry_after_sec(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    # Twitter/X reports the window reset as an epoch timestamp instead.
+    reset = response.headers.get("x-rate-limit-reset")
+    if reset and reset.isdigit():
+        return max(0.0, float(reset) - time.time())
+    return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    # Full jitter keeps many pollers from retrying in lockstep.
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class _ConditionalCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, str, httpx.Headers, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validators(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        etag, last_modified, _, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(self, key: str, response: httpx.Response) -> None:
+        etag = response.headers.get("etag", "")
+        last_modified = response.headers.get("last-modified", "")
+        if not (etag or last_modified) or len(response.content) > _CACHEABLE_MAX_BYTES:
+            return
+        with self._lock:
+            self._entries[key] = (etag, last_modified, response.headers, response.content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def replay(self, key: str, response: httpx.Response) -> httpx.Response:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            return response
+        _, _, headers, content = entry
+        return httpx.Response(200, headers=headers, content=content, request=response.request)
+
+
+class _ClientPolicy:
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        backoff_base_sec: Optional[float] = None,
+        backoff_max_sec: Optional[float] = None,
+        max_per_host: Optional[int] = None,
+        cache_entries: int = 512,
+    ) -> None:
+        settings = get_settings()
+        self.max_retries = settings.http_max_retries if max_retries is None else max_retries
+        self.backoff_base_sec = settings.http_backoff_base_sec if backoff_base_sec is None else backoff_base_sec
+        self.backoff_max_sec = settings.http_backoff_max_sec if backoff_max_sec is None else backoff_max_sec
+        self.max_per_host = max(1, settings.http_max_per_host if max_per_host is None else max_per_host)
+        self.cache = _ConditionalCache(cache_entries)
+
+    def _limits(self) -> httpx.Limits:
+        settings = get_settings()
+        return httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_connections,
+            keepalive_expiry=60.0,
+        )
+
+    @staticmethod
+    def _cache_key(method: str, url: str, params) -> Optional[str]:
+        if method.upper() != "GET":
+            return None
+        return str(httpx.URL(url, params=params))
+
+    def _conditional_headers(self, key: Optional[str], headers: Optional[dict]) -> dict:
+        merged = dict(headers or {})
+        if key is not None:
+            merged.update(self.cache.validators(key))
+        return merged
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        # None means "give up and hand the last response/error to the caller".
+        if attempt >= self.max_retries:
+            return None
+        retry_after = _retry_after_sec(response) if response is not None else None
+        if retry_after is not None and retry_after > self.backoff_max_sec:
+            return None
+        return backoff_delay(attempt, self.backoff_base_sec, self.backoff_max_sec, retry_after)
+
+    def _finish(self, key: Optional[str], response: httpx.Response) -> httpx.Response:
+        if key is None:
+            return response
+        if response.status_code == 304:
+            return self.cache.replay(key, response)
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+
+class HttpClient(_ClientPolicy):
+    def __init__(self, timeout_sec: Optional[float] = None, http2: bool = True, **policy) -> None:
+        super().__init__(**policy)
+        timeout = get_settings().http_timeout_sec if timeout_sec is None else timeout_sec
+        self._client = httpx.Client(http2=http2, limits=self._limits(), timeout=timeout, follow_redirects=True)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = httpx.URL(url).host
+        with self._slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def request(self, method: str, url: str, *, conditional: bool = False, **kwargs) -> httpx.Response:
+        key = self._cache_key(method, url, kwargs.get("params")) if conditional else None
+        kwargs["headers"] = self._conditional_headers(key, kwargs.get("headers"))
+        attempt = 0
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                with self._slot(url):
+                    response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                delay = self._retry_delay(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return self._finish(key, response)
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+        attempt = 0
+        while True:
+            with self._slot(url):
+                with self._client.stream(method, url, **kwargs) as response:
+                    delay = self._retry_delay(attempt, response) if response.status_code in RETRY_STATUSES else None
+                    if delay is None:
+                        yield response
+                        return
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncHttpClient(_ClientPolicy):
+    def __init__(self, timeout_sec: Optional[float] = None, http2: bool = True, **policy) -> None:
+        super().__init__(**policy)
+        timeout = get_settings().http_timeout_sec if timeout_sec is None else timeout_sec
+        self._client = httpx.AsyncClient(http2=http2, limits=self._limits(), timeout=timeout, follow_redirects=True)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[host]
+
+    async def request(self, method: str, url: str, *, conditional: bool = False, **kwargs) -> httpx.Response:
+        key = self._cache_key(method, url, kwargs.get("params")) if conditional else None
+        kwargs["headers"] = self._conditional_headers(key, kwargs.get("headers"))
+        attempt = 0
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                async with self._slot(url):
+                    response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                delay = self._retry_delay(attempt, None)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return self._finish(key, response)
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        attempt = 0
+        while True:
+            async with self._slot(url):
+                async with self._client.stream(method, url, **kwargs) as response:
+                    delay = self._retry_delay(attempt, response) if response.status_code in RETRY_STATUSES else None
+                    if delay is None:
+                        yield response
+                        return
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_http_client: Optional[HttpClient] = None
+_async_http_client: Optional[AsyncHttpClient] = None
+_init_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _http_client
+    if _http_client is None:
+        with _init_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = AsyncHttpClient()
+    return _async_http_client
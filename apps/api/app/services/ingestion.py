@@ -1,27 +1,21 @@
 import json
 import shutil
 import threading
-import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable, Optional
-from urllib.parse import urlparse
+from typing import Callable, Iterable, Optional
 
-import requests
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db.models import Media, Post
-from app.workers.tasks import analyze_post_task
-
-_replay_thread: Optional[threading.Thread] = None
-_replay_stop = threading.Event()
-_watcher_thread: Optional[threading.Thread] = None
-_watcher_stop = threading.Event()
-_processed_files: set[str] = set()
-_twitter_thread: Optional[threading.Thread] = None
-_twitter_stop = threading.Event()
-_facebook_thread: Optional[threading.Thread] = None
-_facebook_stop = threading.Event()
+from app.db.session import SessionLocal
+from app.services.backpressure import enqueue_analysis, enqueue_analysis_batch
+from app.services.cursor_store import get_cursor, set_cursor
+from app.services.http_client import get_http_client
+from app.services.media_downloader import DownloadResult, get_download_manager, ingest_tmp_dir
 
 
 def _copy_media_to_storage(src: str, post_id: int) -> str:
@@ -32,10 +26,72 @@ def _copy_media_to_storage(src: str, post_id: int) -> str:
     out_dir = Path(settings.media_root) / f"post_{post_id}"
     out_dir.mkdir(parents=True, exist_ok=True)
     dst = out_dir / src_path.name
-    shutil.copy2(src_path, dst)
+    # Files we downloaded ourselves are moved instead of copied.
+    if src_path.resolve().parent == ingest_tmp_dir().resolve():
+        shutil.move(str(src_path), dst)
+    else:
+        shutil.copy2(src_path, dst)
     return str(dst)
 
 
+def _media_type(path: str) -> str:
+    return "video" if path.lower().endswith(".mp4") else "image"
+
+
+def _post_row(record: dict) -> dict:
+    return {
+        "platform": record["platform"],
+        "platform_post_id": str(record["platform_post_id"]),
+        "text": record.get("text", ""),
+        "author": record.get("author", ""),
+        "url": record.get("url", ""),
+        "raw_json": record.get("raw_json", {}),
+        "pending_media": record.get("pending_media"),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def insert_posts_ignore_duplicates(db: Session, records: list[dict]) -> dict[tuple[str, str], Post]:
+    rows: dict[tuple[str, str], dict] = {}
+    for record in records:
+        row = _post_row(record)
+        rows.setdefault((row["platform"], row["platform_post_id"]), row)
+    if not rows:
+        return {}
+
+    dialect = db.get_bind().dialect.name
+    if dialect in {"postgresql", "sqlite"}:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = (
+            insert(Post)
+            .on_conflict_do_nothing(index_elements=["platform", "platform_post_id"])
+            .returning(Post)
+        )
+        inserted = list(db.scalars(stmt, list(rows.values())))
+    else:
+        existing = {
+            (platform, platform_post_id)
+            for platform, platform_post_id in db.query(Post.platform, Post.platform_post_id).filter(
+                Post.platform_post_id.in_([key[1] for key in rows])
+            )
+        }
+        inserted = [Post(**row) for key, row in rows.items() if key not in existing]
+        db.add_all(inserted)
+        db.flush()
+    # Detach the new rows so the caller's commit does not expire them; queueing
+    # only reads their columns and would otherwise reload each post one by one.
+    for post in inserted:
+        db.expunge(post)
+    return {(post.platform, post.platform_post_id): post for post in inserted}
+
+
+def _attach_media(db: Session, post: Post, media_paths: list[str], media_meta: Optional[dict] = None) -> None:
+    for path in media_paths:
+        stored_path = _copy_media_to_storage(path, post.id)
+        meta = (media_meta or {}).get(path, {})
+        db.add(Media(post_id=post.id, type=_media_type(path), path=stored_path, meta_json=meta))
+
+
 def create_post_and_queue(
     db: Session,
     platform: str,
@@ -45,199 +101,235 @@ def create_post_and_queue(
     url: str,
     raw_json: dict,
     media_paths: list[str],
-) -> Post:
-    post = Post(
-        platform=platform,
-        platform_post_id=platform_post_id,
-        text=text,
-        author=author,
-        url=url,
-        raw_json=raw_json,
-    )
-    db.add(post)
-    db.commit()
-    db.refresh(post)
-
-    for path in media_paths:
-        media_type = "video" if path.lower().endswith(".mp4") else "image"
-        stored_path = _copy_media_to_storage(path, post.id)
-        media = Media(post_id=post.id, type=media_type, path=stored_path, meta_json={})
-        db.add(media)
+    media_meta: Optional[dict] = None,
+) -> Optional[Post]:
+    record = {
+        "platform": platform,
+        "platform_post_id": platform_post_id,
+        "text": text,
+        "author": author,
+        "url": url,
+        "raw_json": raw_json,
+    }
+    post = insert_posts_ignore_duplicates(db, [record]).get((platform, str(platform_post_id)))
+    if post is None:
+        return None
+    _attach_media(db, post, media_paths, media_meta)
     db.commit()
 
-    analyze_post_task.delay(post.id)
+    enqueue_analysis(db, post)
     return post
 
 
-def replay_dataset(db_factory, speed: float = 1.0, limit: int = 100) -> None:
-    settings = get_settings()
-    demo_dir = Path(settings.demo_input_dir)
-    demo_dir.mkdir(parents=True, exist_ok=True)
-    files = list(demo_dir.glob("*.json"))[:limit]
+def store_posts_batch(db: Session, records: list[dict]) -> list[Optional[Post]]:
+    # Inserts and commits the records with their media; None marks a duplicate.
+    inserted = insert_posts_ignore_duplicates(db, records)
+    posts: list[Optional[Post]] = []
+    for record in records:
+        post = inserted.pop((record["platform"], str(record["platform_post_id"])), None)
+        if post is not None:
+            _attach_media(db, post, record.get("media_paths", []))
+        posts.append(post)
+    db.commit()
+    return posts
 
-    for file_path in files:
-        if _replay_stop.is_set():
-            break
-        payload = json.loads(file_path.read_text(encoding="utf-8"))
-        db = db_factory()
-        try:
-            create_post_and_queue(
-                db=db,
-                platform=payload.get("platform", "demo"),
-                platform_post_id=payload.get("platform_post_id", file_path.stem),
-                text=payload.get("text", ""),
-                author=payload.get("author", "unknown"),
-                url=payload.get("url", ""),
-                raw_json=payload,
-                media_paths=payload.get("media_paths", []),
-            )
-        finally:
-            db.close()
-        time.sleep(max(0.1, 1.0 / max(0.1, speed)))
+
+def create_posts_batch(db: Session, records: list[dict]) -> tuple[list[Optional[Post]], dict[int, str]]:
+    posts = store_posts_batch(db, records)
+    decisions = enqueue_analysis_batch(db, [post for post in posts if post is not None])
+    return posts, decisions
 
 
-def start_replay(db_factory, speed: float = 1.0, limit: int = 100) -> bool:
-    global _replay_thread
-    if _replay_thread and _replay_thread.is_alive():
-        return False
-    _replay_stop.clear()
-    _replay_thread = threading.Thread(target=replay_dataset, args=(db_factory, speed, limit), daemon=True)
-    _replay_thread.start()
-    return True
+def _resolve_media_paths(media_paths: list[str], base_dir: Path) -> list[str]:
+    resolved = []
+    for path in media_paths:
+        p = Path(path)
+        resolved.append(str(p) if p.is_absolute() else str((base_dir / p).resolve()))
+    return resolved
 
 
-def stop_replay() -> None:
-    _replay_stop.set()
+def demo_record(
+    payload: dict,
+    base_dir: Path,
+    default_post_id: Optional[str] = None,
+    default_author: str = "watcher",
+) -> dict:
+    return {
+        "platform": payload.get("platform", "demo"),
+        "platform_post_id": payload.get("platform_post_id", default_post_id),
+        "text": payload.get("text", ""),
+        "author": payload.get("author", default_author),
+        "url": payload.get("url", ""),
+        "raw_json": payload,
+        "media_paths": _resolve_media_paths(payload.get("media_paths", []), base_dir),
+    }
 
 
-def poll_twitter_recent_search(query: str, limit: int = 10) -> Iterable[dict]:
+def ingest_demo_file(db_factory, file_path: Path, default_author: str = "watcher") -> Optional[Post]:
+    payload = json.loads(file_path.read_text(encoding="utf-8"))
+    record = demo_record(payload, file_path.parent, default_post_id=file_path.stem, default_author=default_author)
+    db = db_factory()
+    try:
+        return create_post_and_queue(db=db, **record)
+    finally:
+        db.close()
+
+
+TWITTER_SEARCH_URL = "https://api.twitter.com/2/tweets/search/recent"
+# Recent search only reaches back 7 days and rejects an older since_id with a 400.
+TWITTER_SEARCH_WINDOW = timedelta(days=7)
+# Keeps a start_time computed now inside the window when the request lands.
+TWITTER_WINDOW_MARGIN = timedelta(minutes=5)
+TWITTER_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# Tweet ids are snowflakes: the bits above 22 are milliseconds since this epoch.
+TWITTER_EPOCH_MS = 1288834974657
+
+
+@dataclass
+class PolledPages:
+    items: list[dict] = field(default_factory=list)
+    # Token / URL of the first page not read yet; None once the listing is exhausted.
+    next_page: Optional[str] = None
+    # Status of the request that stopped the walk; 200 when every page read succeeded.
+    status: int = 200
+
+
+def _next_cursor(cursor: dict, bound_key: str, polled: PolledPages, keys: list[int], until: Optional[int]) -> dict:
+    # `keys` are the ids / timestamps just read, `until` the upper bound the poll used.
+    # The lower bound only moves once the gap down to it has been read; until then the
+    # backfill records where the next poll resumes.
+    backfill = cursor.get("backfill") or {}
+    newest = max([*keys, int(backfill.get("newest") or 0)])
+    bound = {key: value for key, value in cursor.items() if key != "backfill"}
+    if polled.status == 200 and not polled.next_page:
+        return {bound_key: newest} if newest else bound
+    oldest = min([*keys, *([int(backfill["oldest"])] if backfill.get("oldest") else [])], default=None)
+    if polled.status == 200:
+        # A page token / link is only valid with the bounds it was issued for.
+        resume = {"until": until, "page": polled.next_page}
+    elif oldest is not None:
+        resume = {"until": oldest, "page": None}
+    else:
+        return cursor
+    return {**bound, "backfill": {"newest": newest, "oldest": oldest, **resume}}
+
+
+def poll_twitter_recent_search(
+    query: str,
+    limit: int = 10,
+    since_id: Optional[str] = None,
+    until_id: Optional[str] = None,
+    start_time: Optional[str] = None,
+    pagination_token: Optional[str] = None,
+    before_request: Optional[Callable[[], None]] = None,
+) -> PolledPages:
     settings = get_settings()
     if not settings.twitter_bearer_token:
-        return []
+        return PolledPages()
     headers = {"Authorization": f"Bearer {settings.twitter_bearer_token}"}
     params = {"query": query, "max_results": min(100, limit), "tweet.fields": "created_at,lang,author_id"}
-    resp = requests.get("https://api.twitter.com/2/tweets/search/recent", headers=headers, params=params, timeout=20)
-    if resp.status_code != 200:
-        return []
-    data = resp.json()
-    return data.get("data", [])
-
-
-def ingest_twitter_once(db: Session, query: str, limit: int = 10) -> int:
-    tweets = list(poll_twitter_recent_search(query=query, limit=limit))
-    ingested = 0
-    for tweet in tweets:
-        post_id = tweet.get("id")
-        if not post_id:
-            continue
-        existing = db.query(Post).filter(Post.platform == "twitter", Post.platform_post_id == str(post_id)).first()
-        if existing:
-            continue
-        create_post_and_queue(
-            db=db,
-            platform="twitter",
-            platform_post_id=str(post_id),
-            text=tweet.get("text", ""),
-            author=str(tweet.get("author_id", "unknown")),
-            url=f"https://x.com/i/web/status/{post_id}",
-            raw_json=tweet,
-            media_paths=[],
+    bounds = {"since_id": since_id, "until_id": until_id, "start_time": start_time, "pagination_token": pagination_token}
+    params.update({key: value for key, value in bounds.items() if value})
+    # Without a lower bound only the latest page is read, so a new query does not backfill history.
+    max_pages = max(1, settings.ingest_max_pages_per_poll) if since_id or start_time else 1
+    polled = PolledPages()
+    for _ in range(max_pages):
+        if before_request is not None:
+            before_request()
+        resp = get_http_client().get(TWITTER_SEARCH_URL, headers=headers, params=params)
+        if resp.status_code != 200:
+            polled.status = resp.status_code
+            break
+        data = resp.json()
+        polled.items.extend(data.get("data", []))
+        polled.next_page = (data.get("meta") or {}).get("next_token")
+        if not polled.next_page:
+            break
+        params["pagination_token"] = polled.next_page
+    return polled
+
+
+def _twitter_window_start() -> datetime:
+    return datetime.utcnow() - TWITTER_SEARCH_WINDOW + TWITTER_WINDOW_MARGIN
+
+
+def _outside_twitter_window(cursor: dict, window_start: datetime) -> bool:
+    if cursor.get("since_id"):
+        window_ms = (window_start - datetime(1970, 1, 1)).total_seconds() * 1000
+        return (int(cursor["since_id"]) >> 22) + TWITTER_EPOCH_MS < window_ms
+    return bool(cursor.get("start_time")) and cursor["start_time"] < window_start.strftime(TWITTER_TIME_FORMAT)
+
+
+def ingest_twitter_once(
+    db: Session, query: str, limit: int = 10, before_request: Optional[Callable[[], None]] = None
+) -> int:
+    stored = cursor = get_cursor("twitter", query)
+    window_start = _twitter_window_start()
+    if _outside_twitter_window(cursor, window_start):
+        # Anything older than the window is gone; drain what recent search still holds.
+        cursor = {"start_time": window_start.strftime(TWITTER_TIME_FORMAT)}
+    bounded = bool(cursor.get("since_id") or cursor.get("start_time"))
+    backfill = cursor.get("backfill") or {}
+    until_id = backfill.get("until")
+
+    def poll(until_id, pagination_token=None) -> PolledPages:
+        return poll_twitter_recent_search(
+            query=query,
+            limit=limit,
+            since_id=cursor.get("since_id"),
+            until_id=until_id,
+            start_time=cursor.get("start_time"),
+            pagination_token=pagination_token,
+            before_request=before_request,
         )
-        ingested += 1
-    return ingested
-
-
-def _watch_folder_loop(db_factory) -> None:
-    settings = get_settings()
-    demo_dir = Path(settings.demo_input_dir)
-    demo_dir.mkdir(parents=True, exist_ok=True)
-    while not _watcher_stop.is_set():
-        for file_path in demo_dir.glob("*.json"):
-            if file_path.name in _processed_files:
-                continue
-            try:
-                payload = json.loads(file_path.read_text(encoding="utf-8"))
-                media_paths = payload.get("media_paths", [])
-                fixed_paths = []
-                for path in media_paths:
-                    p = Path(path)
-                    if p.is_absolute():
-                        fixed_paths.append(str(p))
-                    else:
-                        fixed_paths.append(str((demo_dir / p).resolve()))
-                db = db_factory()
-                try:
-                    create_post_and_queue(
-                        db=db,
-                        platform=payload.get("platform", "demo"),
-                        platform_post_id=payload.get("platform_post_id", file_path.stem),
-                        text=payload.get("text", ""),
-                        author=payload.get("author", "watcher"),
-                        url=payload.get("url", ""),
-                        raw_json=payload,
-                        media_paths=fixed_paths,
-                    )
-                finally:
-                    db.close()
-                _processed_files.add(file_path.name)
-            except Exception:
-                continue
-        time.sleep(2.0)
-
-
-def start_demo_folder_watcher(db_factory) -> bool:
-    global _watcher_thread
-    if _watcher_thread and _watcher_thread.is_alive():
-        return False
-    _watcher_stop.clear()
-    _watcher_thread = threading.Thread(target=_watch_folder_loop, args=(db_factory,), daemon=True)
-    _watcher_thread.start()
-    return True
-
-
-def _twitter_poll_loop(db_factory, query: str, limit_per_poll: int, interval_sec: int) -> None:
-    while not _twitter_stop.is_set():
-        db = db_factory()
-        try:
-            ingest_twitter_once(db, query=query, limit=limit_per_poll)
-        except Exception:
-            pass
-        finally:
-            db.close()
-        for _ in range(max(1, interval_sec)):
-            if _twitter_stop.is_set():
-                break
-            time.sleep(1)
-
-
-def start_twitter_polling(db_factory, query: str, limit_per_poll: int = 20, interval_sec: int = 30) -> bool:
-    global _twitter_thread
-    if _twitter_thread and _twitter_thread.is_alive():
-        return False
-    _twitter_stop.clear()
-    _twitter_thread = threading.Thread(
-        target=_twitter_poll_loop,
-        args=(db_factory, query, limit_per_poll, interval_sec),
-        daemon=True,
-    )
-    _twitter_thread.start()
-    return True
-
 
-def stop_twitter_polling() -> None:
-    _twitter_stop.set()
-
-
-def twitter_polling_status() -> dict:
-    return {
-        "running": bool(_twitter_thread and _twitter_thread.is_alive()),
-    }
-
-
-def poll_facebook_page_posts(page_id: str, limit: int = 20) -> Iterable[dict]:
+    polled = poll(until_id, backfill.get("page"))
+    if polled.status == 400 and not polled.items:
+        if backfill.get("page"):
+            # Page tokens expire; resume below the oldest tweet read instead.
+            until_id = backfill.get("oldest") or until_id
+            polled = poll(until_id)
+        elif bounded:
+            # The bounds themselves were rejected: restart from the window instead of failing every poll.
+            set_cursor("twitter", query, {"start_time": _twitter_window_start().strftime(TWITTER_TIME_FORMAT)})
+            return 0
+    records = [
+        {
+            "platform": "twitter",
+            "platform_post_id": str(tweet["id"]),
+            "text": tweet.get("text", ""),
+            "author": str(tweet.get("author_id", "unknown")),
+            "url": f"https://x.com/i/web/status/{tweet['id']}",
+            "raw_json": tweet,
+        }
+        for tweet in polled.items
+        if tweet.get("id")
+    ]
+    inserted = list(insert_posts_ignore_duplicates(db, records).values())
+    db.commit()
+    enqueue_analysis_batch(db, inserted)
+    ids = [int(record["platform_post_id"]) for record in records if record["platform_post_id"].isdigit()]
+    if bounded:
+        next_cursor = _next_cursor(cursor, "since_id", polled, ids, until_id)
+    else:
+        # A new query reads only its latest page and starts from its newest tweet.
+        next_cursor = {"since_id": max(ids)} if ids else cursor
+    if next_cursor != stored:
+        set_cursor("twitter", query, next_cursor)
+    return len(inserted)
+
+
+def poll_facebook_page_posts(
+    page_id: str,
+    limit: int = 20,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    next_url: Optional[str] = None,
+    before_request: Optional[Callable[[], None]] = None,
+) -> PolledPages:
     settings = get_settings()
     if not settings.facebook_page_access_token:
-        return []
+        return PolledPages()
     endpoint = f"https://graph.facebook.com/v21.0/{page_id}/posts"
     params = {
         "access_token": settings.facebook_page_access_token,
@@ -248,11 +340,36 @@ def poll_facebook_page_posts(page_id: str, limit: int = 20) -> Iterable[dict]:
         ),
         "limit": min(100, max(1, limit)),
     }
-    resp = requests.get(endpoint, params=params, timeout=20)
-    if resp.status_code != 200:
-        return []
-    payload = resp.json()
-    return payload.get("data", [])
+    if since:
+        params["since"] = since
+    if until:
+        params["until"] = until
+    max_pages = max(1, settings.ingest_max_pages_per_poll) if since else 1
+    polled = PolledPages(next_page=next_url)
+    for _ in range(max_pages):
+        if before_request is not None:
+            before_request()
+        # Graph API "next" links already carry every query parameter, including the token.
+        if polled.next_page:
+            resp = get_http_client().get(polled.next_page)
+        else:
+            resp = get_http_client().get(endpoint, params=params, conditional=True)
+        if resp.status_code != 200:
+            polled.status = resp.status_code
+            break
+        payload = resp.json()
+        polled.items.extend(payload.get("data", []))
+        polled.next_page = (payload.get("paging") or {}).get("next")
+        if not polled.next_page:
+            break
+    return polled
+
+
+def _facebook_created_ts(post: dict) -> int:
+    try:
+        return int(datetime.strptime(str(post.get("created_time", "")), "%Y-%m-%dT%H:%M:%S%z").timestamp())
+    except ValueError:
+        return 0
 
 
 def _iter_attachment_nodes(attachments_payload: dict) -> Iterable[dict]:
@@ -305,129 +422,124 @@ def _facebook_media_urls(post: dict) -> list[str]:
     return urls
 
 
-def _suffix_from_content_type(content_type: str) -> str:
-    ctype = (content_type or "").split(";")[0].strip().lower()
-    if ctype == "video/mp4":
-        return ".mp4"
-    if ctype == "image/jpeg":
-        return ".jpg"
-    if ctype == "image/png":
-        return ".png"
-    if ctype == "image/webp":
-        return ".webp"
-    if ctype == "image/gif":
-        return ".gif"
-    if ctype.startswith("video/"):
-        return ".mp4"
-    if ctype.startswith("image/"):
-        return ".jpg"
-    return ""
+# Posts whose media downloads run in this process; the resume sweep skips them.
+_downloads_in_flight: set[int] = set()
+_downloads_lock = threading.Lock()
 
 
-def _download_remote_media(url: str, prefix: str) -> Optional[str]:
-    settings = get_settings()
+def _attach_downloads_and_queue(post: Post, results: list[DownloadResult]) -> None:
+    db = SessionLocal()
     try:
-        resp = requests.get(url, timeout=30, stream=True, allow_redirects=True)
-    except Exception:
-        return None
-
-    if resp.status_code != 200:
-        return None
-
-    content_type = (resp.headers.get("content-type") or "").lower()
-    if not (content_type.startswith("video/") or content_type.startswith("image/")):
-        return None
-
-    parsed_suffix = Path(urlparse(resp.url).path).suffix.lower()
-    allowed_suffixes = {".mp4", ".mov", ".m4v", ".jpg", ".jpeg", ".png", ".webp", ".gif"}
-    suffix = parsed_suffix if parsed_suffix in allowed_suffixes else _suffix_from_content_type(content_type)
-    if not suffix:
-        return None
-
-    tmp_dir = Path(settings.media_root) / "_ingest_tmp"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    safe_prefix = "".join(ch if ch.isalnum() or ch in {"_", "-"} else "_" for ch in prefix)
-    out_path = tmp_dir / f"{safe_prefix}_{int(time.time() * 1000)}{suffix}"
-
-    try:
-        with out_path.open("wb") as fh:
-            for chunk in resp.iter_content(chunk_size=1024 * 256):
-                if chunk:
-                    fh.write(chunk)
-    except Exception:
-        return None
-
-    return str(out_path)
+        # Clearing pending_media claims the post: if a sweep started a second download of
+        # the same media, only the first to finish attaches it.
+        claimed = (
+            db.query(Post)
+            .filter(Post.id == post.id, Post.pending_media.isnot(None))
+            .update({Post.pending_media: None}, synchronize_session=False)
+        )
+        if not claimed:
+            db.rollback()
+            return
+        for result in results:
+            if not result.path:
+                continue
+            stored_path = _copy_media_to_storage(result.path, post.id)
+            meta = {"source_url": result.url, "sha256": result.sha256, "bytes": result.size}
+            db.add(Media(post_id=post.id, type=_media_type(stored_path), path=stored_path, meta_json=meta))
+        db.commit()
+        enqueue_analysis(db, post)
+    finally:
+        db.close()
+        with _downloads_lock:
+            _downloads_in_flight.discard(post.id)
+
+
+def _download_and_queue(post: Post, urls: list[str]) -> None:
+    with _downloads_lock:
+        _downloads_in_flight.add(post.id)
+    get_download_manager().submit(
+        urls,
+        prefix=f"fb_{post.platform_post_id}",
+        on_complete=lambda results: _attach_downloads_and_queue(post, results),
+    )
 
 
-def _facebook_media_paths(post: dict) -> list[str]:
-    post_id = str(post.get("id", "post"))
-    urls = _facebook_media_urls(post)
-    paths: list[str] = []
-    for idx, url in enumerate(urls):
-        local_path = _download_remote_media(url, f"fb_{post_id}_{idx}")
-        if local_path:
-            paths.append(local_path)
-    return paths
+def resume_pending_downloads(db: Session, stuck_after_sec: Optional[float] = None) -> int:
+    # Posts committed with pending media whose downloads are not running here, e.g. after
+    # a restart lost the in-memory download queue. Young posts are left alone: another
+    # replica may still be downloading them.
+    stuck_after_sec = get_settings().media_download_stuck_sec if stuck_after_sec is None else stuck_after_sec
+    cutoff = datetime.utcnow() - timedelta(seconds=stuck_after_sec)
+    with _downloads_lock:
+        running = set(_downloads_in_flight)
+    posts = (
+        db.query(Post)
+        .filter(Post.pending_media.isnot(None), Post.created_at < cutoff)
+        .order_by(Post.created_at)
+        .limit(get_settings().media_download_sweep_batch)
+        .all()
+    )
+    resumed = 0
+    for post in posts:
+        if post.id in running:
+            continue
+        db.expunge(post)
+        _download_and_queue(post, list(post.pending_media))
+        resumed += 1
+    return resumed
 
 
-def ingest_facebook_once(db: Session, page_ids: list[str], limit_per_page: int = 20) -> int:
+def ingest_facebook_once(
+    db: Session, page_ids: list[str], limit_per_page: int = 20, before_request: Optional[Callable[[], None]] = None
+) -> int:
     ingested = 0
     for page_id in page_ids:
-        posts = list(poll_facebook_page_posts(page_id=page_id, limit=limit_per_page))
-        for post in posts:
-            post_id = str(post.get("id", ""))
-            if not post_id:
-                continue
-            existing = db.query(Post).filter(Post.platform == "facebook", Post.platform_post_id == post_id).first()
-            if existing:
-                continue
-            create_post_and_queue(
-                db=db,
-                platform="facebook",
-                platform_post_id=post_id,
-                text=post.get("message", "") or "",
-                author=str((post.get("from") or {}).get("name", page_id)),
-                url=post.get("permalink_url", ""),
-                raw_json=post,
-                media_paths=_facebook_media_paths(post),
+        cursor = get_cursor("facebook", page_id)
+        backfill = cursor.get("backfill") or {}
+        until = backfill.get("until")
+        polled = poll_facebook_page_posts(
+            page_id=page_id,
+            limit=limit_per_page,
+            since=cursor.get("since"),
+            until=until,
+            next_url=backfill.get("page"),
+            before_request=before_request,
+        )
+        if polled.status == 400 and not polled.items and backfill.get("page"):
+            # Paging links expire with their token; resume below the oldest post read instead.
+            until = backfill.get("oldest") or until
+            polled = poll_facebook_page_posts(
+                page_id=page_id, limit=limit_per_page, since=cursor.get("since"), until=until, before_request=before_request
             )
-            ingested += 1
+        fb_posts = {str(post["id"]): post for post in polled.items if post.get("id")}
+        records = [
+            {
+                "platform": "facebook",
+                "platform_post_id": post_id,
+                "text": post.get("message", "") or "",
+                "author": str((post.get("from") or {}).get("name", page_id)),
+                "url": post.get("permalink_url", ""),
+                "raw_json": post,
+                "pending_media": _facebook_media_urls(post) or None,
+            }
+            for post_id, post in fb_posts.items()
+        ]
+        inserted = list(insert_posts_ignore_duplicates(db, records).values())
+        db.commit()
+        # Posts with attachments are queued once their downloads finish; the poll does not wait.
+        without_media = []
+        for post in inserted:
+            if post.pending_media:
+                _download_and_queue(post, post.pending_media)
+            else:
+                without_media.append(post)
+        enqueue_analysis_batch(db, without_media)
+        ingested += len(inserted)
+        stamps = [stamp for stamp in map(_facebook_created_ts, fb_posts.values()) if stamp]
+        if cursor.get("since"):
+            next_cursor = _next_cursor(cursor, "since", polled, stamps, until)
+        else:
+            next_cursor = {"since": max(stamps)} if stamps else cursor
+        if next_cursor != cursor:
+            set_cursor("facebook", page_id, next_cursor)
     return ingested
-
-
-def _facebook_poll_loop(db_factory, page_ids: list[str], limit_per_page: int, interval_sec: int) -> None:
-    while not _facebook_stop.is_set():
-        db = db_factory()
-        try:
-            ingest_facebook_once(db, page_ids=page_ids, limit_per_page=limit_per_page)
-        except Exception:
-            pass
-        finally:
-            db.close()
-        for _ in range(max(1, interval_sec)):
-            if _facebook_stop.is_set():
-                break
-            time.sleep(1)
-
-
-def start_facebook_polling(db_factory, page_ids: list[str], limit_per_page: int = 20, interval_sec: int = 60) -> bool:
-    global _facebook_thread
-    if _facebook_thread and _facebook_thread.is_alive():
-        return False
-    _facebook_stop.clear()
-    _facebook_thread = threading.Thread(
-        target=_facebook_poll_loop,
-        args=(db_factory, page_ids, limit_per_page, interval_sec),
-        daemon=True,
-    )
-    _facebook_thread.start()
-    return True
-
-
-def stop_facebook_polling() -> None:
-    _facebook_stop.set()
-
-
-def facebook_polling_status() -> dict:
-    return {"running": bool(_facebook_thread and _facebook_thread.is_alive())}
@@ -1,5 +1,7 @@
 from pathlib import Path
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
+
+from app.core.config import get_settings
 
 
 class KeywordPrefilter:
@@ -18,3 +20,14 @@ class KeywordPrefilter:
         normalized = (text or "").lower()
         hits = [kw for kw in self.en_keywords.union(self.si_keywords) if kw in normalized]
         return (len(hits) > 0, hits)
+
+
+_prefilter: Optional[KeywordPrefilter] = None
+
+
+def get_prefilter() -> KeywordPrefilter:
+    global _prefilter
+    if _prefilter is None:
+        keywords_dir = Path(get_settings().demo_input_dir).parent / "keywords"
+        _prefilter = KeywordPrefilter(en_path=str(keywords_dir / "en.txt"), si_path=str(keywords_dir / "si.txt"))
+    return _prefilter
@@ -0,0 +1,219 @@
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+from app.services.backpressure import DECISION_DEFER, DECISION_SHED, queue_state
+from app.services.ingestion import create_posts_batch, demo_record
+
+PATTERN_CONSTANT = "constant"
+PATTERN_POISSON = "poisson"
+PATTERN_BURST = "burst"
+PATTERNS = (PATTERN_CONSTANT, PATTERN_POISSON, PATTERN_BURST)
+
+_QUEUE_SAMPLE_SEC = 1.0
+_END = object()
+# Posts pulled per step beyond this stay due; the growing backlog shows up as schedule lag.
+_MAX_BATCHES_PER_STEP = 10
+
+
+def arrival_offsets(rate: float, pattern: str = PATTERN_CONSTANT, burst_size: int = 100, seed=None) -> Iterator[float]:
+    rng = random.Random(seed)
+    rate = max(0.001, rate)
+    burst_size = max(1, burst_size)
+    elapsed = 0.0
+    index = 0
+    while True:
+        if pattern == PATTERN_POISSON:
+            elapsed += rng.expovariate(rate)
+            yield elapsed
+        elif pattern == PATTERN_BURST:
+            # Same mean rate, delivered as bursts of burst_size at once.
+            yield (index // burst_size) * burst_size / rate
+        else:
+            yield index / rate
+        index += 1
+
+
+def _with_suffix(record: dict, suffix: str) -> dict:
+    if suffix:
+        record["platform_post_id"] = f"{record['platform_post_id']}-{suffix}"
+    return record
+
+
+def jsonl_records(path: Path, loops: int = 1, id_suffix: str = "") -> Iterator[Optional[dict]]:
+    # Yields None for lines that cannot be used so the caller can count them.
+    for loop in range(max(1, loops)):
+        # Each pass needs its own ids, otherwise every pass after the first is all duplicates.
+        suffix = "-".join(part for part in (id_suffix, f"loop{loop}" if loops > 1 else "") if part)
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                    record = demo_record(payload, path.parent, default_author="replay")
+                except (ValueError, AttributeError, TypeError):
+                    yield None
+                    continue
+                yield _with_suffix(record, suffix) if record["platform_post_id"] else None
+
+
+def demo_dir_records(files: list[Path], id_suffix: str = "") -> Iterator[Optional[dict]]:
+    for file_path in files:
+        try:
+            payload = json.loads(file_path.read_text(encoding="utf-8"))
+            record = demo_record(payload, file_path.parent, default_post_id=file_path.stem, default_author="unknown")
+        except (OSError, ValueError, AttributeError):
+            yield None
+            continue
+        yield _with_suffix(record, id_suffix)
+
+
+@dataclass
+class LoadReport:
+    target_rate: float
+    pattern: str
+    running: bool = True
+    sent: int = 0
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    deferred: int = 0
+    shed: int = 0
+    elapsed_sec: float = 0.0
+    achieved_rate: float = 0.0
+    schedule_lag_sec: float = 0.0
+    max_schedule_lag_sec: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    queue_age_sec: float = 0.0
+    max_queue_age_sec: float = 0.0
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        db_factory,
+        records: Iterable[Optional[dict]],
+        rate: float,
+        pattern: str = PATTERN_CONSTANT,
+        burst_size: int = 100,
+        batch_size: Optional[int] = None,
+        limit: Optional[int] = None,
+        duration_sec: Optional[float] = None,
+        seed=None,
+    ) -> None:
+        if pattern not in PATTERNS:
+            raise ValueError(f"unknown arrival pattern: {pattern}")
+        self.db_factory = db_factory
+        self.batch_size = max(1, batch_size or get_settings().ingest_batch_chunk_size)
+        self.limit = limit
+        self.duration_sec = duration_sec
+        self.report = LoadReport(target_rate=rate, pattern=pattern)
+        self._records = iter(records)
+        self._offsets = arrival_offsets(rate, pattern, burst_size, seed)
+        self._next_offset: Optional[float] = None
+        self._started: Optional[float] = None
+        self._last_sample = 0.0
+        self.finished = False
+
+    def _elapsed(self) -> float:
+        if self._started is None:
+            self._started = time.monotonic()
+        return time.monotonic() - self._started
+
+    def _take_due(self, elapsed: float) -> list[Optional[dict]]:
+        due: list[Optional[dict]] = []
+        cap = self.batch_size * _MAX_BATCHES_PER_STEP
+        while len(due) < cap:
+            if self.limit is not None and self.report.sent + len(due) >= self.limit:
+                self.finished = True
+                break
+            if self.duration_sec is not None and elapsed >= self.duration_sec:
+                self.finished = True
+                break
+            if self._next_offset is None:
+                self._next_offset = next(self._offsets)
+            if self._next_offset > elapsed:
+                break
+            record = next(self._records, _END)
+            if record is _END:
+                self.finished = True
+                break
+            self.report.schedule_lag_sec = round(max(0.0, elapsed - self._next_offset), 3)
+            self._next_offset = None
+            due.append(record)
+        return due
+
+    def _insert(self, records: list[dict]) -> None:
+        db = self.db_factory()
+        try:
+            posts, decisions = create_posts_batch(db, records)
+        except SQLAlchemyError:
+            db.rollback()
+            self.report.rejected += len(records)
+            return
+        finally:
+            db.close()
+        accepted = sum(1 for post in posts if post is not None)
+        self.report.accepted += accepted
+        self.report.duplicates += len(posts) - accepted
+        decided = list(decisions.values())
+        self.report.deferred += decided.count(DECISION_DEFER)
+        self.report.shed += decided.count(DECISION_SHED)
+
+    def _sample_queue(self, elapsed: float, force: bool = False) -> None:
+        if not force and elapsed - self._last_sample < _QUEUE_SAMPLE_SEC:
+            return
+        self._last_sample = elapsed
+        state = queue_state(refresh=True)
+        report = self.report
+        report.queue_depth = max(0, state.depth)
+        report.queue_age_sec = state.oldest_age_sec
+        report.max_queue_depth = max(report.max_queue_depth, report.queue_depth)
+        report.max_queue_age_sec = max(report.max_queue_age_sec, report.queue_age_sec)
+
+    def step(self) -> int:
+        elapsed = self._elapsed()
+        due = self._take_due(elapsed)
+        valid = [record for record in due if record is not None]
+        self.report.rejected += len(due) - len(valid)
+        self.report.sent += len(due)
+        accepted_before = self.report.accepted
+        for start in range(0, len(valid), self.batch_size):
+            self._insert(valid[start : start + self.batch_size])
+
+        elapsed = self._elapsed()
+        report = self.report
+        report.max_schedule_lag_sec = max(report.max_schedule_lag_sec, report.schedule_lag_sec)
+        report.elapsed_sec = round(elapsed, 3)
+        report.achieved_rate = round(report.sent / elapsed, 1) if elapsed > 0 else 0.0
+        self._sample_queue(elapsed, force=self.finished)
+        report.running = not self.finished
+        return report.accepted - accepted_before
+
+    def seconds_until_due(self) -> float:
+        if self._next_offset is None:
+            return 0.0
+        return max(0.0, self._next_offset - self._elapsed())
+
+    def run(self, stop_event: Optional[threading.Event] = None, on_progress=None) -> LoadReport:
+        try:
+            while not self.finished and not (stop_event and stop_event.is_set()):
+                self.step()
+                if on_progress is not None:
+                    on_progress(self.report)
+                time.sleep(min(0.05, self.seconds_until_due()))
+        finally:
+            self.report.running = False
+        return self.report
+
+    def status(self) -> dict:
+        return asdict(self.report)
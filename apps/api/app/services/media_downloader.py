@@ -0,0 +1,188 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import get_settings
+from app.services.http_client import get_http_client
+
+ALLOWED_SUFFIXES = {".mp4", ".mov", ".m4v", ".jpg", ".jpeg", ".png", ".webp", ".gif"}
+_CHUNK_SIZE = 1024 * 256
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: Optional[str] = None
+    sha256: str = ""
+    size: int = 0
+    error: str = ""
+
+
+class DownloadAborted(Exception):
+    pass
+
+
+def suffix_from_content_type(content_type: str) -> str:
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if ctype == "video/mp4":
+        return ".mp4"
+    if ctype == "image/jpeg":
+        return ".jpg"
+    if ctype == "image/png":
+        return ".png"
+    if ctype == "image/webp":
+        return ".webp"
+    if ctype == "image/gif":
+        return ".gif"
+    if ctype.startswith("video/"):
+        return ".mp4"
+    if ctype.startswith("image/"):
+        return ".jpg"
+    return ""
+
+
+def ingest_tmp_dir() -> Path:
+    return Path(get_settings().ingest_tmp_root)
+
+
+class MediaDownloadManager:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout_sec: Optional[float] = None,
+        attempts: Optional[int] = None,
+    ) -> None:
+        settings = get_settings()
+        self.max_bytes = settings.media_download_max_bytes if max_bytes is None else max_bytes
+        self.timeout_sec = settings.media_download_timeout_sec if timeout_sec is None else timeout_sec
+        self.attempts = max(1, settings.media_download_attempts if attempts is None else attempts)
+        workers = settings.media_download_workers if max_workers is None else max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="media-dl")
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"pending": 0, "completed": 0, "failed": 0, "bytes": 0}
+
+    def _bump(self, **deltas: int) -> None:
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _stream_into(self, url: str, part_path: Path, hasher, started: float) -> tuple[str, str]:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with get_http_client().stream("GET", url, headers=headers, timeout=min(30.0, self.timeout_sec)) as resp:
+            if resp.status_code not in (200, 206):
+                raise DownloadAborted(f"http_{resp.status_code}")
+            content_type = (resp.headers.get("content-type") or "").lower()
+            if not (content_type.startswith("video/") or content_type.startswith("image/")):
+                raise DownloadAborted("unsupported_content_type")
+            if resp.status_code == 200 and offset:
+                # Server ignored the Range header; start over.
+                offset = 0
+                part_path.unlink(missing_ok=True)
+            total = int(resp.headers.get("content-length") or 0) + offset
+            if total > self.max_bytes:
+                raise DownloadAborted("too_large")
+
+            written = offset
+            with part_path.open("ab") as fh:
+                for chunk in resp.iter_bytes(chunk_size=_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        raise DownloadAborted("too_large")
+                    if time.monotonic() - started > self.timeout_sec:
+                        raise DownloadAborted("timeout")
+                    fh.write(chunk)
+                    hasher.update(chunk)
+            return content_type, str(resp.url)
+
+    def download(self, url: str, prefix: str) -> DownloadResult:
+        tmp_dir = ingest_tmp_dir()
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        safe_prefix = "".join(ch if ch.isalnum() or ch in {"_", "-"} else "_" for ch in prefix)
+        part_path = tmp_dir / f"{safe_prefix}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}.part"
+        started = time.monotonic()
+        error = ""
+        for _ in range(self.attempts):
+            # Re-hash what is already on disk so resumed downloads keep a full-file digest.
+            hasher = hashlib.sha256()
+            if part_path.exists():
+                with part_path.open("rb") as fh:
+                    for block in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+                        hasher.update(block)
+            try:
+                content_type, final_url = self._stream_into(url, part_path, hasher, started)
+            except DownloadAborted as exc:
+                error = str(exc)
+                break
+            except httpx.HTTPError as exc:
+                error = exc.__class__.__name__
+                if time.monotonic() - started > self.timeout_sec:
+                    break
+                continue
+
+            parsed_suffix = Path(urlparse(final_url).path).suffix.lower()
+            suffix = parsed_suffix if parsed_suffix in ALLOWED_SUFFIXES else suffix_from_content_type(content_type)
+            if not suffix:
+                error = "unknown_suffix"
+                break
+            digest = hasher.hexdigest()
+            out_path = tmp_dir / f"{safe_prefix}_{digest[:16]}{suffix}"
+            size = part_path.stat().st_size
+            part_path.replace(out_path)
+            return DownloadResult(url=url, path=str(out_path), sha256=digest, size=size)
+
+        part_path.unlink(missing_ok=True)
+        return DownloadResult(url=url, error=error or "failed")
+
+    def submit(self, urls: List[str], prefix: str, on_complete: Callable[[List[DownloadResult]], None]) -> None:
+        if not urls:
+            on_complete([])
+            return
+        results: List[Optional[DownloadResult]] = [None] * len(urls)
+        remaining = [len(urls)]
+        self._bump(pending=len(urls))
+
+        def _done(idx: int, future: Future) -> None:
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = DownloadResult(url=urls[idx], error=exc.__class__.__name__)
+            if result.path:
+                self._bump(pending=-1, completed=1, bytes=result.size)
+            else:
+                self._bump(pending=-1, failed=1)
+            with self._lock:
+                results[idx] = result
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                on_complete([r for r in results if r is not None])
+
+        for idx, url in enumerate(urls):
+            future = self._pool.submit(self.download, url, f"{prefix}_{idx}")
+            future.add_done_callback(lambda fut, idx=idx: _done(idx, fut))
+
+
+_manager: Optional[MediaDownloadManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_download_manager() -> MediaDownloadManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = MediaDownloadManager()
+    return _manager
@@ -7,23 +7,19 @@ from sqlalchemy.orm import Session
 from app.core.config import get_settings
 from app.db.models import Analysis, Media, Post
 from app.services.alerting import maybe_create_alert
+from app.services.deadline import Deadline
 from app.services.fusion import fuse_scores
-from app.services.keyword_prefilter import KeywordPrefilter
+from app.services.keyword_prefilter import get_prefilter
 from app.services.language import detect_lang
 from app.services.text_model import get_text_model
 from app.services.video_model import get_video_model
 from app.services.audio_model import AudioModel
 
 
-def _get_prefilter(settings) -> KeywordPrefilter:
-    en_path = str(Path(settings.demo_input_dir).parent / "keywords" / "en.txt")
-    si_path = str(Path(settings.demo_input_dir).parent / "keywords" / "si.txt")
-    return KeywordPrefilter(en_path=en_path, si_path=si_path)
-
-
 def run_analysis(db: Session, post: Post) -> Dict:
     settings = get_settings()
-    prefilter = _get_prefilter(settings)
+    deadline = Deadline.after(settings.analysis_deadline_sec)
+    prefilter = get_prefilter()
     text = post.text or ""
     lang = detect_lang(text)
     post.lang = lang
@@ -45,12 +41,16 @@ def run_analysis(db: Session, post: Post) -> Dict:
     for media in media_items:
         if media.type == "video":
             has_video_input = True
+            if deadline.expired():
+                deadline.mark_timed_out("video")
+                deadline.mark_timed_out("audio")
+                continue
             post_dir = Path(settings.media_root) / f"post_{post.id}"
-            video_result = get_video_model().analyze(media.path, str(post_dir / "frames"))
+            video_result = get_video_model().analyze(media.path, str(post_dir / "frames"), deadline=deadline)
             video_score = max(video_score, float(video_result.get("video_score", 0.0)))
             evidence_frames.extend(video_result.get("evidence_frames", []))
             top_detections.extend(video_result.get("top_detections", []))
-            audio_result = AudioModel().analyze_video_audio(media.path, str(post_dir / "audio"))
+            audio_result = AudioModel().analyze_video_audio(media.path, str(post_dir / "audio"), deadline=deadline)
             audio_probs = audio_result.get("audio_probs", {})
             has_audio_input = True
             media.meta_json = {
@@ -69,6 +69,9 @@ def run_analysis(db: Session, post: Post) -> Dict:
         has_video_input=has_video_input,
         has_audio_input=has_audio_input,
     )
+    explanation = list(fusion.explanation)
+    if deadline.is_partial:
+        explanation.append(f"partial=timed_out:{','.join(deadline.timed_out_stages)}")
 
     analysis = Analysis(
         post_id=post.id,
@@ -78,13 +81,15 @@ def run_analysis(db: Session, post: Post) -> Dict:
         fusion_score=fusion.risk_score,
         severity=fusion.severity,
         category=fusion.category,
-        explanation_json=fusion.explanation,
+        explanation_json=explanation,
         model_versions={
             "text_model": settings.nlp_model_path,
             "text_adapter": settings.nlp_adapter_path,
             "video_model": settings.yolo_weights_path,
             "audio_model": settings.whisper_model,
         },
+        is_partial=deadline.is_partial,
+        timed_out_stages=list(deadline.timed_out_stages),
         created_at=datetime.utcnow(),
     )
     db.add(analysis)
@@ -93,4 +98,9 @@ def run_analysis(db: Session, post: Post) -> Dict:
     db.refresh(post)
 
     alert = maybe_create_alert(db, post, analysis)
-    return {"analysis_id": analysis.id, "alert_id": alert.id if alert else None}
+    return {
+        "analysis_id": analysis.id,
+        "alert_id": alert.id if alert else None,
+        "partial": analysis.is_partial,
+        "timed_out_stages": analysis.timed_out_stages,
+    }
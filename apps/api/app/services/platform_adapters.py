@@ -1,16 +1,330 @@
-from typing import Iterable
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
 
+from app.core.config import get_settings
+from app.services.backpressure import drain_deferred_if_ok
+from app.services.folder_watcher import LEDGER_INGESTED, is_drop_file, process_drop_file, scan_drop_dir
+from app.services.ingestion import ingest_facebook_once, ingest_twitter_once, resume_pending_downloads
+from app.services.load_generator import PATTERN_CONSTANT, LoadGenerator, demo_dir_records, jsonl_records
+from app.services.media_downloader import get_download_manager
+from app.services.source_scheduler import get_scheduler
 
-class YouTubeAdapter:
-    def poll(self) -> Iterable[dict]:
-        return []
+try:
+    from watchfiles import Change, watch
+except ImportError:  # pragma: no cover - polling fallback
+    Change = None
+    watch = None
 
+_replay: Optional["ReplayAdapter"] = None
 
-class FacebookAdapter:
-    def poll(self) -> Iterable[dict]:
-        return []
 
+class SourceAdapter:
+    kind = "source"
+    budget_key: Optional[str] = None
+    # Event-driven sources spend most of poll() waiting, so they do not take a poll slot.
+    event_driven = False
 
-class TikTokAdapter:
-    def poll(self) -> Iterable[dict]:
-        return []
+    def __init__(self, name: str, interval_sec: float, jitter_sec: float = 0.0) -> None:
+        self.name = name
+        self.interval_sec = max(0.05, float(interval_sec))
+        self.jitter_sec = max(0.0, float(jitter_sec))
+        self.done = False
+        # The scheduler's shared RateBudget for budget_key, if one is configured.
+        self.budget = None
+        self.budget_wait_sec = 0.0
+
+    def spend_budget(self) -> None:
+        # Called before every upstream HTTP request; blocks the poll thread while the quota is empty.
+        if self.budget is not None:
+            self.budget_wait_sec += self.budget.acquire()
+
+    async def poll(self) -> int:
+        return 0
+
+    async def close(self) -> None:
+        return None
+
+
+class _SessionPollAdapter(SourceAdapter, ABC):
+    # Ingestion helpers use a sync SQLAlchemy session, so each poll runs on a worker thread.
+    def __init__(self, db_factory, name: str, interval_sec: float, jitter_sec: float = 0.0) -> None:
+        super().__init__(name, interval_sec, jitter_sec)
+        self.db_factory = db_factory
+
+    @abstractmethod
+    def poll_with_session(self, db) -> int:
+        ...
+
+    def _poll_sync(self) -> int:
+        db = self.db_factory()
+        try:
+            return self.poll_with_session(db)
+        finally:
+            db.close()
+
+    async def poll(self) -> int:
+        return await asyncio.to_thread(self._poll_sync)
+
+
+class TwitterSearchAdapter(_SessionPollAdapter):
+    kind = "twitter"
+    budget_key = "twitter"
+
+    def __init__(self, db_factory, query: str, limit_per_poll: int = 20, interval_sec: float = 30) -> None:
+        super().__init__(db_factory, f"twitter:{query}", interval_sec, jitter_sec=interval_sec * 0.1)
+        self.query = query
+        self.limit_per_poll = limit_per_poll
+
+    def poll_with_session(self, db) -> int:
+        return ingest_twitter_once(db, query=self.query, limit=self.limit_per_poll, before_request=self.spend_budget)
+
+
+class FacebookPageAdapter(_SessionPollAdapter):
+    kind = "facebook"
+    budget_key = "facebook"
+
+    def __init__(self, db_factory, page_id: str, limit_per_page: int = 20, interval_sec: float = 60) -> None:
+        super().__init__(db_factory, f"facebook:{page_id}", interval_sec, jitter_sec=interval_sec * 0.1)
+        self.page_id = page_id
+        self.limit_per_page = limit_per_page
+
+    def poll_with_session(self, db) -> int:
+        return ingest_facebook_once(
+            db, page_ids=[self.page_id], limit_per_page=self.limit_per_page, before_request=self.spend_budget
+        )
+
+
+class MaintenanceAdapter(_SessionPollAdapter):
+    # Periodic housekeeping that has to run whether or not new items arrive.
+    kind = "maintenance"
+
+    def __init__(self, db_factory, name: str, job, interval_sec: float) -> None:
+        super().__init__(db_factory, f"maintenance:{name}", interval_sec, jitter_sec=interval_sec * 0.1)
+        self.job = job
+
+    def poll_with_session(self, db) -> int:
+        return self.job(db)
+
+
+class FolderWatchAdapter(SourceAdapter):
+    kind = "folder"
+    event_driven = True
+
+    def __init__(
+        self,
+        db_factory,
+        directory: str,
+        archive_dir: str,
+        interval_sec: float = 2.0,
+        force_polling: bool = False,
+    ) -> None:
+        use_events = watch is not None and not force_polling
+        # In event mode poll() itself waits (up to interval_sec) for filesystem events.
+        super().__init__(f"folder:{directory}", 0.05 if use_events else interval_sec)
+        self.db_factory = db_factory
+        self.directory = Path(directory)
+        self.archive_dir = Path(archive_dir)
+        self.wait_ms = int(max(0.1, interval_sec) * 1000)
+        self.mode = "inotify" if use_events else "poll"
+        self._events = None
+        self._stop = threading.Event()
+        self._caught_up = False
+        self._retry: set[Path] = set()
+
+    def _start_events(self) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._events = watch(
+                self.directory,
+                watch_filter=lambda change, path: change != Change.deleted and is_drop_file(Path(path)),
+                stop_event=self._stop,
+                rust_timeout=self.wait_ms,
+                yield_on_timeout=True,
+                recursive=False,
+            )
+        except Exception:
+            self._fall_back_to_polling()
+
+    def _fall_back_to_polling(self) -> None:
+        self._events = None
+        self.mode = "poll"
+        self.interval_sec = self.wait_ms / 1000
+
+    async def _changed_paths(self) -> set[Path]:
+        if self.mode == "inotify":
+            if self._events is None:
+                self._start_events()
+            if self._events is not None:
+                try:
+                    # The watcher blocks in native code; a pool thread waits on it so the loop stays free.
+                    changes = await asyncio.to_thread(next, self._events, set())
+                except Exception:
+                    self._fall_back_to_polling()
+                else:
+                    paths = {Path(path) for _, path in changes}
+                    if self._caught_up:
+                        return paths
+                    # The watcher is running now, so one scan also covers files dropped before it started.
+                    self._caught_up = True
+                    return paths | set(await asyncio.to_thread(scan_drop_dir, self.directory))
+        return set(await asyncio.to_thread(scan_drop_dir, self.directory))
+
+    def _process(self, paths: list[Path]) -> int:
+        ingested = 0
+        for path in paths:
+            try:
+                status = process_drop_file(self.db_factory, path, self.archive_dir)
+            except Exception:
+                status = None
+            if status is None:
+                if path.exists():
+                    self._retry.add(path)
+            elif status == LEDGER_INGESTED:
+                ingested += 1
+        return ingested
+
+    async def close(self) -> None:
+        # The watch generator exits within one step once the stop event is set.
+        self._stop.set()
+
+    async def poll(self) -> int:
+        paths = await self._changed_paths() | self._retry
+        self._retry = set()
+        if not paths:
+            return 0
+        return await asyncio.to_thread(self._process, sorted(paths))
+
+
+class ReplayAdapter(SourceAdapter):
+    kind = "replay"
+
+    def __init__(self, generator: LoadGenerator) -> None:
+        super().__init__("replay", 0.05)
+        self.generator = generator
+
+    async def poll(self) -> int:
+        accepted = await asyncio.to_thread(self.generator.step)
+        self.done = self.generator.finished
+        # Sleep until the next arrival is due; a backlog keeps the generator spinning.
+        self.interval_sec = min(1.0, max(0.005, self.generator.seconds_until_due()))
+        return accepted
+
+    async def close(self) -> None:
+        self.generator.report.running = False
+
+
+def start_replay(
+    db_factory,
+    speed: float = 1.0,
+    limit: Optional[int] = None,
+    file: Optional[Path] = None,
+    rate: Optional[float] = None,
+    pattern: str = PATTERN_CONSTANT,
+    burst_size: int = 100,
+    batch_size: Optional[int] = None,
+    duration_sec: Optional[float] = None,
+    loops: int = 1,
+    unique_ids: bool = False,
+) -> bool:
+    global _replay
+    if get_scheduler().is_running("replay"):
+        return False
+    id_suffix = f"run{int(time.time())}" if unique_ids else ""
+    if file is not None:
+        records = jsonl_records(file, loops=loops, id_suffix=id_suffix)
+    else:
+        settings = get_settings()
+        demo_dir = Path(settings.demo_input_dir)
+        demo_dir.mkdir(parents=True, exist_ok=True)
+        # The folder watcher archives files it has ingested; replay reads both places.
+        files = list(demo_dir.glob("*.json")) + list(Path(settings.demo_archive_dir).glob("*.json"))
+        records = demo_dir_records(files[: limit or 100], id_suffix=id_suffix)
+    generator = LoadGenerator(
+        db_factory,
+        records,
+        rate=rate or speed,
+        pattern=pattern,
+        burst_size=burst_size,
+        batch_size=batch_size,
+        limit=limit,
+        duration_sec=duration_sec,
+    )
+    _replay = ReplayAdapter(generator)
+    return get_scheduler().add(_replay)
+
+
+def stop_replay() -> None:
+    get_scheduler().remove("replay")
+
+
+def replay_status() -> dict:
+    if _replay is None:
+        return {"running": False}
+    return _replay.generator.status()
+
+
+def start_demo_folder_watcher(db_factory) -> bool:
+    settings = get_settings()
+    adapter = FolderWatchAdapter(
+        db_factory,
+        settings.demo_input_dir,
+        settings.demo_archive_dir,
+        interval_sec=settings.folder_watch_poll_interval_sec,
+        force_polling=settings.folder_watch_force_polling,
+    )
+    return get_scheduler().add(adapter)
+
+
+def start_download_sweep(db_factory) -> bool:
+    interval = max(30, get_settings().media_download_sweep_interval_sec)
+    return get_scheduler().add(MaintenanceAdapter(db_factory, "downloads", resume_pending_downloads, interval))
+
+
+def start_deferred_drain(db_factory) -> bool:
+    interval = max(1, get_settings().ingest_deferred_drain_interval_sec)
+    return get_scheduler().add(MaintenanceAdapter(db_factory, "deferred", lambda _db: drain_deferred_if_ok(), interval))
+
+
+def start_twitter_polling(db_factory, query: str, limit_per_poll: int = 20, interval_sec: int = 30) -> bool:
+    adapter = TwitterSearchAdapter(db_factory, query=query, limit_per_poll=limit_per_poll, interval_sec=interval_sec)
+    return get_scheduler().add(adapter)
+
+
+def stop_twitter_polling() -> None:
+    get_scheduler().remove_prefix("twitter:")
+
+
+def twitter_polling_status() -> dict:
+    sources = get_scheduler().status("twitter:")
+    return {"running": any(source["running"] for source in sources), "sources": sources}
+
+
+def start_facebook_polling(db_factory, page_ids: list[str], limit_per_page: int = 20, interval_sec: int = 60) -> bool:
+    added = [
+        get_scheduler().add(
+            FacebookPageAdapter(db_factory, page_id=page_id, limit_per_page=limit_per_page, interval_sec=interval_sec)
+        )
+        for page_id in page_ids
+    ]
+    return any(added)
+
+
+def stop_facebook_polling() -> None:
+    get_scheduler().remove_prefix("facebook:")
+
+
+def facebook_polling_status() -> dict:
+    sources = get_scheduler().status("facebook:")
+    return {
+        "running": any(source["running"] for source in sources),
+        "sources": sources,
+        "downloads": get_download_manager().stats(),
+    }
+
+
+def sources_status() -> list[dict]:
+    return get_scheduler().status()
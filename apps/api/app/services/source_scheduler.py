@@ -0,0 +1,200 @@
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+
+
+# Token bucket shared by every source that draws on the same upstream quota. It is
+# charged once per upstream HTTP request, from the poll's worker thread, since one poll
+# may read several pages.
+class RateBudget:
+    def __init__(self, requests: int, per_sec: float) -> None:
+        self.capacity = max(1, requests)
+        self.rate = self.capacity / max(1.0, per_sec)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        waited = 0.0
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                time.sleep(delay)
+
+
+def parse_rate_budgets(spec: str) -> Dict[str, RateBudget]:
+    # "twitter=450/900,facebook=200/3600" -> 450 polls per 900s shared by all twitter sources.
+    budgets: Dict[str, RateBudget] = {}
+    for item in spec.split(","):
+        key, _, value = item.partition("=")
+        requests, _, window = value.partition("/")
+        try:
+            budgets[key.strip()] = RateBudget(int(requests), float(window))
+        except ValueError:
+            continue
+    return budgets
+
+
+@dataclass
+class SourceState:
+    name: str
+    kind: str
+    interval_sec: float
+    running: bool = True
+    polls: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    items: int = 0
+    last_poll_at: Optional[float] = None
+    last_duration_ms: float = 0.0
+    last_error: str = ""
+    next_poll_at: Optional[float] = None
+    budget_wait_sec: float = 0.0
+
+
+class SourceScheduler:
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.max_concurrent_polls = max(1, settings.source_max_concurrent_polls)
+        self.max_backoff_sec = settings.source_max_backoff_sec
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._states: Dict[str, SourceState] = {}
+        self._budgets: Dict[str, RateBudget] = parse_rate_budgets(settings.source_rate_budgets)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _run() -> None:
+                    asyncio.set_event_loop(loop)
+                    self._slots = asyncio.Semaphore(self.max_concurrent_polls)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+                    # Wait for poll threads (e.g. a folder watch) to return before closing.
+                    loop.run_until_complete(loop.shutdown_default_executor())
+                    loop.close()
+
+                self._thread = threading.Thread(target=_run, name="source-scheduler", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def add(self, adapter) -> bool:
+        return self._call(self._add(adapter))
+
+    def remove(self, name: str) -> bool:
+        return self._call(self._remove(name))
+
+    def remove_prefix(self, prefix: str) -> int:
+        names = {name for name in [*self._tasks, *self._states] if name.startswith(prefix)}
+        return sum(1 for name in sorted(names) if self.remove(name))
+
+    def is_running(self, name: str) -> bool:
+        task = self._tasks.get(name)
+        return bool(task and not task.done())
+
+    def status(self, prefix: str = "") -> List[dict]:
+        states = [state for name, state in list(self._states.items()) if name.startswith(prefix)]
+        return [asdict(state) for state in sorted(states, key=lambda s: s.name)]
+
+    def shutdown(self) -> None:
+        if self._loop is None:
+            return
+        self._call(self._cancel_all())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _cancel_all(self) -> None:
+        tasks = list(self._tasks.values())
+        for name in list(self._tasks):
+            await self._remove(name)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _add(self, adapter) -> bool:
+        if self.is_running(adapter.name):
+            return False
+        self._states[adapter.name] = SourceState(name=adapter.name, kind=adapter.kind, interval_sec=adapter.interval_sec)
+        adapter.budget = self._budgets.get(adapter.budget_key or "")
+        self._tasks[adapter.name] = asyncio.get_running_loop().create_task(self._run(adapter))
+        return True
+
+    async def _remove(self, name: str) -> bool:
+        # Removed sources leave the status listing too; finished ones stay until removed
+        # or re-added, so their last counters remain visible.
+        state = self._states.pop(name, None)
+        task = self._tasks.pop(name, None)
+        if task is None:
+            return state is not None
+        task.cancel()
+        return True
+
+    async def _run(self, adapter) -> None:
+        state = self._states[adapter.name]
+        # Stagger first polls so sources added together do not fire at once.
+        await asyncio.sleep(random.uniform(0, adapter.jitter_sec))
+        try:
+            while not adapter.done:
+                async with self._slots if not adapter.event_driven else contextlib.nullcontext():
+                    started = time.monotonic()
+                    state.last_poll_at = time.time()
+                    try:
+                        state.items += int(await adapter.poll() or 0)
+                        state.consecutive_errors = 0
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as exc:
+                        state.errors += 1
+                        state.consecutive_errors += 1
+                        state.last_error = f"{exc.__class__.__name__}: {exc}"[:300]
+                    state.polls += 1
+                    state.budget_wait_sec = round(adapter.budget_wait_sec, 3)
+                    state.last_duration_ms = round((time.monotonic() - started) * 1000, 1)
+                if adapter.done:
+                    break
+                delay = adapter.interval_sec * (2 ** min(state.consecutive_errors, 6))
+                delay = min(max(adapter.interval_sec, self.max_backoff_sec), delay)
+                delay += random.uniform(0, adapter.jitter_sec)
+                state.next_poll_at = time.time() + delay
+                await asyncio.sleep(delay)
+        finally:
+            await adapter.close()
+            state.running = False
+            state.next_poll_at = None
+            if self._tasks.get(adapter.name) is asyncio.current_task():
+                self._tasks.pop(adapter.name, None)
+
+
+_scheduler: Optional[SourceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SourceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = SourceScheduler()
+    return _scheduler
@@ -0,0 +1,165 @@
+import hashlib
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from app.services.media_downloader import ALLOWED_SUFFIXES, suffix_from_content_type
+
+MAX_FIELD_BYTES = 1024 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+@dataclass
+class UploadedPart:
+    name: str
+    filename: Optional[str] = None
+    content_type: str = ""
+    data: bytearray = field(default_factory=bytearray)
+    path: Optional[Path] = None
+    sha256: str = ""
+    size: int = 0
+
+
+class StreamingUpload:
+    # Multipart parser that writes file parts straight to disk, hashing as it goes.
+    # Only parts named in memory_parts (and plain form fields) are kept in memory.
+    def __init__(self, dest_dir: Path, max_file_bytes: int, memory_parts: tuple[str, ...] = ()) -> None:
+        self.dest_dir = dest_dir
+        self.max_file_bytes = max_file_bytes
+        self.memory_parts = set(memory_parts)
+        self.parts: dict[str, UploadedPart] = {}
+        self._part: Optional[UploadedPart] = None
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._fh: Optional[BinaryIO] = None
+        self._hasher = None
+        self._pending: list[tuple[BinaryIO, bytes]] = []
+        self._to_close: list[BinaryIO] = []
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise UploadError('Content-Disposition header must include "name"')
+        name = options[b"name"].decode("utf-8", errors="replace")
+        filename = options[b"filename"].decode("utf-8", errors="replace") if b"filename" in options else None
+        part = UploadedPart(
+            name=name,
+            filename=filename,
+            content_type=self._headers.get(b"content-type", b"").decode("latin-1"),
+        )
+        self._part = part
+        self._fh = None
+        if filename is not None and name not in self.memory_parts:
+            self.dest_dir.mkdir(parents=True, exist_ok=True)
+            part.path = self.dest_dir / f"upload_{uuid.uuid4().hex}.part"
+            self._fh = part.path.open("wb")
+            self._hasher = hashlib.sha256()
+        self.parts[name] = part
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._part
+        chunk = data[start:end]
+        part.size += len(chunk)
+        if self._fh is None:
+            if part.size > MAX_FIELD_BYTES:
+                raise UploadTooLarge(f"{part.name} exceeds {MAX_FIELD_BYTES} bytes")
+            part.data.extend(chunk)
+            return
+        if part.size > self.max_file_bytes:
+            raise UploadTooLarge(f"{part.name} exceeds {self.max_file_bytes} bytes")
+        self._hasher.update(chunk)
+        self._pending.append((self._fh, chunk))
+
+    def on_part_end(self) -> None:
+        if self._fh is not None:
+            self._part.sha256 = self._hasher.hexdigest()
+            self._to_close.append(self._fh)
+            self._fh = None
+
+    async def _flush(self) -> None:
+        # File writes run off the event loop; the callbacks above only queue them.
+        for fh, chunk in self._pending:
+            await run_in_threadpool(fh.write, chunk)
+        self._pending = []
+        for fh in self._to_close:
+            fh.close()
+        self._to_close = []
+
+    async def parse(self, content_type: str, stream: AsyncIterator[bytes]) -> dict[str, UploadedPart]:
+        _, params = parse_options_header(content_type)
+        if b"boundary" not in params:
+            raise UploadError("Expected a multipart/form-data body")
+        parser = MultipartParser(
+            params[b"boundary"],
+            {
+                "on_part_begin": self.on_part_begin,
+                "on_part_data": self.on_part_data,
+                "on_part_end": self.on_part_end,
+                "on_header_field": self.on_header_field,
+                "on_header_value": self.on_header_value,
+                "on_header_end": self.on_header_end,
+                "on_headers_finished": self.on_headers_finished,
+            },
+        )
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+                await self._flush()
+            parser.finalize()
+            await self._flush()
+        except MultipartParseError as exc:
+            self.discard()
+            raise UploadError(f"Malformed multipart body: {exc}") from exc
+        except Exception:
+            self.discard()
+            raise
+        return self.parts
+
+    def discard(self) -> None:
+        for fh, _ in self._pending:
+            fh.close()
+        for fh in self._to_close + ([self._fh] if self._fh else []):
+            fh.close()
+        self._pending, self._to_close, self._fh = [], [], None
+        for part in self.parts.values():
+            if part.path is not None:
+                part.path.unlink(missing_ok=True)
+
+
+def finalize_media(part: UploadedPart) -> Path:
+    suffix = Path(part.filename or "").suffix.lower()
+    if suffix not in ALLOWED_SUFFIXES:
+        suffix = suffix_from_content_type(part.content_type)
+    if not suffix:
+        raise UploadError("Unsupported media type")
+    final = part.path.with_suffix(suffix)
+    part.path.replace(final)
+    part.path = final
+    return final
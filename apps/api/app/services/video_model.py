@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Tuple
 import cv2
 
 from app.core.config import get_settings
+from app.services.deadline import Deadline
 
 
 class VideoModel:
@@ -34,7 +35,9 @@ class VideoModel:
         class_name_norm = class_name.lower().strip()
         return any(keyword in class_name_norm for keyword in self.settings.violence_class_keywords_list)
 
-    def analyze(self, video_path: str, evidence_dir: str, fps_sample: int = 1) -> Dict:
+    def analyze(
+        self, video_path: str, evidence_dir: str, fps_sample: int = 1, deadline: Optional[Deadline] = None
+    ) -> Dict:
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             return {"video_score": 0.0, "evidence_frames": []}
@@ -47,6 +50,9 @@ class VideoModel:
         interval = int(max(1, native_fps / max(1, fps_sample)))
 
         while True:
+            if deadline is not None and deadline.expired():
+                deadline.mark_timed_out("video")
+                break
             ret, frame = cap.read()
             if not ret:
                 break
@@ -0,0 +1,59 @@
+import math
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models import OPEN_ALERT_SQL, Alert, Analysis, Post
+from app.services.ws_manager import SEVERITY_LEVELS
+
+_EPOCH = datetime(1970, 1, 1)
+# Decay time constant (tau). A constant, not a setting: every stored priority (and the
+# backfill in app/db/migrations) is computed with it, and rows ranked with a different
+# tau would not compare. Changing it means recomputing alerts.priority for every row.
+DECAY_HOURS = 6.0
+# Severity tiers are spaced further apart than the decayed-score term can ever span
+# (it grows by 4 a day at tau = 6h), so age never lifts an alert past a higher tier.
+TIER_SPAN = 1e7
+
+
+def alert_priority(severity: str, fusion_score: float, created_at: datetime) -> float:
+    # Severity tier first; inside a tier, fusion_score * exp(-age / tau), which orders
+    # alerts the same as ln(fusion_score) + created / tau. That does not depend on "now",
+    # so it is stored once and indexed instead of recomputed. Within a tier a score of 78
+    # stays ahead of a brand-new 72 for about half an hour.
+    tier = SEVERITY_LEVELS.index(severity) if severity in SEVERITY_LEVELS else 0
+    tau_sec = 3600.0 * DECAY_HOURS
+    decayed = math.log(max(fusion_score or 0.0, 1e-3)) + (created_at - _EPOCH).total_seconds() / tau_sec
+    return tier * TIER_SPAN + decayed
+
+
+def _queue_ids(db: Session, assignee_clause, limit: int) -> list[int]:
+    # Literal predicate (not a bound parameter) so the planner can match the partial
+    # ix_alerts_queue index; the read is then one backwards range scan of `limit` entries.
+    rows = (
+        db.query(Alert.id)
+        .filter(text(OPEN_ALERT_SQL), assignee_clause)
+        .order_by(Alert.priority.desc())
+        .limit(limit)
+    )
+    return [row.id for row in rows]
+
+
+def next_alerts(db: Session, user_id: Optional[int], limit: int) -> list[tuple[Alert, float, Optional[str]]]:
+    # Top open alerts that are unassigned or already assigned to `user_id`.
+    ids = _queue_ids(db, Alert.assigned_to.is_(None), limit)
+    if user_id is not None:
+        ids += _queue_ids(db, Alert.assigned_to == user_id, limit)
+    if not ids:
+        return []
+    rows = (
+        db.query(Alert, Analysis.fusion_score, Post.platform)
+        .join(Analysis, Analysis.id == Alert.analysis_id)
+        .join(Post, Post.id == Alert.post_id)
+        .filter(Alert.id.in_(ids))
+        .all()
+    )
+    rows.sort(key=lambda row: (row[0].priority, row[0].id), reverse=True)
+    return rows[:limit]
@@ -1,33 +1,382 @@
 import asyncio
-from typing import Set
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, Optional, Set
 
 from fastapi import WebSocket
 
+from app.core.config import get_settings
+from app.services.event_bus import stream_id_key
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_EVICT = "evict"
+
+# Close code 1013 ("try again later") tells well-behaved clients to reconnect with backoff.
+_SLOW_CONSUMER_CLOSE_CODE = 1013
+_LATENCY_SAMPLES = 1000
+
+SEVERITY_LEVELS = ("LOW", "MED", "HIGH", "CRITICAL")
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+
+def normalize_platform(platform: Optional[str]) -> Optional[str]:
+    # Platforms compare case-insensitively; subscriptions and alert payloads both pass through here.
+    return platform.strip().lower() if isinstance(platform, str) else platform
+
+
+@dataclass(frozen=True)
+class Subscription:
+    # Empty sets and a missing floor mean "no restriction" on that field.
+    min_severity: Optional[str] = None
+    categories: frozenset = frozenset()
+    platforms: frozenset = frozenset()
+    assigned_to_me: bool = False
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "platforms", frozenset(normalize_platform(p) for p in self.platforms))
+
+    def matches(self, payload: dict, user_id: Optional[int]) -> bool:
+        if self.min_severity in SEVERITY_LEVELS:
+            if payload.get("severity") not in SEVERITY_LEVELS[SEVERITY_LEVELS.index(self.min_severity) :]:
+                return False
+        if self.categories and payload.get("category") not in self.categories:
+            return False
+        if self.platforms and normalize_platform(payload.get("platform")) not in self.platforms:
+            return False
+        if self.assigned_to_me and payload.get("assigned_to") != user_id:
+            return False
+        return True
+
+    def as_dict(self) -> dict:
+        return {
+            "min_severity": self.min_severity,
+            "categories": sorted(self.categories),
+            "platforms": sorted(self.platforms),
+            "assigned_to_me": self.assigned_to_me,
+        }
+
+
+class _FieldIndex:
+    # Connections bucketed by the values they accept, plus a wildcard bucket for
+    # connections that accept anything. Lookup cost is independent of client count.
+    def __init__(self) -> None:
+        self.wildcard: Set["_Connection"] = set()
+        self.buckets: Dict[Hashable, Set["_Connection"]] = {}
+
+    def add(self, connection: "_Connection", keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        if not keys:
+            self.wildcard.add(connection)
+        for key in keys:
+            self.buckets.setdefault(key, set()).add(connection)
+
+    def remove(self, connection: "_Connection", keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        if not keys:
+            self.wildcard.discard(connection)
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(connection)
+                if not bucket:
+                    del self.buckets[key]
+
+    def candidates(self, value: Hashable) -> Set["_Connection"]:
+        bucket = self.buckets.get(value)
+        return self.wildcard | bucket if bucket else self.wildcard
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket, queue_size: int, user_id: Optional[int] = None) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self.subscription = Subscription()
+        # While a resume is replaying missed alerts, live frames wait here instead of the queue.
+        self.backlog: Optional[deque] = None
+        self.backlog_overflowed = False
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.max_send_ms = 0.0
+        self.writer: Optional[asyncio.Task] = None
+
 
 class AlertWebSocketManager:
     def __init__(self) -> None:
-        self.connections: Set[WebSocket] = set()
+        self.connections: Dict[WebSocket, _Connection] = {}
+        self._by_severity = _FieldIndex()
+        self._by_category = _FieldIndex()
+        self._by_platform = _FieldIndex()
+        self._by_assignee = _FieldIndex()
         self._lock = asyncio.Lock()
+        self._send_latency_ms: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        # Close handshakes of evicted clients, run apart from the fan-out (see _evict).
+        self._closing: Set[asyncio.Task] = set()
+        self.broadcasts = 0
+        self.dropped = 0
+        self.evicted = 0
 
-    async def connect(self, websocket: WebSocket) -> None:
+    def _index_keys(self, connection: _Connection):
+        subscription = connection.subscription
+        severities = ()
+        if subscription.min_severity in SEVERITY_LEVELS:
+            severities = SEVERITY_LEVELS[SEVERITY_LEVELS.index(subscription.min_severity) :]
+        assignees = (connection.user_id,) if subscription.assigned_to_me else ()
+        return (
+            (self._by_severity, severities),
+            (self._by_category, subscription.categories),
+            (self._by_platform, subscription.platforms),
+            (self._by_assignee, assignees),
+        )
+
+    def _index(self, connection: _Connection) -> None:
+        for index, keys in self._index_keys(connection):
+            index.add(connection, keys)
+
+    def _unindex(self, connection: _Connection) -> None:
+        for index, keys in self._index_keys(connection):
+            index.remove(connection, keys)
+
+    async def connect(self, websocket: WebSocket, user_id: Optional[int] = None) -> None:
         await websocket.accept()
+        connection = _Connection(websocket, max(1, get_settings().ws_send_queue_size), user_id=user_id)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        async with self._lock:
+            self.connections[websocket] = connection
+            self._index(connection)
+
+    async def subscribe(self, websocket: WebSocket, subscription: Subscription) -> None:
         async with self._lock:
-            self.connections.add(websocket)
+            connection = self.connections.get(websocket)
+            if connection is None:
+                return
+            self._unindex(connection)
+            connection.subscription = subscription
+            self._index(connection)
+
+    def hold(self, websocket: WebSocket) -> None:
+        connection = self.connections.get(websocket)
+        if connection is not None and connection.backlog is None:
+            connection.backlog = deque()
+            connection.backlog_overflowed = False
+
+    async def _put_paced(self, connection: _Connection, text: str) -> bool:
+        # Waits for queue room instead of dropping, so the writer paces a replay of any
+        # length. False when the client went away or the backlog had to be abandoned.
+        if connection.backlog_overflowed or self.connections.get(connection.websocket) is not connection:
+            return False
+        try:
+            await asyncio.wait_for(connection.queue.put(text), timeout=get_settings().ws_send_timeout_sec)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def release(self, websocket: WebSocket, replayed: list[dict], trailer: Optional[dict] = None) -> int:
+        # Replayed alerts first, then the trailer, then live alerts that arrived meanwhile.
+        # Live frames already covered by the replay are skipped by event_id. Nothing is
+        # dropped silently: if frames cannot all be delivered the client gets "resync".
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return 0
+        sent = 0
+        last_key = None
+        complete = True
+        for payload in replayed:
+            if payload.get("event_id"):
+                last_key = stream_id_key(payload["event_id"])
+            visible = self._subscribed_payload(connection, payload)
+            if visible is not None:
+                if not await self._put_paced(connection, json.dumps(visible)):
+                    complete = False
+                    break
+                sent += 1
+        if complete and trailer is not None:
+            complete = await self._put_paced(connection, json.dumps(trailer))
+        # Live alerts keep joining the backlog while it drains; it is handed back to the
+        # normal path only once empty, with no await in between.
+        while complete and connection.backlog:
+            event_key, text = connection.backlog.popleft()
+            if last_key is None or event_key is None or event_key > last_key:
+                complete = await self._put_paced(connection, text)
+        overflowed = connection.backlog_overflowed
+        complete = complete and not overflowed
+        connection.backlog = None
+        connection.backlog_overflowed = False
+        if not complete and self.connections.get(websocket) is connection:
+            reason = "too many live alerts during resume" if overflowed else "resume could not be delivered"
+            self._enqueue(connection, json.dumps({"type": "resync", "reason": reason}), POLICY_DROP_OLDEST)
+        return sent
 
     async def disconnect(self, websocket: WebSocket) -> None:
         async with self._lock:
-            if websocket in self.connections:
-                self.connections.remove(websocket)
+            connection = self.connections.get(websocket)
+            if connection is not None:
+                self._drop(connection)
 
-    async def broadcast_json(self, payload: dict) -> None:
-        stale = []
-        for ws in list(self.connections):
+    def _drop(self, connection: _Connection) -> None:
+        # No await: a connection is either fully registered or fully gone to every other task.
+        if self.connections.get(connection.websocket) is connection:
+            del self.connections[connection.websocket]
+            self._unindex(connection)
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    def _evict(self, connection: _Connection, reason: str) -> None:
+        # Evicted clients are the stalled ones, so the close handshake must not hold up
+        # the broadcast that evicts them: drop now, close in the background, bounded.
+        self.evicted += 1
+        self._drop(connection)
+        task = asyncio.create_task(self._close(connection.websocket, reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket, reason: str) -> None:
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=_SLOW_CONSUMER_CLOSE_CODE, reason=reason),
+                timeout=get_settings().ws_send_timeout_sec,
+            )
+        except Exception:
+            pass
+
+    async def _writer(self, connection: _Connection) -> None:
+        send_timeout = get_settings().ws_send_timeout_sec
+        while True:
+            text = await connection.queue.get()
+            started = time.perf_counter()
             try:
-                await ws.send_json(payload)
+                await asyncio.wait_for(connection.websocket.send_text(text), timeout=send_timeout)
+            except asyncio.TimeoutError:
+                self._evict(connection, "send timeout")
+                return
             except Exception:
-                stale.append(ws)
-        for ws in stale:
-            await self.disconnect(ws)
+                await self.disconnect(connection.websocket)
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._send_latency_ms.append(elapsed_ms)
+            connection.max_send_ms = max(connection.max_send_ms, elapsed_ms)
+            connection.sent += 1
+
+    def _enqueue(self, connection: _Connection, text: str, policy: str) -> bool:
+        try:
+            connection.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+        connection.dropped += 1
+        self.dropped += 1
+        if policy == POLICY_EVICT:
+            return False
+        # Downgrade: the client keeps its connection but loses its oldest unsent alert.
+        connection.queue.get_nowait()
+        connection.queue.put_nowait(text)
+        return True
+
+    def matching(self, payload: dict) -> Set[_Connection]:
+        candidate_sets = sorted(
+            (
+                self._by_severity.candidates(payload.get("severity")),
+                self._by_category.candidates(payload.get("category")),
+                self._by_platform.candidates(normalize_platform(payload.get("platform"))),
+                self._by_assignee.candidates(payload.get("assigned_to")),
+            ),
+            key=len,
+        )
+        # Intersect starting from the smallest set.
+        return candidate_sets[0].intersection(*candidate_sets[1:])
+
+    def send_json(self, websocket: WebSocket, payload: dict) -> None:
+        # Replies go through the writer queue so only one task ever sends on a socket.
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, json.dumps(payload), POLICY_DROP_OLDEST)
+
+    def _batch_frames(self, payload: dict) -> Dict[_Connection, str]:
+        # A batch event ("alerts": [...]) is cut down per connection to the alerts its
+        # subscription wants; connections wanting the same subset share one frame.
+        wanted: Dict[_Connection, list] = {}
+        for item in payload["alerts"]:
+            for connection in self.matching(item):
+                wanted.setdefault(connection, []).append(item)
+        frames: Dict[tuple, str] = {}
+        targets: Dict[_Connection, str] = {}
+        for connection, items in wanted.items():
+            key = tuple(id(item) for item in items)
+            if key not in frames:
+                frames[key] = json.dumps({**payload, "alerts": items})
+            targets[connection] = frames[key]
+        return targets
+
+    def _subscribed_payload(self, connection: _Connection, payload: dict) -> Optional[dict]:
+        if isinstance(payload.get("alerts"), list):
+            items = [item for item in payload["alerts"] if connection.subscription.matches(item, connection.user_id)]
+            return {**payload, "alerts": items} if items else None
+        return payload if connection.subscription.matches(payload, connection.user_id) else None
+
+    async def broadcast_json(self, payload: dict) -> None:
+        # Serialize once; every matching writer sends the same text frame.
+        self.broadcasts += 1
+        if isinstance(payload.get("alerts"), list):
+            targets = self._batch_frames(payload)
+        else:
+            matched = self.matching(payload)
+            text = json.dumps(payload) if matched else ""
+            targets = {connection: text for connection in matched}
+        if not targets:
+            return
+        policy = get_settings().ws_slow_consumer_policy
+        event_key = stream_id_key(payload["event_id"]) if payload.get("event_id") else None
+        for connection, text in targets.items():
+            if connection.backlog is not None:
+                # A resume that falls this far behind ends in "resync" rather than growing without bound.
+                if len(connection.backlog) >= max(1, get_settings().ws_replay_max):
+                    connection.backlog.clear()
+                    connection.backlog_overflowed = True
+                elif not connection.backlog_overflowed:
+                    connection.backlog.append((event_key, text))
+            elif not self._enqueue(connection, text, policy):
+                self._evict(connection, "slow consumer")
+
+    def stats(self) -> dict:
+        samples = list(self._send_latency_ms)
+        depths = [connection.queue.qsize() for connection in self.connections.values()]
+        return {
+            "connections": len(self.connections),
+            "broadcasts": self.broadcasts,
+            "dropped": self.dropped,
+            "evicted": self.evicted,
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_total": sum(depths),
+            "send_latency_ms": {
+                "p50": _percentile(samples, 0.5),
+                "p99": _percentile(samples, 0.99),
+                "max": round(max(samples, default=0.0), 2),
+            },
+            "clients": [
+                {
+                    "client": f"{connection.websocket.client.host}:{connection.websocket.client.port}"
+                    if connection.websocket.client
+                    else "",
+                    "connected_at": connection.connected_at,
+                    "user_id": connection.user_id,
+                    "subscription": connection.subscription.as_dict(),
+                    "queue_depth": connection.queue.qsize(),
+                    "sent": connection.sent,
+                    "dropped": connection.dropped,
+                    "max_send_ms": round(connection.max_send_ms, 2),
+                }
+                for connection in self.connections.values()
+            ],
+        }
 
 
 ws_manager = AlertWebSocketManager()
@@ -25,6 +25,8 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     worker_concurrency=2,
+    # Hard stop slightly after the per-analysis deadline in case a stage ignores it.
+    task_time_limit=settings.analysis_deadline_sec + 60,
     broker_use_ssl=_ssl_opts,
     redis_backend_use_ssl=_ssl_opts,
 )
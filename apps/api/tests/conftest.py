@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.db.models  # noqa: F401  (registers tables and search DDL on Base.metadata)
+from app.core.principals import principal_cache
+from app.db.session import Base, get_async_db
+from app.main import app
+
+
+def _create_sqlite_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture()
+def sqlite_path(tmp_path):
+    # A file rather than :memory:, so api_database and worker threads see the same data.
+    return tmp_path / "test.db"
+
+
+@pytest.fixture()
+def sqlite_engine(sqlite_path):
+    engine = _create_sqlite_engine(sqlite_path)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def module_sqlite_engine(tmp_path_factory):
+    # For data sets too expensive to rebuild per test; tests must not modify them.
+    engine = _create_sqlite_engine(tmp_path_factory.mktemp("db") / "test.db")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(sqlite_engine):
+    return sessionmaker(bind=sqlite_engine)
+
+
+@pytest.fixture()
+def db_session(session_factory):
+    with session_factory() as db:
+        yield db
+
+
+@pytest.fixture()
+def api_database(monkeypatch):
+    # Points the API's async sessions at a test SQLite file. NullPool: TestClient runs
+    # each request on a fresh event loop, and aiosqlite connections belong to one loop.
+    def install(path) -> None:
+        factory = async_sessionmaker(
+            create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool), expire_on_commit=False
+        )
+
+        async def override_db():
+            async with factory() as db:
+                yield db
+
+        monkeypatch.setitem(app.dependency_overrides, get_async_db, override_db)
+        # Users resolved against another test's database must not leak in.
+        principal_cache.clear()
+
+    return install
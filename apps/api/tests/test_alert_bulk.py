@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.db.models import Alert, AlertStatus, Analysis, Feedback, Post
+from app.main import app
+from app.services import alerting
+from app.services.alert_stats import alert_stats, rebuild_alert_counters
+
+
+@pytest.fixture()
+def env(monkeypatch, api_database, sqlite_path, session_factory):
+    published = []
+    monkeypatch.setattr(alerting, "publish_alert", lambda payload: published.append(payload) or "1-0")
+    with session_factory() as db:
+        for n in range(1, 7):
+            category = "hate_speech" if n <= 4 else "violence"
+            db.add(Post(id=n, platform="twitter" if n % 2 else "tiktok", platform_post_id=str(n), text="x"))
+            db.add(Analysis(id=n, post_id=n, category=category, severity="HIGH"))
+            db.add(Alert(id=n, post_id=n, analysis_id=n, category=category, severity="HIGH"))
+        db.commit()
+        rebuild_alert_counters(db)
+
+    api_database(sqlite_path)
+    return TestClient(app), session_factory, published
+
+
+def test_bulk_update_by_filter_records_feedback_and_one_event(env):
+    client, factory, published = env
+    response = client.patch(
+        "/alerts",
+        json={
+            "filter": {"category": "hate_speech", "status": "new"},
+            "status": "resolved",
+            "feedback": {"decision": "reject", "notes": "duplicate incident"},
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated": 4, "ids": [1, 2, 3, 4], "feedback_recorded": 4}
+
+    with factory() as db:
+        assert {a.id for a in db.query(Alert).filter(Alert.status == AlertStatus.RESOLVED)} == {1, 2, 3, 4}
+        assert db.query(Feedback).filter(Feedback.notes == "duplicate incident").count() == 4
+        assert alert_stats(db)["by_status"] == {"new": 2, "resolved": 4}
+
+    assert len(published) == 1
+    event = published[0]
+    assert event["event"] == "bulk_updated" and event["status"] == "resolved"
+    assert [(item["id"], item["platform"]) for item in event["alerts"]] == [
+        (1, "twitter"), (2, "tiktok"), (3, "twitter"), (4, "tiktok")
+    ]
+
+
+def test_bulk_update_by_ids_and_limits(env, monkeypatch):
+    client, factory, published = env
+    response = client.patch("/alerts", json={"ids": [5, 6, 99], "assigned_to": 3})
+    assert response.json()["ids"] == [5, 6]
+    with factory() as db:
+        assert [a.assigned_to for a in db.query(Alert).order_by(Alert.id)] == [None] * 4 + [3, 3]
+
+    monkeypatch.setattr(get_settings(), "alert_bulk_max", 3)
+    assert client.patch("/alerts", json={"filter": {}, "status": "resolved"}).status_code == 400
+    assert client.patch("/alerts", json={"status": "resolved"}).status_code == 400
+    assert client.patch("/alerts", json={"ids": [1]}).status_code == 400
+    assert client.patch("/alerts", json={"ids": [1, 2, 3, 98, 99], "status": "resolved"}).status_code == 400
+    with factory() as db:
+        assert db.query(Alert).filter(Alert.status == AlertStatus.RESOLVED).count() == 0
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.db.models import Alert, Analysis, Media, Post
+from app.main import app
+from app.services import alerting
+from app.services.alert_detail import detail_cache, load_alert_detail
+
+
+@pytest.fixture()
+def factory(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "media_root", "/app/storage")
+    monkeypatch.setattr(alerting, "publish_alert", lambda payload: "1-0")
+    with session_factory() as db:
+        db.add(Post(id=1, platform="twitter", platform_post_id="1", text="hello"))
+        db.add(Analysis(id=1, post_id=1, fusion_score=88.0, severity="CRITICAL", category="violence"))
+        db.add(Alert(id=1, post_id=1, analysis_id=1))
+        for n in range(2):
+            meta = {"evidence_frames": [f"/app/storage/frames/{n}.jpg"], "transcript_path": ""}
+            db.add(Media(post_id=1, type="video", path=f"/app/storage/media/{n}.mp4", meta_json=meta))
+        db.commit()
+    detail_cache.invalidate(1)
+    return session_factory
+
+
+@pytest.fixture()
+def client(factory, sqlite_path, api_database):
+    api_database(sqlite_path)
+    return TestClient(app)
+
+
+def test_detail_loads_in_one_statement(factory):
+    statements = []
+    with factory() as db:
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        detail = load_alert_detail(db, 1)
+    assert len(statements) == 1
+    assert [media["path"] for media in detail.post["media"]] == ["/storage/media/0.mp4", "/storage/media/1.mp4"]
+    assert detail.post["media"][1]["meta_json"]["evidence_frames"] == ["/storage/frames/1.jpg"]
+    assert detail.analysis["severity"] == "CRITICAL"
+
+
+def test_etag_revalidation_and_invalidation(client):
+    first = client.get("/alerts/1")
+    assert first.status_code == 200 and first.json()["post"]["text"] == "hello"
+    etag = first.headers["etag"]
+
+    hits = detail_cache.hits
+    assert client.get("/alerts/1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/alerts/1").content == first.content
+    assert detail_cache.hits == hits + 1
+
+    assert client.patch("/alerts/1", json={"status": "investigating"}).status_code == 200
+    after_patch = client.get("/alerts/1", headers={"If-None-Match": etag})
+    assert after_patch.status_code == 200 and after_patch.json()["status"] == "investigating"
+    assert after_patch.headers["etag"] != etag
+
+    assert client.post("/alerts/1/feedback", json={"decision": "approve"}).status_code == 200
+    assert client.get("/alerts/1", headers={"If-None-Match": after_patch.headers["etag"]}).status_code == 200
+    assert client.get("/alerts/404").status_code == 404
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.models import Alert, AlertStatus, Analysis, Post
+from app.main import app
+from app.routers import alerts as alerts_router
+from app.services.alert_export import ExportFilter, export_chunks
+
+START = datetime(2026, 2, 1)
+
+
+@pytest.fixture()
+def factory(session_factory):
+    with session_factory() as db:
+        for n in range(1, 11):
+            created = START + timedelta(hours=n)
+            db.add(Post(id=n, platform="twitter", platform_post_id=str(n), text=f'post, "{n}"\nසිංහල'))
+            db.add(Analysis(id=n, post_id=n, fusion_score=n * 10.0, text_probs={"violence": n / 10}, created_at=created))
+            if n % 2 == 0:
+                status = AlertStatus.RESOLVED if n == 10 else AlertStatus.NEW
+                db.add(Alert(id=n, post_id=n, analysis_id=n, status=status, created_at=created))
+        db.commit()
+    return session_factory
+
+
+def test_formats_stream_in_batches_with_filters(factory):
+    ndjson = list(export_chunks(factory, ExportFilter(), "ndjson", batch_size=2))
+    assert len(ndjson) == 3
+    rows = [json.loads(line) for line in b"".join(ndjson).decode().splitlines()]
+    assert [row["alert_id"] for row in rows] == [2, 4, 6, 8, 10]
+    assert rows[0]["text_probs"] == '{"violence": 0.2}' and rows[0]["alert_status"] == "new"
+
+    window = ExportFilter(kind="analyses", created_from=START + timedelta(hours=3), created_to=START + timedelta(hours=6))
+    table = csv.DictReader(io.StringIO(b"".join(export_chunks(factory, window, "csv", batch_size=2)).decode()))
+    analyses = list(table)
+    assert [(row["analysis_id"], row["alert_id"]) for row in analyses] == [("3", ""), ("4", "4"), ("5", "")]
+    assert analyses[0]["text"] == 'post, "3"\nසිංහල'
+
+    parquet = list(export_chunks(factory, ExportFilter(status=AlertStatus.NEW, include_raw=True), "parquet", batch_size=2))
+    assert len(parquet) >= 3
+    result = pq.read_table(io.BytesIO(b"".join(parquet)))
+    assert result.column("alert_id").to_pylist() == [2, 4, 6, 8]
+    assert result.column("alert_created_at").to_pylist()[0] == START + timedelta(hours=2)
+    assert "raw_json" in result.column_names
+
+
+def test_export_endpoint_streams_attachment(factory, sqlite_path, monkeypatch, api_database):
+    monkeypatch.setattr(alerts_router, "SessionLocal", factory)
+    api_database(sqlite_path)
+    response = TestClient(app).get("/alerts/export", params={"format": "csv", "status": "resolved"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    assert [row["alert_id"] for row in csv.DictReader(io.StringIO(response.text))] == ["10"]
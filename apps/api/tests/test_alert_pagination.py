@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, AlertStatus, Analysis
+from app.services.alert_queries import decode_cursor, encode_cursor, filter_alerts, keyset_page
+
+SEEDED_ROWS = 1_000_000
+
+
+def _page_query(db: Session, cursor=None, limit=20, **filters):
+    query = db.query(Alert, Analysis.fusion_score).join(Analysis, Analysis.id == Alert.analysis_id)
+    return keyset_page(filter_alerts(query, **filters), cursor, limit)
+
+
+def test_keyset_walk_visits_every_alert_once_with_tied_timestamps(db_session):
+    start = datetime(2026, 1, 1)
+    db = db_session
+    for n in range(1, 58):
+        db.add(Analysis(id=n, post_id=n, fusion_score=n))
+        # Three alerts share each timestamp, so (created_at, id) must break ties.
+        db.add(Alert(id=n, post_id=n, analysis_id=n, created_at=start + timedelta(seconds=n // 3)))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows = _page_query(db, cursor, limit=10).all()
+        page, more = rows[:10], len(rows) > 10
+        seen.extend(alert.id for alert, _ in page)
+        if not more:
+            break
+        cursor = encode_cursor(page[-1][0].created_at, page[-1][0].id)
+
+    assert seen == sorted(range(1, 58), key=lambda n: (n // 3, n), reverse=True)
+    assert decode_cursor(encode_cursor(start, 7)) == (start, 7)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.fixture(scope="module")
+def million_alerts(module_sqlite_engine):
+    engine = module_sqlite_engine
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA synchronous=OFF"))
+        conn.execute(
+            text(
+                """
+                WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows)
+                INSERT INTO alerts (id, post_id, analysis_id, status, category, severity, priority, created_at, updated_at)
+                SELECT x, x, x,
+                  CASE x % 10 WHEN 0 THEN 'INVESTIGATING' WHEN 1 THEN 'RESOLVED' ELSE 'NEW' END,
+                  CASE x % 7 WHEN 0 THEN 'hate_speech' WHEN 1 THEN 'harassment' WHEN 2 THEN 'child_abuse'
+                    WHEN 3 THEN 'murder_threat' ELSE 'general_violence' END,
+                  CASE (x / 7) % 4 WHEN 0 THEN 'LOW' WHEN 1 THEN 'MED' WHEN 2 THEN 'HIGH' ELSE 'CRITICAL' END,
+                  x / 21600.0,
+                  strftime('%Y-%m-%d %H:%M:%S', 1767225600 + x / 3, 'unixepoch') || '.000000',
+                  strftime('%Y-%m-%d %H:%M:%S', 1767225600 + x / 3, 'unixepoch') || '.000000'
+                FROM n
+                """
+            ),
+            {"rows": SEEDED_ROWS},
+        )
+        conn.execute(text("ANALYZE"))
+    return engine
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({}, "ix_alerts_created_id"),
+        ({"status": AlertStatus.NEW}, "ix_alerts_status_created_id"),
+        ({"status": AlertStatus.NEW, "category": "hate_speech"}, "ix_alerts_status_category_created_id"),
+        ({"status": AlertStatus.NEW, "severity": "HIGH"}, "ix_alerts_status_severity_created_id"),
+        ({"category": "hate_speech"}, "ix_alerts_category_created_id"),
+    ],
+)
+def test_list_queries_seek_an_index_instead_of_sorting(million_alerts, filters, index):
+    deep_cursor = encode_cursor(datetime(2026, 1, 2, 12), 123_456)
+    with Session(million_alerts) as db:
+        for cursor in (None, deep_cursor):
+            statement = _page_query(db, cursor, **filters).statement
+            sql = str(statement.compile(million_alerts, compile_kwargs={"literal_binds": True}))
+            plan = " | ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+            # Served in index order: no full scan of alerts and no sort of the filtered rows.
+            assert f"alerts USING INDEX {index}" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
+            if cursor:
+                assert "created_at<?" in plan, plan
@@ -0,0 +1,57 @@
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models import Alert, Analysis, Post
+from app.db.search import POSTS_TSV_SQL
+from app.services.alert_queries import fts5_match_query, search_alerts
+
+POSTS = [
+    ("Weather is nice in Kandy today", "news_lk"),
+    ("He threatened to kill the shop owner", "witness1"),
+    ("kill kill kill them all, threats everywhere", "angry_user"),
+    ("ඔහු මරා දමනවා කියලා තර්ජනය කළා", "සිංහල_පුවත්"),
+    ("ශ්‍රී ලංකාවේ ප්‍රචණ්ඩත්වය වැඩි වෙලා", "reporter"),
+]
+
+
+def _seed(db: Session) -> Session:
+    for n, (text, author) in enumerate(POSTS, start=1):
+        db.add(Post(id=n, platform="twitter", platform_post_id=str(n), text=text, author=author))
+        db.add(Analysis(id=n, post_id=n))
+        db.add(Alert(id=n, post_id=n, analysis_id=n))
+    db.commit()
+    return db
+
+
+def _search(db: Session, q: str) -> list[int]:
+    return [alert.id for alert in search_alerts(db.query(Alert), q, "sqlite").all()]
+
+
+def test_sqlite_search_is_ranked_and_handles_sinhala(db_session):
+    db = _seed(db_session)
+    # Denser match ranks first; prefixes match ("threat" -> threatened, threats).
+    assert _search(db, "kill") == [3, 2]
+    assert _search(db, "threat kill") == [3, 2]
+    assert _search(db, "මරා") == [4]
+    assert _search(db, "තර්ජන") == [4]
+    assert _search(db, "ප්‍රචණ්ඩ") == [5]
+    assert _search(db, "angry") == [3]
+    assert _search(db, '" NEAR(') == []
+
+    # Triggers keep the index in sync with edits.
+    db.get(Post, 1).text = "Someone will kill again"
+    db.commit()
+    assert sorted(_search(db, "kill")) == [1, 2, 3]
+    assert _search(db, "weather") == []
+
+
+def test_fts5_query_quotes_user_input():
+    assert fts5_match_query('kill -NEAR "x') == '"kill"* "-NEAR"* "x"*'
+
+
+def test_postgres_search_uses_the_indexed_expression():
+    query = search_alerts(Session().query(Alert), "kill", "postgresql")
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    assert POSTS_TSV_SQL in sql
+    assert "websearch_to_tsquery('simple'" in sql
+    assert "ILIKE" in sql.upper() and "ts_rank_cd" in sql
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import AlertCounter, AlertStatus, Analysis, Post
+from app.services import alerting
+from app.services.alert_stats import alert_stats, rebuild_alert_counters, record_status_changes
+
+NOW = datetime(2026, 3, 1, 12, 30)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+def _create(db: Session, n: int, severity: str, category: str, platform: str):
+    post = Post(id=n, platform=platform, platform_post_id=str(n), text="x")
+    analysis = Analysis(id=n, post_id=n, fusion_score=90.0, severity=severity, category=category)
+    db.add_all([post, analysis])
+    db.commit()
+    return alerting.maybe_create_alert(db, post, analysis)
+
+
+def test_counters_follow_creates_and_status_changes(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "alert_threshold", 50.0)
+    monkeypatch.setattr(alerting, "publish_alert", lambda payload: "1-0")
+    monkeypatch.setattr(alerting, "datetime", _FrozenDatetime)
+    db = db_session
+    first = _create(db, 1, "HIGH", "hate_speech", "twitter")
+    _create(db, 2, "HIGH", "violence", "facebook")
+    _create(db, 3, "LOW", "violence", "twitter")
+    record_status_changes(db, [(AlertStatus.NEW, AlertStatus.RESOLVED), (AlertStatus.NEW, AlertStatus.NEW)])
+    first.status = AlertStatus.RESOLVED
+    db.commit()
+
+    stats = alert_stats(db, "hour", buckets=3, now=NOW)
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"new": 2, "resolved": 1}
+    assert stats["by_severity"] == {"HIGH": 2, "LOW": 1}
+    assert stats["by_category"] == {"hate_speech": 1, "violence": 2}
+    assert stats["by_platform"] == {"twitter": 2, "facebook": 1}
+    assert [bucket["total"] for bucket in stats["trend"]["buckets"]] == [0, 0, 3]
+    assert stats["trend"]["buckets"][-1] == {"start": "2026-03-01T12:00:00", "counts": {"HIGH": 2, "LOW": 1}, "total": 3}
+    assert alert_stats(db, "day", buckets=1, now=NOW)["trend"]["buckets"][0]["total"] == 3
+
+    # A rebuild from the alert rows lands on the same numbers.
+    before = {(c.dimension, c.value, c.bucket_start): c.count for c in db.query(AlertCounter)}
+    assert rebuild_alert_counters(db) == 3
+    after = {(c.dimension, c.value, c.bucket_start): c.count for c in db.query(AlertCounter) if c.count}
+    assert after == {key: count for key, count in before.items() if count}
+
+
+def test_counter_upsert_waits_for_commit_and_drops_on_rollback(sqlite_engine):
+    statements = []
+    event.listen(sqlite_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(sqlite_engine) as db:
+        record_status_changes(db, [(AlertStatus.NEW, AlertStatus.RESOLVED)])
+        db.rollback()
+        record_status_changes(db, [(AlertStatus.NEW, AlertStatus.INVESTIGATING)])
+        record_status_changes(db, [(AlertStatus.NEW, AlertStatus.INVESTIGATING)])
+        assert not any("alert_counters" in sql for sql in statements)
+        db.commit()
+        # Both changes went out in the one upsert at commit; the rolled-back one never did.
+        assert sum("alert_counters" in sql for sql in statements) == 1
+        counts = {(c.dimension, c.value): c.count for c in db.query(AlertCounter)}
+        assert counts == {("status", "new"): -2, ("status", "investigating"): 2}
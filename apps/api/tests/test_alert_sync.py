@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from app.core.config import get_settings
+from app.db.models import Alert, AlertStatus, Analysis, Post
+from app.services import alert_sync
+from app.services.alert_sync import open_alerts_snapshot, replay_since
+from app.services.event_bus import stream_id_key
+from app.services.ws_manager import Subscription
+
+
+class FakeRangeClient:
+    # XRANGE/XREVRANGE over a stream whose oldest entries may have been trimmed.
+    def __init__(self, first: int, last: int) -> None:
+        self.entries = [(f"{n}-0", {"data": json.dumps({"id": n})}) for n in range(first, last + 1)]
+
+    async def xrange(self, stream, min="-", max="+", count=None):
+        entries = self.entries
+        if min.startswith("("):
+            entries = [e for e in entries if stream_id_key(e[0]) > stream_id_key(min[1:])]
+        return entries[:count]
+
+    async def xrevrange(self, stream, max="+", min="-", count=None):
+        return list(reversed(self.entries))[:count]
+
+
+def test_replay_returns_missed_alerts_in_order():
+    client = FakeRangeClient(1, 1200)
+    replayed = asyncio.run(replay_since("7-0", limit=2000, client=client))
+    assert [p["id"] for p in replayed] == list(range(8, 1201))
+    assert replayed[-1]["event_id"] == "1200-0"
+
+
+def test_replay_refuses_trimmed_or_oversized_gaps():
+    client = FakeRangeClient(100, 300)
+    assert asyncio.run(replay_since("50-0", limit=1000, client=client)) is None
+    assert asyncio.run(replay_since("120-0", limit=10, client=client)) is None
+    assert asyncio.run(replay_since("not-a-cursor", limit=10, client=client)) is None
+
+
+def test_concurrent_snapshots_share_one_query(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ws_snapshot_ttl_sec", 60.0)
+    monkeypatch.setattr(alert_sync, "_snapshot_cache", {})
+    calls = []
+
+    def fake_query(subscription, user_id, limit):
+        calls.append(subscription)
+        return [[1, 10, "violence", "HIGH", 70.0, "new", "tiktok", None, "2026-01-01T00:00:00"]], False
+
+    monkeypatch.setattr(alert_sync, "_query_snapshot", fake_query)
+
+    async def run():
+        client = FakeRangeClient(1, 5)
+        high = Subscription(min_severity="HIGH")
+        snapshots = await asyncio.gather(*[open_alerts_snapshot(high, None, client) for _ in range(50)])
+        await open_alerts_snapshot(Subscription(), None, client)
+        return snapshots
+
+    snapshots = asyncio.run(run())
+    assert len(calls) == 2
+    assert all(snapshot["cursor"] == "5-0" and len(snapshot["rows"]) == 1 for snapshot in snapshots)
+
+
+def test_snapshot_filters_on_the_alert_columns(session_factory, monkeypatch):
+    with session_factory() as db:
+        for n, (category, severity) in enumerate([("violence", "HIGH"), ("hate_speech", "CRITICAL"), ("violence", "LOW")], 1):
+            db.add(Post(id=n, platform=" TikTok", platform_post_id=str(n)))
+            # The analysis was re-scored after the alert was raised; the alert row is what counts.
+            db.add(Analysis(id=n, post_id=n, fusion_score=80.0, category="general_violence", severity="LOW"))
+            db.add(Alert(id=n, post_id=n, analysis_id=n, category=category, severity=severity))
+        db.add(Post(id=4, platform="tiktok", platform_post_id="4"))
+        db.add(Analysis(id=4, post_id=4, category="violence", severity="HIGH"))
+        db.add(Alert(id=4, post_id=4, analysis_id=4, category="violence", severity="HIGH", status=AlertStatus.RESOLVED))
+        db.commit()
+    monkeypatch.setattr(alert_sync, "SessionLocal", session_factory)
+
+    subscription = Subscription(categories=frozenset({"violence"}), min_severity="HIGH", platforms=frozenset({"tiktok"}))
+    rows, truncated = alert_sync._query_snapshot(subscription, None, 10)
+    assert [row[:5] for row in rows] == [[1, 1, "violence", "HIGH", 80.0]]
+    assert truncated is False
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+import pyarrow.dataset as ds
+
+from app.core.config import get_settings
+from app.db.models import (
+    Alert,
+    AlertCounter,
+    AlertStatus,
+    Analysis,
+    Feedback,
+    FeedbackDecision,
+    IngestedFile,
+    Media,
+    Post,
+    User,
+)
+from app.services.alert_stats import alert_stats, rebuild_alert_counters
+from app.services.archival import archive_cold_data, archive_root, next_month
+
+NOW = datetime(2026, 9, 15)
+
+
+def _seed_post(db, post_id: int, created_at: datetime, alert_status=None) -> None:
+    db.add(Post(id=post_id, platform="twitter", platform_post_id=str(post_id), created_at=created_at))
+    db.add(Media(post_id=post_id, type="image", path=f"/tmp/{post_id}.jpg", meta_json={}))
+    db.add(Analysis(id=post_id, post_id=post_id, explanation_json=[{"why": "knife"}], created_at=created_at))
+    if alert_status is not None:
+        db.add(Alert(id=post_id, post_id=post_id, analysis_id=post_id, status=alert_status, created_at=created_at))
+
+
+def _counters(db) -> dict:
+    rows = db.query(AlertCounter.dimension, AlertCounter.value, AlertCounter.bucket_start, AlertCounter.count)
+    return {tuple(row[:3]): row[3] for row in rows if row[3]}
+
+
+def test_archive_moves_cold_months_to_parquet(tmp_path, monkeypatch, db_session):
+    monkeypatch.setattr(get_settings(), "archive_root", str(tmp_path / "archive"))
+    db = db_session
+    db.add(User(id=1, email="m@x.io", password_hash="x"))
+    _seed_post(db, 1, datetime(2026, 1, 3), AlertStatus.RESOLVED)
+    _seed_post(db, 2, datetime(2026, 1, 20))
+    _seed_post(db, 3, datetime(2026, 1, 25), AlertStatus.INVESTIGATING)
+    _seed_post(db, 4, datetime(2026, 2, 10), AlertStatus.RESOLVED)
+    _seed_post(db, 5, datetime(2026, 8, 1), AlertStatus.RESOLVED)
+    db.add(Feedback(alert_id=1, user_id=1, decision=FeedbackDecision.APPROVE))
+    db.add(IngestedFile(file_name="a.json", content_hash="h", status="done", post_id=1))
+    db.commit()
+    rebuild_alert_counters(db)
+
+    result = archive_cold_data(db, now=NOW, after_days=180, batch_size=1)
+    assert result.months == ["2026-01", "2026-02"]
+    assert result.rows == {"posts": 3, "media": 3, "analyses": 3, "alerts": 2, "feedback": 1}
+
+    # The open alert's post stays hot; later months are untouched.
+    assert sorted(post_id for (post_id,) in db.query(Post.id)) == [3, 5]
+    assert sorted(alert_id for (alert_id,) in db.query(Alert.id)) == [3, 5]
+    assert db.query(Feedback).count() == 0
+    assert db.query(IngestedFile.post_id).scalar() is None
+    assert archive_cold_data(db, now=NOW, after_days=180).months == []
+
+    # Counters follow the rows out, so they still match a recount of the live tables.
+    archived_counts = _counters(db)
+    assert alert_stats(db, "day", now=NOW)["by_status"] == {"investigating": 1, "resolved": 1}
+    rebuild_alert_counters(db)
+    assert archived_counts == _counters(db)
+
+    alerts = ds.dataset(archive_root() / "alerts", partitioning="hive").to_table().to_pylist()
+    assert sorted((row["id"], row["status"], str(row["month"])) for row in alerts) == [
+        (1, "resolved", "2026-01"),
+        (4, "resolved", "2026-02"),
+    ]
+    analyses = ds.dataset(archive_root() / "analyses", partitioning="hive").to_table().to_pylist()
+    assert json.loads(analyses[0]["explanation_json"]) == [{"why": "knife"}]
+
+
+def test_next_month_rolls_over_the_year():
+    assert next_month(datetime(2025, 12, 1)) == datetime(2026, 1, 1)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import anyio.to_thread
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.core.principals import principal_cache
+from app.db.models import Alert, Analysis, Post, User, UserRole
+from app.db.session import async_database_url, get_async_db
+from app.main import app
+
+THREADS = 4
+REQUESTS = 40
+STATEMENT_LATENCY_SEC = 0.05
+
+
+def test_async_handlers_are_not_bounded_by_the_threadpool(sqlite_path, sqlite_engine, monkeypatch):
+    with Session(sqlite_engine) as db:
+        db.add(User(id=1, email="admin@x.io", password_hash="x", role=UserRole.ADMIN))
+        for n in range(1, 6):
+            db.add(Post(id=n, platform="twitter", platform_post_id=str(n)))
+            db.add(Analysis(id=n, post_id=n, fusion_score=80.0))
+            db.add(Alert(id=n, post_id=n, analysis_id=n, priority=float(n), created_at=datetime(2026, 1, n)))
+        db.commit()
+
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def slow_statement(_sql: str) -> None:
+        # Runs in the connection's driver thread, like waiting on a network round trip.
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(STATEMENT_LATENCY_SEC)
+        with lock:
+            in_flight -= 1
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", pool_size=REQUESTS, max_overflow=0)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def add_latency(dbapi_connection, _record):
+        await_only(dbapi_connection.driver_connection.set_trace_callback(slow_statement))
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_db():
+        async with factory() as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, override_db)
+    principal_cache.clear()
+
+    async def run_load():
+        # Shrink Starlette's threadpool (40 by default) so the difference is unambiguous.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADS
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+                return await asyncio.gather(*[client.get("/alerts/queue?limit=5") for _ in range(REQUESTS)])
+        finally:
+            await engine.dispose()
+
+    responses = asyncio.run(run_load())
+    assert all(response.status_code == 200 for response in responses)
+    assert [item["id"] for item in responses[0].json()] == [5, 4, 3, 2, 1]
+    # Far more queries overlapped than there are threads to run handlers on.
+    assert peak > THREADS * 4
+
+
+def test_async_url_keeps_ssl_mode_for_asyncpg():
+    url = async_database_url("postgresql+psycopg2://u:p@db:5432/app?sslmode=require&application_name=api")
+    assert make_url(url).query == {"ssl": "require", "application_name": "api"}
+    _, connect_args = create_async_engine(url).dialect.create_connect_args(make_url(url))
+    assert connect_args["ssl"] == "require" and "sslmode" not in connect_args
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
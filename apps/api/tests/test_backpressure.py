@@ -0,0 +1,97 @@
+from app.core.config import get_settings
+from app.services import backpressure
+from app.services.backpressure import (
+    DECISION_ADMIT,
+    DECISION_DEFER,
+    DECISION_SHED,
+    LEVEL_CRITICAL,
+    LEVEL_HIGH,
+    LEVEL_OK,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    QueueState,
+)
+
+
+def test_queue_level_from_depth_and_age():
+    assert backpressure._level(depth=10, age_sec=5) == LEVEL_OK
+    assert backpressure._level(depth=600, age_sec=5) == LEVEL_HIGH
+    assert backpressure._level(depth=10, age_sec=400) == LEVEL_HIGH
+    assert backpressure._level(depth=5000, age_sec=5) == LEVEL_CRITICAL
+
+
+def test_high_priority_always_admitted():
+    for level in (LEVEL_OK, LEVEL_HIGH, LEVEL_CRITICAL):
+        assert backpressure._decide(level, PRIORITY_HIGH) == DECISION_ADMIT
+
+
+def test_low_priority_deferred_then_sampled(monkeypatch):
+    assert backpressure._decide(LEVEL_HIGH, PRIORITY_NORMAL) == DECISION_ADMIT
+    assert backpressure._decide(LEVEL_HIGH, PRIORITY_LOW) == DECISION_DEFER
+    assert backpressure._decide(LEVEL_CRITICAL, PRIORITY_NORMAL) == DECISION_DEFER
+    monkeypatch.setattr(backpressure.random, "random", lambda: 0.99)
+    assert backpressure._decide(LEVEL_CRITICAL, PRIORITY_LOW) == DECISION_SHED
+    monkeypatch.setattr(backpressure.random, "random", lambda: 0.0)
+    assert backpressure._decide(LEVEL_CRITICAL, PRIORITY_LOW) == DECISION_ADMIT
+
+
+class _DeferredList:
+    def __init__(self, post_ids):
+        self.post_ids = [str(post_id) for post_id in post_ids]
+        self.lpops = 0
+
+    def lpop(self, key, count=None):
+        self.lpops += 1
+        batch, self.post_ids = self.post_ids[:count], self.post_ids[count:]
+        return batch or None
+
+    def hincrby(self, key, field, amount):
+        pass
+
+
+def _capture_groups(monkeypatch) -> list[list[int]]:
+    sent: list[list[int]] = []
+
+    class _Group:
+        def __init__(self, signatures):
+            self.post_ids = [signature.args[0] for signature in signatures]
+
+        def apply_async(self):
+            sent.append(self.post_ids)
+
+    monkeypatch.setattr(backpressure, "group", _Group)
+    return sent
+
+
+def test_deferred_posts_drain_on_the_timer_once_the_queue_recovers(monkeypatch):
+    deferred = _DeferredList(range(1, 6))
+    sent = _capture_groups(monkeypatch)
+    level = [LEVEL_HIGH]
+    monkeypatch.setattr(backpressure, "_redis", lambda: deferred)
+    monkeypatch.setattr(backpressure, "queue_state", lambda refresh=False: QueueState(0, 0.0, level[0]))
+    monkeypatch.setattr(get_settings(), "ingest_deferred_drain_batch", 2)
+
+    assert backpressure.drain_deferred_if_ok() == 0
+    level[0] = LEVEL_OK
+    assert [backpressure.drain_deferred_if_ok() for _ in range(4)] == [2, 2, 1, 0]
+    assert sent == [[1, 2], [3, 4], [5]]
+    assert deferred.lpops == 4
+
+
+def test_admitting_a_post_does_not_touch_the_deferred_list(monkeypatch):
+    deferred = _DeferredList([7])
+    admitted = []
+    monkeypatch.setattr(backpressure, "_redis", lambda: deferred)
+    monkeypatch.setattr(backpressure, "queue_state", lambda refresh=False: QueueState(0, 0.0, LEVEL_OK))
+    monkeypatch.setattr(backpressure, "send_to_queue", admitted.append)
+    monkeypatch.setattr(backpressure, "_record", lambda *outcomes: None)
+    _capture_groups(monkeypatch)
+
+    class _Post:
+        id = 9
+
+    assert backpressure.enqueue_analysis(None, _Post()) == DECISION_ADMIT
+    assert backpressure.enqueue_analysis_batch(None, [_Post()]) == {9: DECISION_ADMIT}
+    assert admitted == [9]
+    assert deferred.lpops == 0
@@ -0,0 +1,49 @@
+from app.core.config import get_settings
+from app.db.models import Analysis, Media, Post
+from app.services import pipeline
+from app.services.deadline import Deadline
+
+
+def test_deadline_remaining_budget():
+    deadline = Deadline.after(60)
+    assert not deadline.expired()
+    assert 0 < deadline.timeout() <= 60
+    assert deadline.timeout(cap=5) == 5
+    assert deadline.is_partial is False
+
+
+def test_deadline_expired_marks_partial():
+    deadline = Deadline.after(0)
+    assert deadline.expired()
+    assert deadline.timeout() == 0.0
+    deadline.mark_timed_out("video")
+    deadline.mark_timed_out("video")
+    assert deadline.timed_out_stages == ["video"]
+    assert deadline.is_partial is True
+
+
+def test_stage_past_the_deadline_makes_the_analysis_partial(tmp_path, monkeypatch, db_session):
+    class _TextModel:
+        def predict(self, text, lang):
+            return {"general_violence": 0.1}
+
+    class _VideoModel:
+        def analyze(self, *args, **kwargs):
+            raise AssertionError("video stage must be skipped once the deadline has passed")
+
+    monkeypatch.setattr(get_settings(), "analysis_deadline_sec", 0)
+    monkeypatch.setattr(get_settings(), "media_root", str(tmp_path / "media"))
+    monkeypatch.setattr(pipeline, "get_text_model", lambda: _TextModel())
+    monkeypatch.setattr(pipeline, "get_video_model", lambda: _VideoModel())
+    db = db_session
+    post = Post(id=1, platform="twitter", platform_post_id="1", text="clip")
+    db.add(post)
+    db.add(Media(post_id=1, type="video", path=str(tmp_path / "clip.mp4")))
+    db.commit()
+
+    result = pipeline.run_analysis(db, post)
+    analysis = db.get(Analysis, result["analysis_id"])
+    assert analysis.is_partial is True
+    assert analysis.timed_out_stages == ["video", "audio"]
+    assert result["partial"] is True and result["timed_out_stages"] == ["video", "audio"]
+    assert "partial=timed_out:video,audio" in analysis.explanation_json
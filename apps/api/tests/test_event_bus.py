@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import socket
+
+import redis
+
+from app.core.config import get_settings
+from app.services import event_bus
+from app.services.event_bus import STREAM_ALERTS, consume_alerts, default_consumer_group, prune_abandoned_groups
+
+
+class FakeStreamClient:
+    # Just enough of XADD/XGROUP/XREADGROUP/XACK for one stream and one group.
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, dict]] = []
+        self.groups: dict[str, int] = {}
+        self.pending: dict[str, list[str]] = {}
+        self.acked: list[str] = []
+        self.idle: dict[str, dict[str, int]] = {}
+
+    def add(self, payload: dict) -> str:
+        entry_id = f"{len(self.entries) + 1}-0"
+        self.entries.append((entry_id, {"data": json.dumps(payload)}))
+        return entry_id
+
+    async def xgroup_create(self, stream, group, id="$", mkstream=False):
+        if group in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.groups[group] = len(self.entries) if id == "$" else 0
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        pending = self.pending.setdefault(consumer, [])
+        if streams[STREAM_ALERTS] == "0":
+            batch = [entry for entry in self.entries if entry[0] in pending]
+        else:
+            batch = self.entries[self.groups[group] :][:count]
+            self.groups[group] += len(batch)
+            pending.extend(entry_id for entry_id, _ in batch)
+            if not batch:
+                await asyncio.sleep(0.01)
+        return [[STREAM_ALERTS, batch]] if batch else []
+
+    async def xinfo_groups(self, stream):
+        return [{"name": group} for group in self.groups]
+
+    async def xinfo_consumers(self, stream, group):
+        return [{"name": name, "idle": idle} for name, idle in self.idle.get(group, {}).items()]
+
+    async def xgroup_destroy(self, stream, group):
+        del self.groups[group]
+
+    async def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+        for pending in self.pending.values():
+            for entry_id in ids:
+                if entry_id in pending:
+                    pending.remove(entry_id)
+
+
+async def _consume_until(client, expected: int, **kwargs) -> list[dict]:
+    received: list[dict] = []
+
+    async def on_message(payload: dict) -> None:
+        received.append(payload)
+
+    task = asyncio.create_task(consume_alerts(on_message, group="g", consumer="c", client=client, **kwargs))
+    for _ in range(200):
+        if len(received) >= expected:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    return received
+
+
+def test_consumer_redelivers_unacked_entries_then_reads_new():
+    client = FakeStreamClient()
+    asyncio.run(client.xgroup_create(STREAM_ALERTS, "g"))
+    first = client.add({"id": 1})
+    # Delivered to this consumer before a crash, never acknowledged.
+    client.groups["g"] = 1
+    client.pending["c"] = [first]
+    client.add({"id": 2})
+
+    received = asyncio.run(_consume_until(client, 2))
+    assert [(p["id"], p["event_id"]) for p in received] == [(1, "1-0"), (2, "2-0")]
+    assert client.acked == ["1-0", "2-0"]
+
+
+def test_failing_handler_does_not_block_the_stream(monkeypatch):
+    client = FakeStreamClient()
+    client.add({"id": 1})
+    client.add({"id": 2})
+    monkeypatch.setattr(event_bus, "_ensure_group", lambda client, group: _created(client, group))
+
+    calls = []
+
+    async def flaky(payload: dict) -> None:
+        calls.append(payload["id"])
+        if payload["id"] == 1:
+            raise RuntimeError("socket closed")
+
+    async def run() -> None:
+        task = asyncio.create_task(consume_alerts(flaky, group="g", consumer="c", client=client))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+    assert calls == [1, 2]
+    assert client.acked == ["1-0", "2-0"]
+
+
+async def _created(client: FakeStreamClient, group: str) -> None:
+    client.groups.setdefault(group, 0)
+
+
+def test_groups_nobody_reads_from_are_removed():
+    client = FakeStreamClient()
+    for group in ("api", "api-old-host", "api-1", "api-never-read"):
+        asyncio.run(client.xgroup_create(STREAM_ALERTS, group))
+    client.idle = {"api": {"api": 10}, "api-old-host": {"api-old-host": 90_000_000}, "api-1": {"api-1": 5_000}}
+
+    removed = asyncio.run(prune_abandoned_groups(client, "api", max_idle_ms=86_400_000))
+    # A group nobody has read from yet may belong to a replica that is just starting.
+    assert removed == ["api-old-host"]
+    assert sorted(client.groups) == ["api", "api-1", "api-never-read"]
+
+
+def test_default_group_is_per_process(monkeypatch):
+    monkeypatch.setattr(get_settings(), "event_bus_group", "")
+    assert default_consumer_group() == f"api-{socket.gethostname()}-{os.getpid()}"
+    monkeypatch.setattr(get_settings(), "event_bus_group", "api-0")
+    assert default_consumer_group() == "api-0"
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from app.db import models
+from app.services import folder_watcher
+from app.services.folder_watcher import LEDGER_FAILED, LEDGER_INGESTED, LEDGER_KNOWN, process_drop_file
+from app.services.platform_adapters import FolderWatchAdapter
+
+
+def _fake_ingest(calls):
+    def ingest(db_factory, path):
+        calls.append(path.name)
+        return SimpleNamespace(id=len(calls))
+
+    return ingest
+
+
+def test_processed_file_is_archived_and_recorded(tmp_path, monkeypatch, session_factory):
+    calls = []
+    monkeypatch.setattr(folder_watcher, "ingest_demo_file", _fake_ingest(calls))
+    drop_dir, archive_dir = tmp_path / "in", tmp_path / "archive"
+    drop_dir.mkdir()
+    (drop_dir / "a.json").write_text('{"text": "hello"}')
+
+    assert process_drop_file(session_factory, drop_dir / "a.json", archive_dir) == LEDGER_INGESTED
+    assert not (drop_dir / "a.json").exists()
+    assert (archive_dir / "a.json").exists()
+
+    # Same name and content dropped again is archived without re-ingesting.
+    (drop_dir / "a.json").write_text('{"text": "hello"}')
+    assert process_drop_file(session_factory, drop_dir / "a.json", archive_dir) == LEDGER_KNOWN
+    assert calls == ["a.json"]
+
+    db = session_factory()
+    rows = db.query(models.IngestedFile).all()
+    db.close()
+    assert [(row.file_name, row.status, row.post_id) for row in rows] == [("a.json", LEDGER_INGESTED, 1)]
+
+
+def test_unparseable_file_moves_to_failed_once_settled(tmp_path, session_factory):
+    drop_dir, archive_dir = tmp_path / "in", tmp_path / "archive"
+    drop_dir.mkdir()
+    path = drop_dir / "bad.json"
+    path.write_text("{not json")
+
+    assert process_drop_file(session_factory, path, archive_dir) is None
+    assert path.exists()
+
+    stale = time.time() - 60
+    os.utime(path, (stale, stale))
+    assert process_drop_file(session_factory, path, archive_dir) == LEDGER_FAILED
+    assert (archive_dir / "failed" / "bad.json").exists()
+
+
+def test_adapter_catches_up_on_existing_files_in_polling_mode(tmp_path, monkeypatch, session_factory):
+    calls = []
+    monkeypatch.setattr(folder_watcher, "ingest_demo_file", _fake_ingest(calls))
+    drop_dir = tmp_path / "in"
+    drop_dir.mkdir()
+    for name in ("one.json", "two.json", "notes.txt"):
+        (drop_dir / name).write_text("{}")
+
+    adapter = FolderWatchAdapter(session_factory, str(drop_dir), str(tmp_path / "archive"), force_polling=True)
+    assert adapter.mode == "poll"
+    assert asyncio.run(adapter.poll()) == 2
+    assert asyncio.run(adapter.poll()) == 0
+    assert sorted(calls) == ["one.json", "two.json"]
+    assert sorted(os.listdir(drop_dir)) == ["notes.txt"]
@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.http_client import HttpClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    hits: dict[str, int] = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        count = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/throttled" and count == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.hits["not_modified"] = self.hits.get("not_modified", 0) + 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_url():
+    _StubHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _client() -> HttpClient:
+    return HttpClient(timeout_sec=5, http2=False, max_retries=2, backoff_base_sec=0.01, backoff_max_sec=1)
+
+
+def test_retries_after_rate_limit(stub_url):
+    client = _client()
+    resp = client.get(f"{stub_url}/throttled")
+    assert resp.status_code == 200
+    assert _StubHandler.hits["/throttled"] == 2
+    client.close()
+
+
+def test_conditional_get_replays_cached_body(stub_url):
+    client = _client()
+    first = client.get(f"{stub_url}/etag", conditional=True)
+    second = client.get(f"{stub_url}/etag", conditional=True)
+    assert first.json() == second.json() == {"ok": True}
+    assert second.status_code == 200
+    assert _StubHandler.hits["/etag"] == 2
+    assert _StubHandler.hits["not_modified"] == 1
+    client.close()
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.db.models import Media, Post, User, UserRole
+from app.main import app
+from app.routers import ingest as ingest_router
+
+
+def _line(post_id: str, **fields) -> str:
+    return json.dumps({"platform": "twitter", "platform_post_id": post_id, "text": "hi", **fields})
+
+
+@pytest.fixture()
+def ingest_env(tmp_path, monkeypatch, api_database, sqlite_path, session_factory):
+    def install(enqueue):
+        with session_factory() as db:
+            db.add(User(id=1, email="admin@x.io", password_hash="x", role=UserRole.ADMIN))
+            db.commit()
+        api_database(sqlite_path)
+        monkeypatch.setattr(get_settings(), "ingest_batch_chunk_size", 2)
+        monkeypatch.setattr(get_settings(), "media_root", str(tmp_path / "media"))
+        monkeypatch.setattr(ingest_router, "SessionLocal", session_factory)
+        monkeypatch.setattr(ingest_router, "enqueue_analysis_batch", enqueue)
+        return session_factory
+
+    return install
+
+
+def _post(body) -> tuple[dict, list[dict]]:
+    response = TestClient(app).post("/ingest/batch", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    summary, *results = [json.loads(line) for line in response.text.splitlines()]
+    return summary, results
+
+
+def test_failed_chunk_is_reported_per_line_and_others_commit(tmp_path, ingest_env):
+    image = tmp_path / "a.jpg"
+    image.write_bytes(b"jpg")
+    unreadable = tmp_path / "folder.jpg"
+    unreadable.mkdir()
+    factory = ingest_env(lambda db, posts: {post.id: "admit" for post in posts})
+    summary, results = _post(
+        "\n".join(
+            [
+                _line("1", media_paths=[str(image)]),
+                "{not json",
+                _line("2"),
+                _line("1"),
+                _line("3"),
+                _line("4", media_paths=[str(unreadable)]),
+                _line("5"),
+            ]
+        )
+    )
+
+    assert summary == {"ok": True, "accepted": 3, "duplicates": 1, "rejected": 3, "queue": {"admit": 3}}
+    assert [(item["line"], item["status"], item.get("post_id"), item.get("error", "").split(":")[0]) for item in results] == [
+        (1, "created", 1, ""),
+        (2, "rejected", None, "record"),
+        (3, "created", 2, ""),
+        (4, "duplicate", 1, ""),
+        (5, "rejected", None, "media error"),
+        (6, "rejected", None, "media error"),
+        (7, "created", 3, ""),
+    ]
+    with factory() as db:
+        # The chunk whose media copy failed (lines 5-6) rolled back as a whole; the others stayed.
+        assert sorted(post_id for (post_id,) in db.query(Post.platform_post_id)) == ["1", "2", "5"]
+        assert db.query(Media).count() == 1
+
+
+def test_queue_failure_keeps_committed_posts_and_reports_them(ingest_env):
+    def broker_down(db, posts):
+        raise ConnectionError("broker unreachable")
+
+    factory = ingest_env(broker_down)
+    summary, results = _post("\n".join(_line(str(n)) for n in range(1, 6)))
+
+    assert (summary["accepted"], summary["rejected"], summary["queue"]) == (5, 0, {"error": 5})
+    assert results[0] == {
+        "line": 1, "status": "created", "post_id": 1, "queue": "error", "error": "queue error: ConnectionError"
+    }
+    assert [item["post_id"] for item in results] == [1, 2, 3, 4, 5]
+    with factory() as db:
+        assert db.query(Post).count() == 5
+
+
+def test_overlong_line_is_rejected_without_buffering_it(monkeypatch, ingest_env):
+    ingest_env(lambda db, posts: {post.id: "admit" for post in posts})
+    monkeypatch.setattr(get_settings(), "ingest_batch_max_line_bytes", 200)
+
+    def body():
+        # Lines split across body chunks; the overlong one arrives in many pieces.
+        yield _line("1")[:10].encode()
+        yield (_line("1")[10:] + "\n" + _line("2", text="x" * 50)[:30]).encode()
+        for _ in range(100):
+            yield b"x" * 64
+        yield ("\n" + _line("3")).encode()
+
+    summary, results = _post(body())
+    assert (summary["accepted"], summary["rejected"]) == (2, 1)
+    assert results[1] == {"line": 2, "status": "rejected", "error": "record: line longer than 200 bytes"}
+    assert [item.get("post_id") for item in results] == [1, None, 2]
@@ -0,0 +1,75 @@
+import json
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.db.models import Post
+from app.services import ingestion
+from app.services.folder_watcher import LEDGER_DUPLICATE, LEDGER_INGESTED, process_drop_file
+from app.services.ingestion import insert_posts_ignore_duplicates
+
+
+@pytest.fixture()
+def factory(tmp_path, monkeypatch, session_factory):
+    monkeypatch.setattr(get_settings(), "media_root", str(tmp_path / "media"))
+    return session_factory
+
+
+def _record(post_id: str, platform: str = "twitter") -> dict:
+    return {"platform": platform, "platform_post_id": post_id, "text": f"post {post_id}"}
+
+
+def test_insert_returns_only_rows_the_unique_index_let_through(factory):
+    with factory() as db:
+        first = insert_posts_ignore_duplicates(db, [_record("1"), _record("2"), _record("1")])
+        db.commit()
+        assert sorted(first) == [("twitter", "1"), ("twitter", "2")]
+
+        second = insert_posts_ignore_duplicates(db, [_record("2"), _record("3"), _record("2", platform="facebook")])
+        db.commit()
+        assert sorted(second) == [("facebook", "2"), ("twitter", "3")]
+        assert db.query(Post).count() == 4
+
+
+def test_poll_queues_only_newly_inserted_posts(factory, monkeypatch):
+    page = {"data": [{"id": "11", "text": "a"}, {"id": "12", "text": "b"}], "meta": {}}
+
+    class _Search:
+        def get(self, url, **_kwargs):
+            return httpx.Response(200, json=page)
+
+    queued: list[list[str]] = []
+    monkeypatch.setattr(get_settings(), "twitter_bearer_token", "token")
+    monkeypatch.setattr(ingestion, "get_http_client", lambda: _Search())
+    # No cursor store: every poll re-reads the same page, as after a lost cursor.
+    monkeypatch.setattr(ingestion, "get_cursor", lambda source, key: {})
+    monkeypatch.setattr(ingestion, "set_cursor", lambda source, key, cursor: None)
+    monkeypatch.setattr(
+        ingestion, "enqueue_analysis_batch", lambda db, posts: queued.append([p.platform_post_id for p in posts])
+    )
+    with factory() as db:
+        assert ingestion.ingest_twitter_once(db, "q") == 2
+        page["data"].append({"id": "13", "text": "c"})
+        assert ingestion.ingest_twitter_once(db, "q") == 1
+        assert ingestion.ingest_twitter_once(db, "q") == 0
+    assert queued == [["11", "12"], ["13"], []]
+
+
+def test_folder_watcher_queues_a_repeated_post_id_once(factory, tmp_path, monkeypatch):
+    queued: list[str] = []
+    monkeypatch.setattr(ingestion, "enqueue_analysis", lambda db, post: queued.append(post.platform_post_id))
+    inbox, archive = tmp_path / "inbox", tmp_path / "archive"
+    inbox.mkdir()
+    # Different files (names and bytes), same post: the ledger sees two files, the
+    # posts unique index sees one post.
+    first = inbox / "a.json"
+    first.write_text(json.dumps({"platform": "demo", "platform_post_id": "p1", "text": "hello"}))
+    second = inbox / "b.json"
+    second.write_text(json.dumps({"platform": "demo", "platform_post_id": "p1", "text": "hello again"}))
+
+    assert process_drop_file(factory, first, archive) == LEDGER_INGESTED
+    assert process_drop_file(factory, second, archive) == LEDGER_DUPLICATE
+    assert queued == ["p1"]
+    with factory() as db:
+        assert db.query(Post).count() == 1
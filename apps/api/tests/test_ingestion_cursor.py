@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.db.models import Post
+from app.services import ingestion
+from app.services.ingestion import TWITTER_EPOCH_MS, TWITTER_SEARCH_WINDOW, TWITTER_TIME_FORMAT
+
+FB_NEXT = "https://graph.facebook.com/next"
+
+
+def _epoch_ms(moment: datetime) -> int:
+    return int((moment - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def _tweet_id(age: timedelta) -> int:
+    return (_epoch_ms(datetime.utcnow() - age) - TWITTER_EPOCH_MS) << 22
+
+
+class _FakeSources:
+    # Serves recent search and a Graph page feed from in-memory timelines, newest first.
+    def __init__(self):
+        self.tweets: list[int] = []
+        self.fb_stamps: list[int] = []
+        self.tokens: dict[str, list[int]] = {}
+        self.requests: list[dict] = []
+
+    def get(self, url, params=None, **_kwargs):
+        if url.startswith(FB_NEXT):
+            params = {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+        params = dict(params or {})
+        self.requests.append(params)
+        if "twitter" in url:
+            return self._search(params)
+        return self._feed(params)
+
+    def _page(self, matching: list[int], offset: int, size: int) -> tuple[list[int], bool]:
+        return matching[offset : offset + size], offset + size < len(matching)
+
+    def _search(self, params):
+        since_id = int(params.get("since_id") or 0)
+        if since_id and (since_id >> 22) + TWITTER_EPOCH_MS < _epoch_ms(datetime.utcnow() - TWITTER_SEARCH_WINDOW):
+            return httpx.Response(400, json={"title": "Invalid Request"})
+        until_id = int(params.get("until_id") or 0)
+        matching = [tid for tid in self.tweets if tid > since_id and (not until_id or tid < until_id)]
+        offset = 0
+        if "pagination_token" in params:
+            if params["pagination_token"] not in self.tokens:
+                return httpx.Response(400, json={"title": "Invalid Request"})
+            offset = self.tokens[params["pagination_token"]][0]
+        page, more = self._page(matching, offset, int(params["max_results"]))
+        meta = {}
+        if more:
+            token = f"t{len(self.tokens)}"
+            self.tokens[token] = [offset + len(page)]
+            meta["next_token"] = token
+        return httpx.Response(200, json={"data": [{"id": str(tid), "text": "t"} for tid in page], "meta": meta})
+
+    def _feed(self, params):
+        since, until = int(params.get("since") or 0), int(params.get("until") or 0)
+        matching = [ts for ts in self.fb_stamps if ts >= since and (not until or ts <= until)]
+        offset = int(params.get("offset") or 0)
+        page, more = self._page(matching, offset, int(params["limit"]))
+        stamp = "%Y-%m-%dT%H:%M:%S+0000"
+        body = {"data": [{"id": f"p{ts}", "created_time": datetime.utcfromtimestamp(ts).strftime(stamp)} for ts in page]}
+        if more:
+            query = {key: value for key, value in params.items() if key in ("limit", "since", "until")}
+            body["paging"] = {"next": f"{FB_NEXT}?{urlencode({**query, 'offset': offset + len(page)})}"}
+        return httpx.Response(200, json=body)
+
+
+@pytest.fixture()
+def sources(monkeypatch, db_session):
+    fake = _FakeSources()
+    cursors: dict[tuple[str, str], dict] = {}
+    queued: list[str] = []
+    settings = get_settings()
+    monkeypatch.setattr(settings, "twitter_bearer_token", "token")
+    monkeypatch.setattr(settings, "facebook_page_access_token", "token")
+    monkeypatch.setattr(settings, "ingest_max_pages_per_poll", 2)
+    monkeypatch.setattr(ingestion, "get_http_client", lambda: fake)
+    monkeypatch.setattr(ingestion, "get_cursor", lambda source, key: dict(cursors.get((source, key), {})))
+    monkeypatch.setattr(ingestion, "set_cursor", lambda source, key, cursor: cursors.__setitem__((source, key), cursor))
+    monkeypatch.setattr(ingestion, "enqueue_analysis_batch", lambda db, posts: queued.extend(p.platform_post_id for p in posts))
+    yield fake, cursors, queued, db_session
+
+
+def test_twitter_backlog_beyond_page_budget_is_drained_before_the_cursor_moves(sources):
+    fake, cursors, queued, db = sources
+    since_id = _tweet_id(timedelta(hours=2))
+    cursors[("twitter", "q")] = {"since_id": since_id}
+    fake.tweets = [_tweet_id(timedelta(minutes=minutes)) for minutes in range(1, 13)]
+
+    # 12 new tweets, 2 per page, 2 pages per poll: the first poll reads the 4 newest.
+    charged = []
+    assert ingestion.ingest_twitter_once(db, "q", limit=2, before_request=lambda: charged.append(1)) == 4
+    assert len(charged) == len(fake.requests) == 2
+    cursor = cursors[("twitter", "q")]
+    assert cursor["since_id"] == since_id
+    assert cursor["backfill"]["newest"] == fake.tweets[0]
+
+    # An expired page token resumes below the oldest tweet read.
+    fake.tokens.clear()
+    assert ingestion.ingest_twitter_once(db, "q", limit=2) == 4
+    assert fake.requests[-2]["until_id"] == fake.tweets[3]
+    assert ingestion.ingest_twitter_once(db, "q", limit=2) == 4
+    assert cursors[("twitter", "q")] == {"since_id": fake.tweets[0]}
+    assert sorted(queued) == sorted(str(tid) for tid in fake.tweets)
+
+    fake.tweets.insert(0, _tweet_id(timedelta(seconds=5)))
+    assert ingestion.ingest_twitter_once(db, "q", limit=2) == 1
+    assert fake.requests[-1]["since_id"] == fake.tweets[1]
+    assert db.query(Post).count() == 13
+
+
+def test_twitter_since_id_older_than_the_search_window_does_not_stall_polling(sources, monkeypatch):
+    fake, cursors, queued, db = sources
+    cursors[("twitter", "q")] = {"since_id": _tweet_id(timedelta(days=8))}
+    fake.tweets = [_tweet_id(timedelta(minutes=minutes)) for minutes in (1, 2, 3)]
+
+    assert ingestion.ingest_twitter_once(db, "q", limit=10) == 3
+    assert "since_id" not in fake.requests[-1]
+    start_time = datetime.strptime(fake.requests[-1]["start_time"], TWITTER_TIME_FORMAT)
+    assert datetime.utcnow() - start_time < TWITTER_SEARCH_WINDOW
+    assert cursors[("twitter", "q")] == {"since_id": fake.tweets[0]}
+
+    # A bound rejected anyway (clock skew at the window edge) restarts from the window.
+    fake.tweets.insert(0, _tweet_id(timedelta(seconds=5)))
+    cursors[("twitter", "q")] = {"since_id": _tweet_id(TWITTER_SEARCH_WINDOW + timedelta(seconds=1))}
+    skewed = lambda: datetime.utcnow() - TWITTER_SEARCH_WINDOW - timedelta(minutes=1)  # noqa: E731
+    with monkeypatch.context() as patch:
+        patch.setattr(ingestion, "_twitter_window_start", skewed)
+        assert ingestion.ingest_twitter_once(db, "q", limit=10) == 0
+    assert "start_time" in cursors[("twitter", "q")]
+    assert ingestion.ingest_twitter_once(db, "q", limit=10) == 1
+
+
+def test_facebook_backlog_is_drained_across_polls(sources):
+    fake, cursors, queued, db = sources
+    cursors[("facebook", "page")] = {"since": 1_000}
+    fake.fb_stamps = [1_000 + 60 * n for n in range(10, 0, -1)]
+
+    assert ingestion.ingest_facebook_once(db, ["page"], limit_per_page=2) == 4
+    assert cursors[("facebook", "page")]["since"] == 1_000
+    assert ingestion.ingest_facebook_once(db, ["page"], limit_per_page=2) == 4
+    assert ingestion.ingest_facebook_once(db, ["page"], limit_per_page=2) == 2
+    assert cursors[("facebook", "page")] == {"since": fake.fb_stamps[0]}
+    assert len(queued) == 10
@@ -0,0 +1,57 @@
+import itertools
+import json
+from types import SimpleNamespace
+
+from app.services import load_generator
+from app.services.backpressure import QueueState
+from app.services.load_generator import LoadGenerator, arrival_offsets, jsonl_records
+
+
+def test_arrival_patterns_keep_the_target_mean_rate():
+    for pattern in ("constant", "poisson", "burst"):
+        offsets = list(itertools.islice(arrival_offsets(100.0, pattern, burst_size=50, seed=7), 5000))
+        assert offsets == sorted(offsets)
+        assert 45 < offsets[-1] < 55
+
+    burst = list(itertools.islice(arrival_offsets(100.0, "burst", burst_size=50), 100))
+    assert burst[:50] == [0.0] * 50
+    assert burst[50] == 0.5
+
+
+def test_jsonl_records_suffix_ids_per_loop_and_flag_bad_lines(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    path.write_text(
+        json.dumps({"platform_post_id": "a", "text": "x"}) + "\n\nnot json\n" + json.dumps({"text": "no id"}) + "\n"
+    )
+    records = list(jsonl_records(path, loops=2, id_suffix="run1"))
+    assert [r["platform_post_id"] if r else None for r in records] == [
+        "a-run1-loop0",
+        None,
+        None,
+        "a-run1-loop1",
+        None,
+        None,
+    ]
+
+
+def test_generator_reports_outcomes_and_honours_limit(monkeypatch):
+    batches = []
+
+    def fake_batch(db, records):
+        batches.append(len(records))
+        posts = [SimpleNamespace(id=i) if i % 4 else None for i, _ in enumerate(records)]
+        return posts, {post.id: "defer" for post in posts if post is not None}
+
+    monkeypatch.setattr(load_generator, "create_posts_batch", fake_batch)
+    monkeypatch.setattr(load_generator, "queue_state", lambda refresh=False: QueueState(42, 3.5, "ok"))
+    records = ({"platform": "demo", "platform_post_id": str(i)} for i in itertools.count())
+    generator = LoadGenerator(lambda: SimpleNamespace(close=lambda: None), records, rate=5000, batch_size=30, limit=100)
+
+    report = generator.run()
+    assert report.sent == 100
+    assert report.accepted + report.duplicates == 100
+    assert report.duplicates == sum((n + 3) // 4 for n in batches)
+    assert report.deferred == report.accepted
+    assert max(batches) <= 30
+    assert report.max_queue_depth == 42
+    assert report.running is False
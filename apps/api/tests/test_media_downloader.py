@@ -0,0 +1,130 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.core.config import get_settings
+from app.db.models import Media, Post
+from app.services import ingestion, media_downloader
+from app.services.http_client import HttpClient
+from app.services.media_downloader import MediaDownloadManager
+
+PAYLOAD = bytes(range(256)) * 64
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    range_requests: list[str] = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            self.range_requests.append(range_header)
+            start = int(range_header.split("=")[1].split("-")[0])
+        body = PAYLOAD[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def media_url(tmp_path, monkeypatch):
+    _MediaHandler.range_requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MediaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = HttpClient(timeout_sec=5, http2=False, max_retries=0)
+    monkeypatch.setattr(media_downloader, "get_http_client", lambda: client)
+    monkeypatch.setattr(get_settings(), "ingest_tmp_root", str(tmp_path))
+    yield f"http://127.0.0.1:{server.server_address[1]}/clip.mp4"
+    server.shutdown()
+    client.close()
+
+
+def test_download_hashes_while_streaming(media_url, tmp_path):
+    result = MediaDownloadManager(max_workers=1).download(media_url, "fb_1")
+    assert result.error == ""
+    assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert result.path.endswith(".mp4")
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_finished_download_moves_from_the_tmp_root_into_media_root(media_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "media_root", str(tmp_path / "media"))
+    result = MediaDownloadManager(max_workers=1).download(media_url, "fb_3")
+    assert Path(result.path).parent == tmp_path
+
+    stored = Path(ingestion._copy_media_to_storage(result.path, 3))
+    assert stored.parent == tmp_path / "media" / "post_3"
+    assert stored.read_bytes() == PAYLOAD and not Path(result.path).exists()
+
+
+def test_download_resumes_partial_file(media_url, tmp_path):
+    manager = MediaDownloadManager(max_workers=1)
+    part = tmp_path / f"fb_2_{hashlib.sha1(media_url.encode('utf-8')).hexdigest()[:12]}.part"
+    part.write_bytes(PAYLOAD[:1000])
+    result = manager.download(media_url, "fb_2")
+    assert _MediaHandler.range_requests == ["bytes=1000-"]
+    assert result.size == len(PAYLOAD)
+    assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def test_download_rejects_oversized_file(media_url, tmp_path):
+    result = MediaDownloadManager(max_workers=1, max_bytes=1024).download(media_url, "fb_3")
+    assert result.path is None
+    assert result.error == "too_large"
+    assert not list(tmp_path.iterdir())
+
+
+class _InstantManager:
+    # Completes every submission at once with a file written to the tmp dir.
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.submitted: list[list[str]] = []
+
+    def submit(self, urls, prefix, on_complete):
+        self.submitted.append(urls)
+        results = []
+        for idx, url in enumerate(urls):
+            path = self.tmp_path / f"{prefix}_{idx}.jpg"
+            path.write_bytes(b"jpg")
+            results.append(media_downloader.DownloadResult(url=url, path=str(path), size=3))
+        on_complete(results)
+
+
+def test_sweep_resumes_downloads_lost_with_the_process(tmp_path, monkeypatch, session_factory):
+    old = datetime.utcnow() - timedelta(hours=1)
+    with session_factory() as db:
+        # Committed with pending media, then the process died before the downloads finished.
+        db.add(Post(id=1, platform="facebook", platform_post_id="a", created_at=old, pending_media=["https://x/1.jpg"]))
+        db.add(Post(id=2, platform="facebook", platform_post_id="b", pending_media=["https://x/2.jpg"]))
+        db.add(Post(id=3, platform="facebook", platform_post_id="c", created_at=old))
+        db.commit()
+
+    manager = _InstantManager(tmp_path)
+    queued = []
+    monkeypatch.setattr(get_settings(), "media_root", str(tmp_path / "media"))
+    monkeypatch.setattr(ingestion, "SessionLocal", session_factory)
+    monkeypatch.setattr(ingestion, "get_download_manager", lambda: manager)
+    monkeypatch.setattr(ingestion, "enqueue_analysis", lambda db, post: queued.append(post.id))
+
+    with session_factory() as db:
+        # Post 2 is recent enough that another replica may still be downloading it.
+        assert ingestion.resume_pending_downloads(db, stuck_after_sec=600) == 1
+        assert ingestion.resume_pending_downloads(db, stuck_after_sec=600) == 0
+        assert queued == [1]
+        assert [post_id for (post_id,) in db.query(Media.post_id)] == [1]
+        assert db.query(Post.pending_media).filter(Post.id == 1).scalar() is None
+
+    # A late duplicate completion (two replicas resumed the same post) attaches nothing.
+    ingestion._attach_downloads_and_queue(Post(id=1, platform_post_id="a"), [])
+    with session_factory() as db:
+        assert db.query(Media).count() == 1
+    assert queued == [1]
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core import principals
+from app.core.config import get_settings
+from app.core.deps import get_current_user
+from app.core.principals import principal_cache
+from app.core.security import create_access_token
+from app.db.models import User, UserRole
+from app.services.event_bus import CHANNEL_PRINCIPALS, consume_principal_invalidations
+
+
+@pytest.fixture()
+def published(monkeypatch):
+    sent: list[list[str]] = []
+    monkeypatch.setattr(principals, "publish_principal_invalidation", sent.append)
+    return sent
+
+
+@pytest.fixture()
+def resolve(sqlite_path, sqlite_engine, published):
+    with Session(sqlite_engine) as db:
+        db.add(User(id=1, email="admin@x.io", password_hash="x", role=UserRole.ADMIN))
+        db.add(User(id=2, email="mod@x.io", password_hash="x", role=UserRole.MODERATOR))
+        db.commit()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", poolclass=NullPool)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    principal_cache.clear()
+
+    def run(token):
+        async def call():
+            async with factory() as db:
+                return await get_current_user(token, db)
+
+        return asyncio.run(call())
+
+    return run, statements, sqlite_engine
+
+
+def test_principal_is_resolved_once_per_token(resolve):
+    run, statements, _ = resolve
+    token = create_access_token("mod@x.io", "MODERATOR")
+    assert run(token).id == 2
+    assert run(token).id == 2
+    assert run(None).id == 1
+    assert run(None).id == 1
+    assert len(statements) == 2
+
+
+def test_committed_role_change_invalidates_cached_principal(resolve, published):
+    run, statements, sync_engine = resolve
+    published.clear()
+    token = create_access_token("mod@x.io", "MODERATOR")
+    assert run(token).role == UserRole.MODERATOR
+
+    with Session(sync_engine) as db:
+        user = db.get(User, 2)
+        user.role = UserRole.POLICE
+        assert run(token).role == UserRole.MODERATOR  # not committed yet
+        db.commit()
+    assert run(token).role == UserRole.POLICE
+    # ...and the other replicas are told over Redis.
+    assert published == [["mod@x.io"]]
+
+
+def test_entries_expire_with_ttl_or_token(resolve, monkeypatch):
+    run, statements, _ = resolve
+    token = create_access_token("mod@x.io", "MODERATOR")
+    run(token)
+    principal_cache.put("short", "mod@x.io", run(token), token_expires_at=time.time() - 1)
+    assert principal_cache.get("short") is None
+
+    monkeypatch.setattr(get_settings(), "auth_principal_cache_ttl_sec", 0)
+    principal_cache.clear()
+    run(token)
+    run(token)
+    assert len(statements) == 3
+
+
+class _PubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        await asyncio.sleep(3600)
+
+    async def aclose(self):
+        pass
+
+
+def test_invalidations_from_other_replicas_are_applied(resolve):
+    run, statements, _ = resolve
+    admin, mod = create_access_token("admin@x.io", "ADMIN"), create_access_token("mod@x.io", "MODERATOR")
+    run(admin)
+    run(mod)
+    pubsub = _PubSub([{"data": "not json"}, {"data": '["mod@x.io"]'}])
+    subscribed = []
+
+    class _Client:
+        def pubsub(self, ignore_subscribe_messages=False):
+            return pubsub
+
+    async def listen():
+        task = asyncio.create_task(
+            consume_principal_invalidations(
+                lambda subjects: [principal_cache.invalidate_subject(s) for s in subjects],
+                lambda: subscribed.append(True),
+                client=_Client(),
+            )
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(listen())
+    assert pubsub.channels == [CHANNEL_PRINCIPALS] and subscribed == [True]
+    assert principal_cache.get(admin) is not None
+    assert principal_cache.get(mod) is None
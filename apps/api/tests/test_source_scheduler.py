@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from app.services import platform_adapters
+from app.services.platform_adapters import SourceAdapter, TwitterSearchAdapter, _SessionPollAdapter
+from app.services.source_scheduler import RateBudget, SourceScheduler, parse_rate_budgets
+
+
+class CountingAdapter(SourceAdapter):
+    kind = "test"
+
+    def __init__(self, name: str, polls: int, fail: bool = False) -> None:
+        super().__init__(name, interval_sec=0.05)
+        self.remaining = polls
+        self.fail = fail
+
+    async def poll(self) -> int:
+        self.remaining -= 1
+        self.done = self.remaining <= 0
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return 2
+
+
+def _wait_until_idle(scheduler: SourceScheduler, name: str, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while scheduler.is_running(name) and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_parse_rate_budgets_skips_malformed_entries():
+    budgets = parse_rate_budgets("twitter=450/900, facebook=200/3600,broken")
+    assert set(budgets) == {"twitter", "facebook"}
+    assert budgets["twitter"].capacity == 450
+
+
+def test_scheduler_runs_sources_until_done_and_tracks_status():
+    scheduler = SourceScheduler()
+    assert scheduler.add(CountingAdapter("test:ok", polls=3))
+    assert not scheduler.add(CountingAdapter("test:ok", polls=3))
+    scheduler.add(CountingAdapter("test:bad", polls=2, fail=True))
+    _wait_until_idle(scheduler, "test:ok")
+    _wait_until_idle(scheduler, "test:bad")
+
+    status = {source["name"]: source for source in scheduler.status("test:")}
+    assert status["test:ok"]["polls"] == 3
+    assert status["test:ok"]["items"] == 6
+    assert status["test:ok"]["running"] is False
+    assert status["test:bad"]["errors"] == 2
+    assert "upstream down" in status["test:bad"]["last_error"]
+
+
+def test_scheduler_remove_prefix_cancels_sources():
+    scheduler = SourceScheduler()
+    scheduler.add(CountingAdapter("test:a", polls=1000))
+    scheduler.add(CountingAdapter("test:b", polls=1000))
+    assert scheduler.remove_prefix("test:") == 2
+    assert not scheduler.is_running("test:a")
+    assert scheduler.status("test:") == []
+
+
+def test_removing_a_finished_source_drops_its_state():
+    scheduler = SourceScheduler()
+    scheduler.add(CountingAdapter("test:once", polls=1))
+    _wait_until_idle(scheduler, "test:once")
+    assert [source["name"] for source in scheduler.status("test:")] == ["test:once"]
+    assert scheduler.remove_prefix("test:") == 1
+    assert scheduler.status() == []
+
+
+def test_session_adapters_must_implement_poll_with_session():
+    with pytest.raises(TypeError):
+        _SessionPollAdapter(lambda: None, "test:abstract", 1)
+
+
+def test_rate_budget_is_charged_per_upstream_request(monkeypatch):
+    def three_pages(db, query, limit, before_request):
+        for _ in range(3):
+            before_request()
+        return 0
+
+    monkeypatch.setattr(platform_adapters, "ingest_twitter_once", three_pages)
+    adapter = TwitterSearchAdapter(lambda: None, "q")
+    adapter.budget = RateBudget(requests=4, per_sec=0.4)
+    adapter.poll_with_session(None)
+    assert int(adapter.budget.tokens) == 1
+    # The next poll's second and third requests wait for the refill (4 tokens a second).
+    adapter.poll_with_session(None)
+    assert adapter.budget_wait_sec > 0.05
@@ -0,0 +1,53 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.services.upload_stream import StreamingUpload, UploadTooLarge, finalize_media
+
+BOUNDARY = "testboundary"
+
+
+def _body(media: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="json_file"; filename="post-7.json"\r\n'
+        "Content-Type: application/json\r\n\r\n"
+        '{"text": "hello"}\r\n'
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="media_file"; filename="clip.mp4"\r\n'
+        "Content-Type: video/mp4\r\n\r\n"
+    ).encode() + media + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def _chunks(body: bytes, size: int = 1000):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def _parse(upload: StreamingUpload, body: bytes):
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+    return asyncio.run(upload.parse(content_type, _chunks(body)))
+
+
+def test_file_parts_stream_to_disk_with_hash(tmp_path):
+    media = bytes(range(256)) * 200
+    upload = StreamingUpload(tmp_path, max_file_bytes=len(media), memory_parts=("json_file",))
+    parts = _parse(upload, _body(media))
+
+    assert bytes(parts["json_file"].data) == b'{"text": "hello"}'
+    assert parts["json_file"].path is None
+    media_part = parts["media_file"]
+    assert media_part.size == len(media)
+    assert media_part.sha256 == hashlib.sha256(media).hexdigest()
+    assert media_part.path.read_bytes() == media
+
+    final = finalize_media(media_part)
+    assert final.suffix == ".mp4" and final.exists()
+
+
+def test_oversized_file_is_rejected_and_removed(tmp_path):
+    upload = StreamingUpload(tmp_path, max_file_bytes=1000, memory_parts=("json_file",))
+    with pytest.raises(UploadTooLarge):
+        _parse(upload, _body(b"x" * 5000))
+    assert list(tmp_path.iterdir()) == []
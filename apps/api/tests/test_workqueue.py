@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models import OPEN_ALERT_SQL, Alert, AlertStatus, Analysis, Post, User, UserRole
+from app.main import app
+from app.services.fusion import _severity
+from app.services.workqueue import _queue_ids, alert_priority, next_alerts
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def _seed(db: Session, alert_id: int, score: float, age_hours: float, **fields) -> None:
+    created = NOW - timedelta(hours=age_hours)
+    db.add(Post(id=alert_id, platform="twitter", platform_post_id=str(alert_id)))
+    db.add(Analysis(id=alert_id, post_id=alert_id, fusion_score=score))
+    db.add(
+        Alert(
+            id=alert_id,
+            post_id=alert_id,
+            analysis_id=alert_id,
+            severity=_severity(score),
+            priority=alert_priority(_severity(score), score, created),
+            created_at=created,
+            **fields,
+        )
+    )
+
+
+def test_priority_decays_with_age_within_a_severity_tier():
+    # 78 vs 72 is worth tau * ln(78 / 72) (about 29 minutes at 6h) of age.
+    assert alert_priority("HIGH", 78, NOW - timedelta(minutes=20)) > alert_priority("HIGH", 72, NOW)
+    assert alert_priority("HIGH", 78, NOW - timedelta(minutes=40)) < alert_priority("HIGH", 72, NOW)
+
+
+def test_older_critical_outranks_a_fresh_threshold_alert():
+    fresh_high = alert_priority("HIGH", 70, NOW)
+    assert alert_priority("CRITICAL", 81, NOW - timedelta(hours=2)) > fresh_high
+    assert alert_priority("CRITICAL", 95, NOW - timedelta(days=365)) > fresh_high
+
+
+def test_queue_ranks_open_alerts_visible_to_the_caller(session_factory, sqlite_path, api_database):
+    with session_factory() as db:
+        db.add(User(id=1, email="a@x.io", password_hash="x", role=UserRole.MODERATOR))
+        db.add(User(id=2, email="b@x.io", password_hash="x", role=UserRole.MODERATOR))
+        _seed(db, 1, 95, age_hours=2)
+        _seed(db, 2, 60, age_hours=0)
+        _seed(db, 3, 99, age_hours=48)
+        _seed(db, 4, 98, age_hours=0, status=AlertStatus.RESOLVED)
+        _seed(db, 5, 97, age_hours=0, assigned_to=2)
+        _seed(db, 6, 80, age_hours=1, assigned_to=1, status=AlertStatus.INVESTIGATING)
+        db.commit()
+
+        assert [alert.id for alert, _, _ in next_alerts(db, 1, 10)] == [1, 3, 6, 2]
+        assert [alert.id for alert, _, _ in next_alerts(db, 2, 2)] == [5, 1]
+        assert [alert.id for alert, _, _ in next_alerts(db, None, 10)] == [1, 3, 2]
+
+    api_database(sqlite_path)
+    body = TestClient(app).get("/alerts/queue?limit=2").json()
+    assert [item["id"] for item in body] == [1, 3]
+    assert body[0]["platform"] == "twitter" and body[0]["fusion_score"] == 95
+
+
+def test_queue_reads_a_bounded_index_range(sqlite_engine):
+    with Session(sqlite_engine) as db:
+        statement = (
+            db.query(Alert.id)
+            .filter(text(OPEN_ALERT_SQL), Alert.assigned_to.is_(None))
+            .order_by(Alert.priority.desc())
+            .limit(20)
+            .statement.compile(sqlite_engine, compile_kwargs={"literal_binds": True})
+        )
+        plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+        assert _queue_ids(db, Alert.assigned_to.is_(None), 20) == []
+    assert "ix_alerts_queue" in plan
+    assert "TEMP B-TREE" not in plan
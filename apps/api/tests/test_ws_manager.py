@@ -0,0 +1,221 @@
+import asyncio
+import json
+
+from app.core.config import get_settings
+from app.services.ws_manager import POLICY_DROP_OLDEST, POLICY_EVICT, AlertWebSocketManager, Subscription
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.frames: list[str] = []
+        self.closed_with = None
+        self.client = None
+        self.gate = asyncio.Event()
+        if not delay:
+            self.gate.set()
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        self.frames.append(text)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed_with = code
+
+
+def _settings(monkeypatch, **values):
+    settings = get_settings()
+    for key, value in values.items():
+        monkeypatch.setattr(settings, key, value)
+
+
+async def _drain(seconds: float = 0.05) -> None:
+    await asyncio.sleep(seconds)
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    # Waits for writers on a busy machine instead of trusting a fixed sleep.
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_slow_client_does_not_delay_others_and_drops_oldest(monkeypatch):
+    _settings(monkeypatch, ws_send_queue_size=2, ws_slow_consumer_policy=POLICY_DROP_OLDEST)
+
+    async def run():
+        manager = AlertWebSocketManager()
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=1)
+        await manager.connect(fast)
+        await manager.connect(slow)
+        for i in range(5):
+            await manager.broadcast_json({"id": i})
+            await _drain(0.01)
+        assert [json.loads(frame)["id"] for frame in fast.frames] == [0, 1, 2, 3, 4]
+        assert slow.frames == []
+        stats = manager.stats()
+        assert stats["dropped"] == 2 and stats["queue_depth_max"] == 2
+
+        slow.gate.set()
+        await _drain()
+        # The writer held alert 0 while blocked; alerts 1 and 2 were dropped as oldest.
+        assert [json.loads(frame)["id"] for frame in slow.frames] == [0, 3, 4]
+        assert slow.closed_with is None
+
+    asyncio.run(run())
+
+
+def test_overflowing_client_is_evicted_under_evict_policy(monkeypatch):
+    _settings(monkeypatch, ws_send_queue_size=1, ws_slow_consumer_policy=POLICY_EVICT)
+
+    async def run():
+        manager = AlertWebSocketManager()
+        slow = FakeWebSocket(delay=1)
+        await manager.connect(slow)
+        for i in range(3):
+            await manager.broadcast_json({"id": i})
+            await _drain(0.01)
+        assert slow.closed_with == 1013
+        assert manager.stats()["connections"] == 0
+        assert manager.evicted == 1
+
+    asyncio.run(run())
+
+
+def test_eviction_does_not_wait_for_a_wedged_close(monkeypatch):
+    _settings(monkeypatch, ws_send_queue_size=1, ws_slow_consumer_policy=POLICY_EVICT)
+
+    class WedgedWebSocket(FakeWebSocket):
+        async def close(self, code: int = 1000, reason: str = "") -> None:
+            await asyncio.Event().wait()
+
+    async def run():
+        manager = AlertWebSocketManager()
+        wedged, healthy = WedgedWebSocket(delay=1), FakeWebSocket()
+        await manager.connect(wedged)
+        await manager.connect(healthy)
+        for i in range(3):
+            await asyncio.wait_for(manager.broadcast_json({"id": i}), timeout=0.5)
+            await _drain(0.01)
+        assert manager.evicted == 1 and list(manager.connections) == [healthy]
+        assert [json.loads(frame)["id"] for frame in healthy.frames] == [0, 1, 2]
+
+    asyncio.run(run())
+
+
+def test_alerts_are_routed_only_to_matching_subscriptions():
+    async def run():
+        manager = AlertWebSocketManager()
+        everything, critical_tiktok, mine = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(everything)
+        await manager.connect(critical_tiktok)
+        await manager.connect(mine, user_id=7)
+        await manager.subscribe(
+            critical_tiktok, Subscription(min_severity="HIGH", platforms=frozenset({"TikTok"}))
+        )
+        await manager.subscribe(mine, Subscription(categories=frozenset({"hate_speech"}), assigned_to_me=True))
+
+        alerts = [
+            {"id": 1, "severity": "CRITICAL", "category": "violence", "platform": "tiktok", "assigned_to": None},
+            {"id": 2, "severity": "MED", "category": "violence", "platform": "tiktok", "assigned_to": None},
+            {"id": 3, "severity": "LOW", "category": "hate_speech", "platform": "twitter", "assigned_to": 7},
+            {"id": 4, "severity": "HIGH", "category": "hate_speech", "platform": "twitter", "assigned_to": 8},
+            # Platforms match whatever case the payload carries.
+            {"id": 5, "severity": "HIGH", "category": "violence", "platform": "TikTok", "assigned_to": None},
+        ]
+        for alert in alerts:
+            await manager.broadcast_json(alert)
+        await _until(lambda: len(everything.frames) == 5)
+        await _drain()
+        assert [json.loads(frame)["id"] for frame in everything.frames] == [1, 2, 3, 4, 5]
+        assert [json.loads(frame)["id"] for frame in critical_tiktok.frames] == [1, 5]
+        assert [json.loads(frame)["id"] for frame in mine.frames] == [3]
+
+        await manager.disconnect(critical_tiktok)
+        assert manager.matching(alerts[0]) == {manager.connections[everything]}
+
+    asyncio.run(run())
+
+
+def test_resume_replays_before_live_and_skips_duplicates():
+    async def run():
+        manager = AlertWebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        manager.hold(client)
+        # Live alerts delivered while the replay is being read.
+        await manager.broadcast_json({"id": 2, "event_id": "2-0"})
+        await manager.broadcast_json({"id": 3, "event_id": "3-0"})
+        await _drain()
+        assert client.frames == []
+
+        replayed = [{"id": 1, "event_id": "1-0"}, {"id": 2, "event_id": "2-0"}]
+        assert await manager.release(client, replayed, trailer={"type": "synced", "cursor": "2-0"}) == 2
+        await manager.broadcast_json({"id": 4, "event_id": "4-0"})
+        await _drain()
+        frames = [json.loads(frame) for frame in client.frames]
+        assert [frame.get("id", frame.get("type")) for frame in frames] == [1, 2, "synced", 3, 4]
+
+    asyncio.run(run())
+
+
+def test_resume_longer_than_the_send_queue_is_delivered_whole(monkeypatch):
+    _settings(monkeypatch, ws_send_queue_size=8, ws_replay_max=1000)
+
+    async def run():
+        manager = AlertWebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        manager.hold(client)
+        for n in range(601, 621):
+            await manager.broadcast_json({"id": n, "event_id": f"{n}-0"})
+        replayed = [{"id": n, "event_id": f"{n}-0"} for n in range(1, 601)]
+        assert await manager.release(client, replayed, trailer={"type": "synced"}) == 600
+        await _drain()
+        frames = [json.loads(frame) for frame in client.frames]
+        assert [frame.get("id", frame.get("type")) for frame in frames] == [*range(1, 601), "synced", *range(601, 621)]
+        assert manager.dropped == 0
+
+    asyncio.run(run())
+
+
+def test_resume_that_cannot_keep_up_ends_in_resync(monkeypatch):
+    _settings(monkeypatch, ws_send_queue_size=4, ws_replay_max=10)
+
+    async def run():
+        manager = AlertWebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client)
+        manager.hold(client)
+        for n in range(1, 30):
+            await manager.broadcast_json({"id": n, "event_id": f"{n}-0"})
+        await manager.release(client, [], trailer={"type": "synced"})
+        await _drain()
+        frames = [json.loads(frame) for frame in client.frames]
+        assert frames[-1]["type"] == "resync"
+        assert "synced" not in [frame.get("type") for frame in frames]
+
+    asyncio.run(run())
+
+
+def test_batch_events_are_cut_down_per_subscription():
+    async def run():
+        manager = AlertWebSocketManager()
+        everything, tiktok = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(everything)
+        await manager.connect(tiktok)
+        await manager.subscribe(tiktok, Subscription(platforms=frozenset({"tiktok"})))
+        items = [
+            {"id": 1, "severity": "HIGH", "category": "violence", "platform": "twitter", "assigned_to": None},
+            {"id": 2, "severity": "HIGH", "category": "violence", "platform": "tiktok", "assigned_to": None},
+        ]
+        await manager.broadcast_json({"event": "bulk_updated", "status": "resolved", "alerts": items})
+        await manager.broadcast_json({"event": "bulk_updated", "status": "resolved", "alerts": items[:1]})
+        await _drain()
+        assert [[a["id"] for a in json.loads(f)["alerts"]] for f in everything.frames] == [[1, 2], [1]]
+        assert [[a["id"] for a in json.loads(f)["alerts"]] for f in tiktok.frames] == [[2]]
+
+    asyncio.run(run())
@@ -47,14 +47,68 @@ export function AlertsPage() {
   }, []);
 
   useEffect(() => {
-    const ws = new WebSocket(`${WS_BASE}/ws/alerts`);
-    ws.onmessage = (event) => {
-      const incoming = JSON.parse(event.data) as AlertSummary;
-      if (String(incoming.status).toLowerCase() !== "new") return;
-      setAlerts((prev) => [incoming, ...prev.filter((p) => p.id !== incoming.id)]);
+    // Reconnect with the last stream cursor so the server replays what we missed
+    // instead of every dashboard re-fetching the alert list after a deploy.
+    let ws: WebSocket | null = null;
+    let lastEventId: string | null = null;
+    let retryMs = 1000;
+    let closed = false;
+
+    function connect() {
+      const params = new URLSearchParams();
+      const token = localStorage.getItem("token");
+      if (token) params.set("token", token);
+      if (lastEventId) params.set("since", lastEventId);
+      const query = params.toString();
+      ws = new WebSocket(`${WS_BASE}/ws/alerts${query ? `?${query}` : ""}`);
+      ws.onmessage = (event) => {
+        const incoming = JSON.parse(event.data) as AlertSummary & {
+          type?: string;
+          event?: string;
+          event_id?: string;
+          cursor?: string;
+        };
+        if (incoming.type === "resync") {
+          lastEventId = null;
+          loadAlerts();
+          return;
+        }
+        if (incoming.type) {
+          if (incoming.cursor) lastEventId = incoming.cursor;
+          return;
+        }
+        if (incoming.event_id) lastEventId = incoming.event_id;
+        if (incoming.event === "bulk_updated") {
+          const changed = incoming as unknown as { status?: string; alerts: Array<{ id: number }> };
+          if (changed.status && changed.status !== "new") {
+            const ids = new Set(changed.alerts.map((item) => item.id));
+            setAlerts((prev) => prev.filter((p) => !ids.has(p.id)));
+          }
+          return;
+        }
+        if (String(incoming.status).toLowerCase() !== "new") {
+          setAlerts((prev) => prev.filter((p) => p.id !== incoming.id));
+          return;
+        }
+        setAlerts((prev) => [incoming, ...prev.filter((p) => p.id !== incoming.id)]);
+      };
+      ws.onopen = () => {
+        retryMs = 1000;
+        ws?.send(JSON.stringify({ type: "subscribe" }));
+      };
+      ws.onclose = () => {
+        if (closed) return;
+        // Jitter spreads reconnects out when every client drops at once.
+        setTimeout(connect, retryMs + Math.random() * retryMs);
+        retryMs = Math.min(retryMs * 2, 30000);
+      };
+    }
+
+    connect();
+    return () => {
+      closed = true;
+      ws?.close();
     };
-    ws.onopen = () => ws.send("subscribed");
-    return () => ws.close();
   }, []);
 
   function shortCategoryLabel(category: string): string {
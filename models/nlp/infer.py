@@ -11,9 +11,24 @@ Optional:
 from __future__ import annotations
 
 import os
+import threading
 from typing import Any
 
-import requests
+import httpx
+
+# The adapter is loaded from a file path and must not depend on the API package,
+# so it keeps its own pooled client: one keep-alive connection set per process.
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(limits=httpx.Limits(max_keepalive_connections=10))
+    return _client
 
 
 def _default_scores(categories: list[str]) -> dict[str, float]:
@@ -86,7 +101,7 @@ def predict(text: str, lang: str, categories: list[str]) -> dict[str, float]:
     body = {"text": text, "lang": lang, "categories": categories}
 
     try:
-        response = requests.post(model_url, json=body, headers=headers, timeout=timeout_sec)
+        response = _get_client().post(model_url, json=body, headers=headers, timeout=timeout_sec)
         response.raise_for_status()
         data = response.json()
     except Exception:
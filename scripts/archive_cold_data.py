@@ -0,0 +1,31 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str((Path(__file__).resolve().parents[1] / "apps" / "api").resolve()))
+
+from app.db.session import SessionLocal
+from app.services.archival import archive_cold_data, archive_cutoff, archive_root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move cold posts, analyses and alerts to Parquet under ARCHIVE_ROOT.")
+    parser.add_argument("--after-days", type=int, default=None, help="default: ARCHIVE_AFTER_DAYS")
+    parser.add_argument("--batch-size", type=int, default=None, help="default: ARCHIVE_BATCH_SIZE")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = archive_cold_data(db, after_days=args.after_days, batch_size=args.batch_size)
+    finally:
+        db.close()
+    cutoff = archive_cutoff(after_days=args.after_days)
+    if not result.months:
+        print(f"Nothing to archive before {cutoff:%Y-%m-%d}")
+        return
+    moved = ", ".join(f"{count} {table}" for table, count in result.rows.items())
+    print(f"Archived {', '.join(result.months)} to {archive_root()}: {moved}")
+
+
+if __name__ == "__main__":
+    main()
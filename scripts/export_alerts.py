@@ -0,0 +1,54 @@
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str((Path(__file__).resolve().parents[1] / "apps" / "api").resolve()))
+
+from app.db.models import AlertStatus
+from app.db.session import SessionLocal
+from app.services.alert_export import FORMATS, KINDS, ExportFilter, export_chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream alerts or analyses with their posts to NDJSON, CSV or Parquet.")
+    parser.add_argument("output", help="output file, or - for stdout")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the output file suffix")
+    parser.add_argument("--kind", choices=KINDS, default="alerts", help="analyses also includes posts without an alert")
+    parser.add_argument("--status", choices=[status.value for status in AlertStatus])
+    parser.add_argument("--category")
+    parser.add_argument("--severity")
+    parser.add_argument("--platform")
+    parser.add_argument("--from", dest="created_from", type=datetime.fromisoformat, help="ISO time, inclusive")
+    parser.add_argument("--to", dest="created_to", type=datetime.fromisoformat, help="ISO time, exclusive")
+    parser.add_argument("--include-raw", action="store_true", help="add the original platform payload")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    fmt = args.format or Path(args.output).suffix.lstrip(".") or "ndjson"
+    if fmt not in FORMATS:
+        parser.error(f"cannot infer format from {args.output!r}; pass --format")
+    export_filter = ExportFilter(
+        kind=args.kind,
+        status=AlertStatus(args.status) if args.status else None,
+        category=args.category,
+        severity=args.severity,
+        platform=args.platform,
+        created_from=args.created_from,
+        created_to=args.created_to,
+        include_raw=args.include_raw,
+    )
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    try:
+        for chunk in export_chunks(SessionLocal, export_filter, fmt, args.batch_size):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"Wrote {written} bytes of {fmt}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
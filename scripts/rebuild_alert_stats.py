@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str((Path(__file__).resolve().parents[1] / "apps" / "api").resolve()))
+
+from app.db.session import Base, SessionLocal, engine
+from app.services.alert_stats import rebuild_alert_counters
+
+
+def main() -> None:
+    # Needed once for databases that had alerts before the counters table existed.
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        total = rebuild_alert_counters(db)
+        print(f"Rebuilt alert counters from {total} alerts")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str((Path(__file__).resolve().parents[1] / "apps" / "api").resolve()))
+
+from app.db.session import SessionLocal
+from app.services.load_generator import PATTERNS, LoadGenerator, jsonl_records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a JSONL dataset into the ingest pipeline at a target rate.")
+    parser.add_argument("file", type=Path, help="JSONL file, one IngestDemoRequest-shaped object per line")
+    parser.add_argument("--rate", type=float, default=100.0, help="target posts per second")
+    parser.add_argument("--pattern", choices=PATTERNS, default="constant")
+    parser.add_argument("--burst-size", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--loops", type=int, default=1, help="passes over the file")
+    parser.add_argument("--unique-ids", action="store_true", help="suffix post ids so repeated runs are not duplicates")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    id_suffix = f"run{int(time.time())}" if args.unique_ids else ""
+    generator = LoadGenerator(
+        SessionLocal,
+        jsonl_records(args.file, loops=args.loops, id_suffix=id_suffix),
+        rate=args.rate,
+        pattern=args.pattern,
+        burst_size=args.burst_size,
+        batch_size=args.batch_size,
+        limit=args.limit,
+        duration_sec=args.duration,
+        seed=args.seed,
+    )
+    last_print = [0.0]
+
+    def progress(report) -> None:
+        if report.elapsed_sec - last_print[0] < 5:
+            return
+        last_print[0] = report.elapsed_sec
+        print(
+            f"[{report.elapsed_sec:8.1f}s] sent={report.sent} accepted={report.accepted} "
+            f"rate={report.achieved_rate}/s lag={report.schedule_lag_sec}s "
+            f"queue={report.queue_depth} queue_age={report.queue_age_sec}s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    try:
+        generator.run(on_progress=progress)
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(generator.status(), indent=2))
+
+
+if __name__ == "__main__":
+    main()